@@ -1,8 +1,6 @@
 from django.http.response import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.authentication import TokenAuthentication
-import requests
-from .models import Allergy
 from django.conf import settings
 from django.shortcuts import render
 from django.shortcuts import render, redirect, get_object_or_404
@@ -20,13 +18,14 @@ from rest_framework.authtoken.models import Token
 from django.views.decorators.http import (
     require_POST,
 )
-from .serializers import SignupSerializer,UserProfileSerializer,AllergySerializer
+from .serializers import SignupSerializer,UserProfileSerializer
 from django.utils.crypto import get_random_string
 from django.contrib.auth import update_session_auth_hash
-import requests
 import random
 from django.core.mail import send_mail
 from .models import PasswordResetCode,GoogleSocialAccount
+from pills.outbound import OutboundError, deadline_in, get_provider
+from pills.reference_data import reference_response
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -197,9 +196,8 @@ def allergy_list(request):
     """
     DB에 등록된 모든 알러지 성분 목록을 반환합니다.
     """
-    allergies = Allergy.objects.all()
-    serializer = AllergySerializer(allergies, many=True)
-    return Response(serializer.data)
+    # 워커 메모리에 만들어 둔 목록으로 바로 응답 (기준 데이터 버전이 바뀔 때만 다시 만듦, pills/reference_data.py)
+    return reference_response(request, 'allergies')
 # --------------------------------------------------------------------
 
 # -------구글 SMTP 함수 -----------------------------------------------
@@ -312,6 +310,21 @@ def follow(request, user_pk):
     }
     return JsonResponse(context)
 
+# ----------------- 소셜 로그인 외부 호출 --------------------------
+# 카카오/네이버/구글 서버 호출은 pills/outbound.py (서비스별 타임아웃 / 동시 호출 수 / 서킷 브레이커)
+SOCIAL_LOGIN_DEADLINE = 10  # 토큰 발급 + 유저 정보 조회 전체 제한 시간 (초)
+
+
+def social_unavailable_response(e):
+    """외부 로그인 서버가 느리거나 장애일 때 워커를 붙잡지 않고 바로 돌려주는 응답"""
+    print(f"⚠️ 소셜 로그인 서버 호출 실패: {e}")
+    return Response(
+        {'error': '로그인 서버가 응답하지 않습니다. 잠시 후 다시 시도해주세요.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+# ------------------------------------------------------------
+
+
 # ----------------- 신규회원인지 확인 --------------------------
 def check_is_new_user(user):
     """
@@ -335,28 +348,35 @@ def kakao_login(request):
 
     REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
     REDIRECT_URI = os.getenv("KAKAO_REDIRECT_URI")
+    kakao = get_provider('kakao')
+    deadline = deadline_in(SOCIAL_LOGIN_DEADLINE)
 
-    token_res = requests.post(
-        "https://kauth.kakao.com/oauth/token",
-        data={
-            "grant_type": "authorization_code",
-            "client_id": REST_API_KEY,
-            "redirect_uri": REDIRECT_URI,
-            "code": code,
-        },
-        headers={"Content-type": "application/x-www-form-urlencoded;charset=utf-8"},
-        verify=False
-    )
-    
-    access_token = token_res.json().get("access_token")
-    if not access_token:
-        return Response({'error': '카카오 토큰 발급 실패'}, status=status.HTTP_400_BAD_REQUEST)
-
-    user_info_res = requests.get(
-        "https://kapi.kakao.com/v2/user/me",
-        headers={"Authorization": f"Bearer {access_token}"},
-        verify=False
-    )
+    try:
+        token_res = kakao.post(
+            "https://kauth.kakao.com/oauth/token",
+            data={
+                "grant_type": "authorization_code",
+                "client_id": REST_API_KEY,
+                "redirect_uri": REDIRECT_URI,
+                "code": code,
+            },
+            headers={"Content-type": "application/x-www-form-urlencoded;charset=utf-8"},
+            verify=False,
+            deadline=deadline,
+        )
+
+        access_token = token_res.json().get("access_token")
+        if not access_token:
+            return Response({'error': '카카오 토큰 발급 실패'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_info_res = kakao.get(
+            "https://kapi.kakao.com/v2/user/me",
+            headers={"Authorization": f"Bearer {access_token}"},
+            verify=False,
+            deadline=deadline,
+        )
+    except OutboundError as e:
+        return social_unavailable_response(e)
     user_json = user_info_res.json()
     kakao_account = user_json.get("kakao_account")
     nickname = kakao_account.get("profile").get("nickname")
@@ -397,17 +417,24 @@ def naver_login(request):
     CLIENT_SECRET = os.getenv("NAVER_SECRET_KEY")
 
     token_url = f"https://nid.naver.com/oauth2.0/token?grant_type=authorization_code&client_id={CLIENT_ID}&client_secret={CLIENT_SECRET}&code={code}&state={state}"
-    token_res = requests.get(token_url)
-    token_json = token_res.json()
-    access_token = token_json.get('access_token')
+    naver = get_provider('naver_oauth')
+    deadline = deadline_in(SOCIAL_LOGIN_DEADLINE)
 
-    if not access_token:
-        return Response({'error': '네이버 토큰 실패'}, status=400)
+    try:
+        token_res = naver.get(token_url, deadline=deadline)
+        token_json = token_res.json()
+        access_token = token_json.get('access_token')
 
-    user_res = requests.get(
-        "https://openapi.naver.com/v1/nid/me",
-        headers={"Authorization": f"Bearer {access_token}"}
-    )
+        if not access_token:
+            return Response({'error': '네이버 토큰 실패'}, status=400)
+
+        user_res = naver.get(
+            "https://openapi.naver.com/v1/nid/me",
+            headers={"Authorization": f"Bearer {access_token}"},
+            deadline=deadline,
+        )
+    except OutboundError as e:
+        return social_unavailable_response(e)
     user_response_data = user_res.json().get('response') 
 
     if not user_response_data:
@@ -449,25 +476,32 @@ def google_callback(request):
     client_secret = os.getenv("GOOGLE_CLIENT_KEY")
     redirect_uri = os.getenv("GOOGLE_REDIRECT_URI")
 
-    # 1. 구글로부터 액세스 토큰 요청
-    token_res = requests.post("https://oauth2.googleapis.com/token", data={
-        'code': code,
-        'client_id': client_id,
-        'client_secret': client_secret,
-        'redirect_uri': redirect_uri,
-        'grant_type': 'authorization_code',
-    })
-    token_data = token_res.json()
-    google_access_token = token_data.get('access_token')
+    google = get_provider('google')
+    deadline = deadline_in(SOCIAL_LOGIN_DEADLINE)
 
-    if not google_access_token:
-        return Response({'error': '구글 토큰 발급 실패', 'detail': token_data}, status=400)
-
-    # 2. 구글 유저 정보 가져오기
-    user_info = requests.get(
-        "https://www.googleapis.com/oauth2/v2/userinfo",
-        headers={'Authorization': f'Bearer {google_access_token}'}
-    ).json()
+    try:
+        # 1. 구글로부터 액세스 토큰 요청
+        token_res = google.post("https://oauth2.googleapis.com/token", data={
+            'code': code,
+            'client_id': client_id,
+            'client_secret': client_secret,
+            'redirect_uri': redirect_uri,
+            'grant_type': 'authorization_code',
+        }, deadline=deadline)
+        token_data = token_res.json()
+        google_access_token = token_data.get('access_token')
+
+        if not google_access_token:
+            return Response({'error': '구글 토큰 발급 실패', 'detail': token_data}, status=400)
+
+        # 2. 구글 유저 정보 가져오기
+        user_info = google.get(
+            "https://www.googleapis.com/oauth2/v2/userinfo",
+            headers={'Authorization': f'Bearer {google_access_token}'},
+            deadline=deadline,
+        ).json()
+    except OutboundError as e:
+        return social_unavailable_response(e)
     
     google_access_token = token_data.get('access_token')
     google_id = user_info.get('id')
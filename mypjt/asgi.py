@@ -1,16 +1,24 @@
 """
-ASGI config for pjt_11 project.
+ASGI config for mypjt project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+챗봇 스트리밍(/pills/chatbot/stream/)은 ASGI 서버로 실행해야 이벤트 루프에서 비동기로 처리됩니다.
+    uvicorn mypjt.asgi:application --workers 4
 """
 
 import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pjt_11.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mypjt.settings')
 
 application = get_asgi_application()
+
+# 카테고리/성분명/알레르기 목록을 워커 메모리에 미리 만들어 둠 (pills/reference_data.py)
+from pills.reference_data import warm_reference_data  # noqa: E402
+
+warm_reference_data()
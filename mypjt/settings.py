@@ -184,6 +184,69 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,  # 한 페이지에 20개씩만 보냄 (나머지는 '다음 페이지'로)
+    # JSON 인코딩은 orjson으로 (pills/renderers.py, orjson이 없으면 기본 JSONRenderer와 같게 동작)
+    'DEFAULT_RENDERER_CLASSES': [
+        'pills.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# 영양제 검색 백엔드 (pills/search.py)
+# SQLite FTS5 바이그램 인덱스 사용, 다른 DB에서는 자동으로 icontains 검색으로 대체됨
+# NgramBackend: 제품명/제조사 부분 검색은 메모리 n-gram 역색인으로 처리 (나머지는 FTS)
+PILL_SEARCH_BACKEND = 'pills.search.NgramBackend'
+PILL_NGRAM_MAX_IDS = 5000       # 이보다 결과가 많으면 FTS/LIKE 검색으로 대체
+# 성분/카테고리/제형/알레르기 조합 필터 비트맵 (pills/bitmap_filter.py)
+PILL_FILTER_REFRESH_LIMIT = 500  # 한 번에 이보다 많이 바뀌면 비트만 고치지 않고 다음 조회 때 다시 만듦
+PILL_FILTER_MAX_DELTA_VERSIONS = 100  # 다른 프로세스의 변경을 변경 목록으로 따라잡는 최대 버전 차이 (넘으면 다시 만듦, n-gram 색인도 같은 값 사용)
+
+# 영양제 목록/상세 캐시 TTL (초)
+# 데이터가 바뀌면 캐시 키의 버전이 올라가서 자동 무효화되므로 길게 잡음 (pills/cache_utils.py)
+PILL_CACHE_TTL = 60 * 60 * 6
+PILL_CACHE_STALE_TTL = 60 * 10  # TTL이 지난 뒤 갱신하는 동안 옛 값을 내보낼 수 있는 시간
+THREAD_CACHE_TTL = 60 * 5       # 후기 목록은 작성자 프로필 변경 등을 위해 짧게
+PILL_APPROX_COUNT_TTL = 60 * 10 # 커서 페이지네이션 ?with_count=1 전체 개수 재사용 시간 (근사값)
+# 'rendered': 목록/상세 캐시에 렌더링 + gzip 압축한 JSON bytes를 저장해서 그대로 전송 (pills/response_cache.py)
+# 'data'    : 응답 데이터를 저장하고 요청마다 JSON으로 인코딩 (예전 방식)
+PILL_RESPONSE_CACHE_MODE = 'rendered'
+# 'rendered' 모드 응답의 Cache-Control (ETag가 있어서 만료 뒤에도 If-None-Match -> 304로 싸게 재검증)
+PILL_HTTP_CACHE_CONTROL = 'public, max-age=60, s-maxage=300, stale-while-revalidate=60'       # 목록/상세
+PILL_REFERENCE_CACHE_CONTROL = 'public, max-age=600, s-maxage=3600, stale-while-revalidate=600'  # 카테고리/성분/알레르기
+# 카테고리/성분명/알레르기 목록을 워커 메모리에 두고, 이 간격(초)마다 기준 데이터 버전만 확인 (pills/reference_data.py)
+PILL_REFERENCE_CHECK_INTERVAL = 5
+# 많이 보는 상세/목록 조건 집계 (Redis ZSET, pills/access_stats.py) -> python manage.py warm_cache 가 이 순서로 캐시를 채움
+PILL_ACCESS_STATS_ENABLED = True
+PILL_WARM_CACHE_AUTO = False  # True: migrate / load_pills_data 뒤에 warm_cache 자동 실행
+PILL_WARM_CACHE_BASE_URL = 'https://pillgood.store'  # warm_cache 요청 주소 (캐시된 목록의 next/previous 링크에 그대로 들어감)
+
+# 네이버 쇼핑 정보 수집 작업(EnrichmentJob)이 완료/실패한 뒤 다시 등록할 수 있기까지의 시간 (초)
+ENRICHMENT_RETRY_AFTER = 60 * 60 * 24
+# 에러 난 작업을 다시 시도하기까지 기다리는 시간 (초): 1분, 2분, 4분 ... 최대 1시간 (네이버 장애 때 하루 한도 보호)
+ENRICHMENT_RETRY_BACKOFF = 60
+ENRICHMENT_RETRY_BACKOFF_MAX = 60 * 60
+
+# 네이버 쇼핑 API 호출 제한 (pills/naver_client.py, 캐시를 통해 모든 프로세스가 공유)
+NAVER_RATE_LIMIT = 10        # 초당 최대 호출 수
+NAVER_DAILY_QUOTA = 25000    # 하루 최대 호출 수 (한국 시간 자정에 초기화)
+NAVER_TIMEOUT = (3, 5)       # (연결, 응답) 타임아웃 (초)
+
+# 챗봇 추천(Gemini) 응답 캐시 (pills/reco_cache.py)
+RECO_CACHE_ENABLED = True
+RECO_CACHE_TTL = 60 * 60 * 24       # 답변 보관 시간 (초)
+RECO_CACHE_MAX_ENTRIES = 5000       # 이보다 많으면 오래 안 쓴 답변부터 삭제 (LRU)
+
+# 챗봇 스트리밍 (pills/chatbot_stream.py)
+CHATBOT_STREAM_WORKERS = 64         # 동시에 Gemini 스트림을 읽을 수 있는 수
+CHATBOT_STREAM_TIMEOUT = (3, 30)    # (연결, 다음 조각까지 대기) 타임아웃 (초)
+
+# 외부 API 호출 설정 (pills/outbound.py) - 서비스별 타임아웃 / 동시 호출 수 / 서킷 브레이커
+# 적지 않은 항목은 outbound.DEFAULT_CONFIG 값 사용
+OUTBOUND_PROVIDERS = {
+    'naver_shop':  {'timeout': (3, 5),  'max_concurrency': 16},
+    'gms':         {'timeout': (3, 30), 'max_concurrency': 64, 'queue_timeout': 0},
+    'kakao':       {'timeout': (3, 5),  'max_concurrency': 10},
+    'naver_oauth': {'timeout': (3, 5),  'max_concurrency': 10},
+    'google':      {'timeout': (3, 5),  'max_concurrency': 10},
 }
 
 CACHES = {
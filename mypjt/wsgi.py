@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mypjt.settings')
 
 application = get_wsgi_application()
+
+# 카테고리/성분명/알레르기 목록을 워커 메모리에 미리 만들어 둠 (pills/reference_data.py)
+from pills.reference_data import warm_reference_data  # noqa: E402
+
+warm_reference_data()
@@ -0,0 +1,76 @@
+# pills/access_stats.py
+# 많이 보는 영양제 상세 / 목록 조회 조건 집계 (캐시 미리 채우기용, python manage.py warm_cache)
+#
+# Redis ZSET에 조회 수를 더해 둡니다. (요청당 ZINCRBY 한 번, 실패해도 요청에는 영향 없음)
+#   pill_stats:detail_views   : 영양제 pk -> 상세 조회 수
+#   pill_stats:index_queries  : 정리한 목록 쿼리 문자열 -> 조회 수 (커서 요청은 제외)
+# Redis가 아닌 캐시 백엔드에서는 집계하지 않고, warm_cache는 영양제함 등록 수로 대신합니다.
+# warm_cache가 보낸 요청(X-Cache-Warm 헤더)은 세지 않습니다. (채울수록 순위가 굳어지지 않도록)
+# 끄려면 PILL_ACCESS_STATS_ENABLED = False
+
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+DETAIL_VIEWS_KEY = 'pill_stats:detail_views'
+INDEX_QUERIES_KEY = 'pill_stats:index_queries'
+# 목록 쿼리 문자열에서 빼는 파라미터 (매번 달라서 다시 요청할 수 없는 값)
+_SKIP_PARAMS = {'cursor'}
+WARM_HEADER = 'HTTP_X_CACHE_WARM'
+
+
+def is_enabled():
+    return getattr(settings, 'PILL_ACCESS_STATS_ENABLED', True)
+
+
+def _redis():
+    """django-redis 연결 (다른 캐시 백엔드면 None)"""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def _record(request, key, member):
+    if not is_enabled() or request.META.get(WARM_HEADER):
+        return
+    try:
+        conn = _redis()
+        if conn is not None:
+            conn.zincrby(cache.make_key(key), 1, member)
+    except Exception:
+        pass  # 집계 실패로 응답이 실패하면 안 됨
+
+
+def normalize_index_query(params):
+    """같은 조건이면 같은 문자열이 되도록 정렬 (빈 값, 커서 제외). 조건이 없으면 ''"""
+    items = sorted((k, v) for k, v in params.items() if v and k not in _SKIP_PARAMS)
+    return urlencode(items)
+
+
+def record_detail_view(request, pill_pk):
+    _record(request, DETAIL_VIEWS_KEY, str(pill_pk))
+
+
+def record_index_query(request):
+    if 'cursor' in request.GET:
+        return
+    _record(request, INDEX_QUERIES_KEY, normalize_index_query(request.GET))
+
+
+def top(key, limit):
+    """[(member, 조회 수), ...] 많은 순. 집계가 없으면 None"""
+    conn = _redis()
+    if conn is None:
+        return None
+    rows = conn.zrevrange(cache.make_key(key), 0, limit - 1, withscores=True)
+    return [(member.decode() if isinstance(member, bytes) else member, int(score)) for member, score in rows]
+
+
+def trim(key, keep):
+    """많이 본 keep개만 남김 (ZSET이 끝없이 커지지 않도록, warm_cache가 실행할 때마다 정리)"""
+    conn = _redis()
+    if conn is not None:
+        conn.zremrangebyrank(cache.make_key(key), 0, -keep - 1)
@@ -1,6 +1,18 @@
 from django.contrib import admin
-from .models import Pill, Thread
+from .models import Pill, Thread, EnrichmentJob, EnrichmentCheckpoint
 
 # Register your models here.
 admin.site.register(Pill)
 admin.site.register(Thread)
+
+
+@admin.register(EnrichmentJob)
+class EnrichmentJobAdmin(admin.ModelAdmin):
+    list_display = ('pill', 'status', 'attempts', 'updated_at')
+    list_filter = ('status',)
+    raw_id_fields = ('pill',)
+
+
+@admin.register(EnrichmentCheckpoint)
+class EnrichmentCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_key', 'processed', 'found', 'missing', 'errors', 'updated_at', 'finished_at')
@@ -1,5 +1,28 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
 
 
 class PillsConfig(AppConfig):
     name = 'pills'
+
+    def ready(self):
+        # 검색 인덱스 동기화용 시그널 등록
+        from . import signals  # noqa: F401
+
+        # migrate로 검색 인덱스 테이블이 생기거나 없어질 수 있으므로 다시 확인하게 함
+        post_migrate.connect(reset_search_availability, sender=self)
+        # migrate 뒤 캐시 미리 채우기 (PILL_WARM_CACHE_AUTO, 기본 꺼짐)
+        post_migrate.connect(warm_cache_after_migrate, sender=self)
+
+
+def reset_search_availability(sender, **kwargs):
+    from .search import get_search_backend
+    get_search_backend().reset_availability()
+
+
+def warm_cache_after_migrate(sender, **kwargs):
+    if not getattr(settings, 'PILL_WARM_CACHE_AUTO', False):
+        return
+    from django.core.management import call_command
+    call_command('warm_cache', stdout=kwargs.get('stdout'))
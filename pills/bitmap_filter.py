@@ -0,0 +1,582 @@
+# pills/bitmap_filter.py
+# 성분/카테고리/제형/알레르기 조합 필터용 메모리 비트맵 색인
+#
+# "루테인 AND 지아잔틴, 캡슐, 대두 제외" 같은 조합을 매번 Nutrient/Allergen JOIN + DISTINCT로 풀면
+# 조건이 늘어날수록 쿼리가 무거워집니다. 여기서는 값마다 "해당하는 영양제 pk 집합"을 비트맵으로 들고 있다가
+# AND / OR / NOT을 비트 연산(&, |, ~)으로 계산하고, 결과 중 요청한 페이지(20개)만 DB에서 읽습니다.
+#
+#   - 비트맵은 파이썬 int (pk번째 비트 = 해당 영양제). 연산은 C 수준에서 처리되고 개수는 bit_count()
+#   - 성분(substance_id) / 카테고리(category_id) / 제형(dosage_form) / 알레르기(이름) / 가격대별 비트맵
+#   - 같은 비트맵으로 필터 사이드바 옵션별 개수(facet_counts)도 한 번에 계산
+#   - 가격 실패(-1) 영양제는 목록과 마찬가지로 결과에서 제외 (universe 비트맵)
+#   - 첫 조회 때 DB에서 만들고, 같은 프로세스의 변경은 invalidate_pills()에서 해당 영양제 비트만 고쳐서 바로 반영 (pills/signals.py)
+#   - invalidate_pills()는 카탈로그 버전별로 바뀐 영양제 pk를 캐시에 남김 (pill_filter_changes_{버전})
+#     다른 프로세스(네이버 작업 워커, 관리자 화면, 데이터 로드)가 버전을 올렸으면 그 사이 버전들의 변경 목록만 읽어서 고침
+#     변경 목록이 없거나(만료, 너무 많이 바뀜) 버전 차이가 PILL_FILTER_MAX_DELTA_VERSIONS보다 크면 전체를 다시 만듦
+#
+# 필터식 문법
+#   substance:루테인 AND substance:지아잔틴, shape:캡슐 AND NOT allergen:대두
+#   (category:"눈 건강" OR category:"간 건강") shape:"정(알약)"
+#   - 조건: 필드:값 (필드 생략 시 성분). 공백이 들어간 값은 "..."로 감쌈
+#       substance / s / 성분   : 성분 이름 또는 id (정확히 일치)
+#       category  / c / 카테고리: 카테고리 이름 또는 id (정확히 일치)
+#       shape     / 제형       : 정규화된 제형 ('정(알약)', 'tablet', '정제' 모두 같은 제형, pills/dosage_forms.py)
+#       allergen  / a / 알레르기: 알레르기 이름에 포함되면 일치
+#       price     / 가격       : 가격대 코드 또는 이름 (PRICE_BANDS, 예: price:10k_20k)
+#   - 연산자: NOT > AND > OR 순서, 괄호 사용 가능. 쉼표와 나란히 쓴 조건은 AND
+
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .dosage_forms import DOSAGE_FORM_CHOICES, dosage_forms_for
+
+# 가격대 (코드, 화면 이름, 이상, 미만). 가격이 아직 없는 영양제는 'unknown'
+PRICE_BANDS = (
+    ('under_10k', '1만원 미만', 0, 10000),
+    ('10k_20k', '1~2만원', 10000, 20000),
+    ('20k_30k', '2~3만원', 20000, 30000),
+    ('30k_50k', '3~5만원', 30000, 50000),
+    ('over_50k', '5만원 이상', 50000, None),
+    ('unknown', '가격 정보 없음', None, None),
+)
+_PRICE_BAND_CODES = {label: code for code, label, _, _ in PRICE_BANDS}
+
+
+def price_band(price):
+    if price is None or price < 0:
+        return 'unknown'
+    for code, _, low, high in PRICE_BANDS:
+        if low is not None and price >= low and (high is None or price < high):
+            return code
+    return 'unknown'
+
+FIELD_ALIASES = {
+    'substance': 'substance', 's': 'substance', '성분': 'substance',
+    'category': 'category', 'c': 'category', '카테고리': 'category',
+    'shape': 'shape', '제형': 'shape',
+    'allergen': 'allergen', 'a': 'allergen', '알레르기': 'allergen',
+    'price': 'price', '가격': 'price',
+}
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<lparen>\() | (?P<rparen>\)) | (?P<comma>,)
+      | (?:(?P<field>[^\s(),:"]+):)?
+        (?:"(?P<quoted>[^"]*)" | (?P<word>[^\s(),"]+(?:\([^\s()"]*\))?))
+    )''', re.X)
+
+_KEYWORDS = {'AND', 'OR', 'NOT'}
+_TOKEN_NAMES = {'term': '조건', 'lparen': '(', 'rparen': ')', 'comma': ','}
+
+# 카탈로그 버전 -> 그 버전에서 바뀐 영양제 pk 목록 (다른 프로세스의 비트맵을 변경분만 고치는 데 사용)
+CHANGES_KEY = 'pill_filter_changes_{version}'
+
+
+class FilterSyntaxError(ValueError):
+    """필터식 문법 오류 (API에서는 400으로 응답)"""
+
+
+# ==========================================
+# 1. 필터식 -> 트리
+# ==========================================
+# 트리 노드: ('term', 필드, 값) / ('and', [노드...]) / ('or', [노드...]) / ('not', 노드)
+def term(field, value):
+    return ('term', field, str(value))
+
+
+def all_of(*nodes):
+    return ('and', [n for n in nodes if n is not None])
+
+
+def any_of(*nodes):
+    return ('or', [n for n in nodes if n is not None])
+
+
+def _tokenize(expression):
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if match is None or match.end() == pos:
+            raise FilterSyntaxError(f"해석할 수 없는 부분이 있습니다: '{expression[pos:].strip()}'")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind in ('lparen', 'rparen', 'comma'):
+            tokens.append((kind, None))
+            continue
+
+        field, quoted, word = match.group('field'), match.group('quoted'), match.group('word')
+        if field is None and word is not None and word.split('(')[0].upper() in _KEYWORDS:
+            # 'NOT(...)'처럼 괄호를 붙여 쓴 경우 연산자만 떼어냄
+            keyword = word.split('(')[0]
+            tokens.append((keyword.upper(), None))
+            pos = match.start('word') + len(keyword)
+            continue
+        field_name = FIELD_ALIASES.get((field or 'substance').lower())
+        if field_name is None:
+            raise FilterSyntaxError(f"알 수 없는 필드입니다: '{field}' (substance, category, shape, allergen, price)")
+        value = (quoted if quoted is not None else word).strip()
+        if not value:
+            raise FilterSyntaxError(f"'{field}:' 뒤에 값이 없습니다.")
+        tokens.append(('term', term(field_name, value)))
+    return tokens
+
+
+def parse_filter(expression):
+    """필터식 문자열 -> 트리. 빈 문자열이면 None (= 전체)"""
+    tokens = _tokenize(expression or '')
+    if not tokens:
+        return None
+    pos = 0
+
+    def peek():
+        return tokens[pos][0] if pos < len(tokens) else None
+
+    def take(kind):
+        nonlocal pos
+        if peek() != kind:
+            found = _TOKEN_NAMES.get(peek(), peek() or '식의 끝')
+            raise FilterSyntaxError(f"'{_TOKEN_NAMES.get(kind, kind)}' 자리에 '{found}'이(가) 있습니다.")
+        pos += 1
+        return tokens[pos - 1][1]
+
+    def parse_or():
+        nodes = [parse_and()]
+        while peek() == 'OR':
+            take('OR')
+            nodes.append(parse_and())
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def parse_and():
+        nodes = [parse_not()]
+        while peek() in ('AND', 'comma', 'NOT', 'term', 'lparen'):
+            if peek() in ('AND', 'comma'):
+                take(peek())
+            nodes.append(parse_not())
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def parse_not():
+        if peek() == 'NOT':
+            take('NOT')
+            return ('not', parse_not())
+        if peek() == 'lparen':
+            take('lparen')
+            node = parse_or()
+            take('rparen')
+            return node
+        return take('term')
+
+    node = parse_or()
+    if pos != len(tokens):
+        raise FilterSyntaxError("괄호가 맞지 않거나 연산자 사이에 조건이 없습니다.")
+    return node
+
+
+# ==========================================
+# 2. 비트맵 도우미
+# ==========================================
+def bitmap_from(positions):
+    """pk 목록 -> 비트맵 (한 번에 만들어야 빠름: |= 를 반복하면 매번 큰 int를 새로 만듦)"""
+    positions = list(positions)
+    if not positions:
+        return 0
+    buf = bytearray(max(positions) // 8 + 1)
+    for pk in positions:
+        buf[pk >> 3] |= 1 << (pk & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def bitmap_ids(bitmap, start=0, stop=None, descending=True):
+    """비트맵에서 start번째~stop번째 pk (descending이면 큰 pk부터)"""
+    if bitmap <= 0:
+        return []
+    bits = bin(bitmap)[2:] if descending else bin(bitmap)[:1:-1]
+    last = len(bits) - 1
+
+    # 앞쪽 start개는 블록 단위로 1의 개수만 세서 건너뜀 (깊은 페이지도 빠르게)
+    pos, skip = 0, start
+    while skip:
+        block = bits.count('1', pos, pos + 4096)
+        if block > skip:
+            break
+        skip -= block
+        pos += 4096
+        if pos > last:
+            return []
+    for _ in range(skip):
+        pos = bits.find('1', pos) + 1
+
+    ids = []
+    limit = None if stop is None else stop - start
+    while limit is None or len(ids) < limit:
+        idx = bits.find('1', pos)
+        if idx < 0:
+            break
+        ids.append(last - idx if descending else idx)
+        pos = idx + 1
+    return ids
+
+
+class FilterResult:
+    """
+    필터 결과. Django Paginator에 그대로 넘길 수 있음 (count() + 슬라이싱)
+    슬라이스한 구간의 영양제만 DB에서 읽음 (목록 컬럼만 values() 행으로)
+    """
+
+    def __init__(self, bitmap, descending=True):
+        self.bitmap = bitmap
+        self.descending = descending
+
+    def count(self):
+        return self.bitmap.bit_count()
+
+    def __len__(self):
+        return self.count()
+
+    def ids(self, start=0, stop=None):
+        return bitmap_ids(self.bitmap, start, stop, self.descending)
+
+    def ids_after(self, pk, limit, reverse=False):
+        """
+        정렬 순서상 pk 다음 limit개 (커서 페이지네이션용, pills/pagination.py)
+        reverse면 pk 이전 limit개를 pk에 가까운 것부터
+        """
+        if (not self.descending) != reverse:
+            return bitmap_ids((self.bitmap >> (pk + 1)) << (pk + 1), 0, limit, descending=False)
+        return bitmap_ids(self.bitmap & ((1 << pk) - 1), 0, limit, descending=True)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                raise ValueError("step은 지원하지 않습니다.")
+            return self.hydrate(self.ids(key.start or 0, key.stop))
+        pills = self.hydrate(self.ids(key, key + 1))
+        if not pills:
+            raise IndexError(key)
+        return pills[0]
+
+    @staticmethod
+    def hydrate(ids):
+        """pk 순서 그대로 목록 컬럼만 읽은 행(dict)들 (pills/serializers.py serialize_pill_list로 바로 직렬화)"""
+        from .models import Pill
+        from .serializers import pill_list_values
+
+        if not ids:
+            return []
+        rows = {row['id']: row for row in pill_list_values(Pill.objects.filter(pk__in=ids))}
+        return [rows[pk] for pk in ids if pk in rows]
+
+
+# ==========================================
+# 3. Pill 비트맵 색인 (프로세스당 1개)
+# ==========================================
+class _IndexState:
+    def __init__(self):
+        self.universe = 0                    # 목록에 나오는 영양제 (price != -1)
+        self.substances = {}                 # substance_id -> 비트맵
+        self.categories = {}                 # category_id -> 비트맵
+        self.shapes = {}                     # 제형 코드(dosage_form) -> 비트맵
+        self.allergens = {}                  # 알레르기 이름(소문자) -> 비트맵
+        self.prices = {}                     # 가격대 코드 -> 비트맵
+        self.substance_names = {}            # 이름(소문자) -> id
+        self.category_names = {}
+        self.category_labels = {}            # id -> 이름 (facet 응답용)
+        self.pills = {}                      # pk -> (목록 노출 여부, category_id, 제형, 성분 id들, 알레르기들, 가격대)
+
+    @staticmethod
+    def dimensions(attrs):
+        """영양제 한 개가 들어가는 (비트맵 묶음 이름, 값)들"""
+        visible, category_id, shape, substance_ids, allergens, band = attrs
+        yield 'categories', category_id
+        yield 'shapes', shape
+        yield 'prices', band
+        for substance_id in substance_ids:
+            yield 'substances', substance_id
+        for name in allergens:
+            yield 'allergens', name
+
+
+class PillBitmapIndex:
+    """
+    영양제 필터 비트맵 묶음.
+    카탈로그 버전이 만든 시점과 다르면 조회할 때 그 사이 변경분만 고치고, 고칠 수 없으면 다시 만듭니다.
+    """
+
+    def __init__(self, refresh_limit=500, max_delta_versions=100):
+        self.refresh_limit = refresh_limit
+        self.max_delta_versions = max_delta_versions
+        self._state = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    # ---------- 생성 / 갱신 ----------
+    @staticmethod
+    def _read_pills(pill_ids=None):
+        """pk -> 비트맵에 필요한 값 (pill_ids가 없으면 전체)"""
+        from .models import Pill, Nutrient, Allergen
+
+        pills = Pill.objects.all()
+        nutrients = Nutrient.objects.all()
+        allergens = Allergen.objects.all()
+        if pill_ids is not None:
+            pills = pills.filter(pk__in=pill_ids)
+            nutrients = nutrients.filter(pill_id__in=pill_ids)
+            allergens = allergens.filter(pill_id__in=pill_ids)
+
+        substance_ids = defaultdict(list)
+        for pill_id, substance_id in nutrients.values_list('pill_id', 'substance_id').iterator(chunk_size=5000):
+            substance_ids[pill_id].append(substance_id)
+        allergen_names = defaultdict(list)
+        for pill_id, name in allergens.values_list('pill_id', 'name').iterator(chunk_size=5000):
+            allergen_names[pill_id].append((name or '').lower())
+
+        return {
+            pk: (
+                price != -1,
+                category_id,
+                dosage_form,
+                tuple(substance_ids.get(pk, ())),
+                tuple(allergen_names.get(pk, ())),
+                price_band(price),
+            )
+            for pk, category_id, dosage_form, price
+            in pills.values_list('id', 'category_id', 'dosage_form', 'price').iterator(chunk_size=5000)
+        }
+
+    def _load(self):
+        from .models import Category, Substance
+
+        state = _IndexState()
+        state.pills = self._read_pills()
+        state.substance_names = {name.lower(): pk for pk, name in Substance.objects.values_list('id', 'name')}
+        state.category_labels = dict(Category.objects.values_list('id', 'name'))
+        state.category_names = {name.lower(): pk for pk, name in state.category_labels.items()}
+
+        positions = defaultdict(list)
+        universe = []
+        for pk, attrs in state.pills.items():
+            if attrs[0]:
+                universe.append(pk)
+            for dimension, key in state.dimensions(attrs):
+                positions[dimension, key].append(pk)
+
+        state.universe = bitmap_from(universe)
+        for (dimension, key), pks in positions.items():
+            getattr(state, dimension)[key] = bitmap_from(pks)
+        return state
+
+    def _current(self):
+        """최신 카탈로그 버전 기준 상태 (버전이 다르면 변경분만 고치고, 안 되면 다시 만듦)"""
+        from .cache_utils import get_catalog_version
+
+        version = get_catalog_version()
+        with self._lock:
+            if self._state is not None and self._version != version and not self._catch_up(version):
+                self._state = None
+            if self._state is None:
+                self._state = self._load()
+                self._version = version
+            return self._state
+
+    def _catch_up(self, version):
+        """
+        다른 프로세스가 올린 버전들의 변경 목록(CHANGES_KEY)으로 바뀐 영양제만 고침 (lock 안에서 호출)
+        버전 차이가 너무 크거나, 변경 목록이 하나라도 없거나, 합쳐서 refresh_limit개보다 많으면 False
+        """
+        gap = version - self._version
+        if not 0 < gap <= self.max_delta_versions:
+            return False
+        keys = [CHANGES_KEY.format(version=v) for v in range(self._version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+        pill_ids = set().union(*changes.values())
+        if len(pill_ids) > self.refresh_limit:
+            return False
+        self._apply(self._state, list(pill_ids))
+        self._version = version
+        return True
+
+    def refresh(self, pill_ids, version):
+        """
+        같은 프로세스에서 바뀐 영양제 비트만 다시 계산 (삭제된 영양제는 제거)
+        version: 이번 변경으로 올라간 카탈로그 버전. 다른 프로세스도 따라올 수 있도록 변경 목록을 캐시에 남김
+        그 사이 다른 곳에서도 바뀌었으면 다음 조회 때 _current()가 변경 목록으로 따라잡음
+        """
+        from .cache_utils import get_cache_ttl
+
+        pill_ids = list(set(pill_ids))
+        if len(pill_ids) <= self.refresh_limit:
+            cache.set(CHANGES_KEY.format(version=version), pill_ids, timeout=get_cache_ttl())
+        with self._lock:
+            state = self._state
+            if state is None or self._version is None or version != self._version + 1:
+                return
+            if len(pill_ids) > self.refresh_limit:
+                self._state = None
+                return
+            self._apply(state, pill_ids)
+            self._version = version
+
+    def _apply(self, state, pill_ids):
+        """pill_ids 영양제의 비트를 DB 값으로 다시 계산 (lock 안에서 호출)"""
+        fresh = {}
+        for i in range(0, len(pill_ids), 500):
+            fresh.update(self._read_pills(pill_ids[i:i + 500]))
+
+        for pk in pill_ids:
+            bit = 1 << pk
+            old, new = state.pills.pop(pk, None), fresh.get(pk)
+            if old is not None:
+                state.universe &= ~bit
+                for dimension, key in state.dimensions(old):
+                    bitmaps = getattr(state, dimension)
+                    remaining = bitmaps.get(key, 0) & ~bit
+                    if remaining:
+                        bitmaps[key] = remaining
+                    else:
+                        bitmaps.pop(key, None)
+            if new is not None:
+                state.pills[pk] = new
+                if new[0]:
+                    state.universe |= bit
+                for dimension, key in state.dimensions(new):
+                    bitmaps = getattr(state, dimension)
+                    bitmaps[key] = bitmaps.get(key, 0) | bit
+
+    def invalidate(self):
+        with self._lock:
+            self._state = None
+
+    # ---------- 조회 ----------
+    @staticmethod
+    def _lookup_id(value, names, model):
+        if value.isdigit():
+            return int(value)
+        key = value.lower()
+        if key not in names:
+            # 색인을 만든 뒤 추가된 성분/카테고리
+            names[key] = model.objects.filter(name__iexact=value).values_list('id', flat=True).first()
+        return names[key]
+
+    def _term(self, state, field, value):
+        from .models import Category, Substance
+
+        if field == 'substance':
+            return state.substances.get(self._lookup_id(value, state.substance_names, Substance), 0)
+        if field == 'category':
+            return state.categories.get(self._lookup_id(value, state.category_names, Category), 0)
+
+        if field == 'price':
+            return state.prices.get(_PRICE_BAND_CODES.get(value, value), 0)
+        if field == 'shape':
+            bitmap = 0
+            for code in dosage_forms_for([value]):
+                bitmap |= state.shapes.get(code, 0)
+            return bitmap
+
+        # 알레르기: 이름에 포함되면 일치
+        value = value.lower()
+        bitmap = 0
+        for key, bits in state.allergens.items():
+            if value in key:
+                bitmap |= bits
+        return bitmap
+
+    def _evaluate(self, state, node):
+        kind = node[0]
+        if kind == 'term':
+            return self._term(state, node[1], node[2])
+        if kind == 'not':
+            return state.universe & ~self._evaluate(state, node[1])
+        if kind == 'and':
+            bitmap = state.universe
+            for child in node[1]:
+                if not bitmap:
+                    break
+                bitmap &= self._evaluate(state, child)
+            return bitmap
+        bitmap = 0
+        for child in node[1]:
+            bitmap |= self._evaluate(state, child)
+        return bitmap
+
+    def evaluate(self, expression):
+        """필터식(문자열 또는 트리) -> 조건에 맞고 목록에 나오는 영양제 비트맵"""
+        node = parse_filter(expression) if isinstance(expression, str) or expression is None else expression
+        state = self._current()
+        with self._lock:
+            if node is None:
+                return state.universe
+            return state.universe & self._evaluate(state, node)
+
+    def facet_counts(self, base=None, selections=None):
+        """
+        필터 사이드바 옵션별 개수 (한 번의 비트맵 계산, DB 조회 없음)
+        base: 검색어 등으로 먼저 좁힌 범위 (비트맵, None이면 전체)
+        selections: {'category': 노드, 'shape': 노드, 'price': 노드, 'allergen_free': 노드} 화면에서 고른 조건
+        각 facet의 개수는 "다른 facet에서 고른 조건"만 적용해서 셉니다 (같은 facet 안에서는 여러 개 고를 수 있으므로)
+        """
+        selections = {facet: node for facet, node in (selections or {}).items() if node is not None}
+        state = self._current()
+        with self._lock:
+            scope = state.universe if base is None else state.universe & base
+            chosen = {facet: state.universe & self._evaluate(state, node) for facet, node in selections.items()}
+
+            def others(facet):
+                bitmap = scope
+                for name, bits in chosen.items():
+                    if name != facet:
+                        bitmap &= bits
+                return bitmap
+
+            total = others(None)
+            category_scope = others('category')
+            categories = [
+                {'value': state.category_labels.get(category_id, str(category_id)), 'count': (category_scope & bits).bit_count()}
+                for category_id, bits in state.categories.items()
+            ]
+            categories.sort(key=lambda item: (-item['count'], item['value']))
+
+            shape_scope = others('shape')
+            shapes = [
+                {'value': code, 'label': label, 'count': (shape_scope & state.shapes.get(code, 0)).bit_count()}
+                for code, label in DOSAGE_FORM_CHOICES
+            ]
+
+            price_scope = others('price')
+            prices = [
+                {'value': code, 'label': label, 'count': (price_scope & state.prices.get(code, 0)).bit_count()}
+                for code, label, _, _ in PRICE_BANDS
+            ]
+
+            # 알레르기 없는 제품 수 = 범위 전체 - 해당 알레르기가 있는 제품
+            allergen_scope = others('allergen_free')
+            allergen_total = allergen_scope.bit_count()
+            allergens = [
+                {'value': name, 'count': allergen_total - (allergen_scope & bits).bit_count()}
+                for name, bits in sorted(state.allergens.items())
+            ]
+
+        return {
+            'count': total.bit_count(),
+            'facets': {'category': categories, 'shape': shapes, 'price': prices, 'allergen_free': allergens},
+        }
+
+    def filter(self, expression, descending=True):
+        """필터식 -> FilterResult (기본: 최신 영양제(pk가 큰 것)부터)"""
+        return FilterResult(self.evaluate(expression), descending=descending)
+
+
+@lru_cache(maxsize=None)
+def get_filter_index():
+    return PillBitmapIndex(
+        refresh_limit=getattr(settings, 'PILL_FILTER_REFRESH_LIMIT', 500),
+        max_delta_versions=getattr(settings, 'PILL_FILTER_MAX_DELTA_VERSIONS', 100),
+    )
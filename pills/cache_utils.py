@@ -0,0 +1,236 @@
+# pills/cache_utils.py
+# 버전(세대) 번호를 이용한 캐시 무효화
+#
+# 캐시를 직접 지우는 대신, 캐시 키 안에 버전 번호를 넣어둡니다.
+# 데이터가 바뀌면 버전만 올리면 되고, 옛날 버전 키는 아무도 찾지 않다가 TTL이 지나면 사라집니다.
+#   - 카탈로그 버전: Pill이 하나라도 바뀌면 올라감 -> pill_index_* (목록/검색 결과)
+#   - 영양제별 버전: 해당 Pill(+ 성분/알레르기)이 바뀌면 올라감 -> pill_detail_*
+#   - 후기 버전: 해당 Pill의 후기/댓글/좋아요가 바뀌면 올라감 -> thread_list_*
+#   - 기준 데이터 버전: 카테고리/성분/알레르기가 바뀌면 올라감 -> pill_ref_* (카테고리/성분/알레르기 목록)
+#
+# 캐시를 채울 때는 get_or_fill()로 한 워커만 DB를 조회하게 합니다. (single-flight)
+
+import hashlib
+import json
+import secrets
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+CATALOG_VERSION_KEY = 'pill_catalog_version'
+PILL_VERSION_KEY = 'pill_version_{pk}'
+THREAD_VERSION_KEY = 'pill_threads_version_{pk}'
+REFERENCE_VERSION_KEY = 'pill_reference_version'
+
+
+class CacheFillTimeout(APIException):
+    """캐시를 채우는 다른 워커를 기다렸지만 값이 생기지 않음 -> 503 (잠시 후 다시 요청)"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = '요청이 많아 잠시 응답할 수 없습니다. 잠시 후 다시 시도해 주세요.'
+    default_code = 'cache_fill_timeout'
+
+
+def get_cache_ttl():
+    """버전으로 무효화되므로 TTL은 길게 잡아도 됩니다 (기본 6시간)"""
+    return getattr(settings, 'PILL_CACHE_TTL', 60 * 60 * 6)
+
+
+def get_stale_ttl():
+    """TTL이 지난 뒤에도 다른 워커가 갱신하는 동안 옛 값을 내보낼 수 있는 추가 시간"""
+    return getattr(settings, 'PILL_CACHE_STALE_TTL', 60 * 10)
+
+
+def _initial_version():
+    # 버전 키가 Redis에서 사라졌다가 다시 만들어질 때 옛날 번호와 겹치지 않도록 현재 시각(ms)으로 시작
+    return int(time.time() * 1000)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # 키가 없으면 새 번호로 시작
+        version = _initial_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+# ==========================================
+# 1. 카탈로그(전체 목록) 버전
+# ==========================================
+def get_catalog_version():
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    return _bump_version(CATALOG_VERSION_KEY)
+
+
+# ==========================================
+# 2. 영양제별 버전
+# ==========================================
+def get_pill_version(pill_pk):
+    return _get_version(PILL_VERSION_KEY.format(pk=pill_pk))
+
+
+def bump_pill_versions(pill_pks):
+    for pk in set(pill_pks):
+        _bump_version(PILL_VERSION_KEY.format(pk=pk))
+
+
+# ==========================================
+# 3. 영양제별 후기 버전
+# ==========================================
+def get_thread_version(pill_pk):
+    return _get_version(THREAD_VERSION_KEY.format(pk=pill_pk))
+
+
+def bump_thread_version(pill_pk):
+    return _bump_version(THREAD_VERSION_KEY.format(pk=pill_pk))
+
+
+# ==========================================
+# 4. 기준 데이터(카테고리/성분/알레르기) 버전
+# ==========================================
+def get_reference_version():
+    return _get_version(REFERENCE_VERSION_KEY)
+
+
+def bump_reference_version():
+    return _bump_version(REFERENCE_VERSION_KEY)
+
+
+# ==========================================
+# 5. 캐시 키 생성
+# ==========================================
+def index_cache_key(search_type, keyword, shapes, page, value_filters=''):
+    # value_filters: 가성비 범위 필터 구분값 (pills/value_metrics.py value_filter_token)
+    return f"pill_index_v{get_catalog_version()}_{search_type}_{keyword}_{shapes}_{value_filters}_{page}"
+
+
+def detail_cache_key(pill_pk):
+    return f"pill_detail_{pill_pk}_v{get_pill_version(pill_pk)}"
+
+
+def thread_list_cache_key(pill_pk, page):
+    return f"thread_list_{pill_pk}_v{get_thread_version(pill_pk)}_{page}"
+
+
+def substance_pills_cache_key(substance_id, categories, shapes, page, value_filters=''):
+    return f"substance_pills_v{get_catalog_version()}_{substance_id}_{categories}_{shapes}_{value_filters}_{page}"
+
+
+def index_count_cache_key(search_type, keyword, shapes, value_filters='', sort=''):
+    # 커서 페이지네이션의 전체 개수(근사값): 버전 없이 PILL_APPROX_COUNT_TTL 동안 재사용 (pills/pagination.py)
+    # 가성비순 정렬은 값이 있는 영양제만 세므로 정렬 이름도 구분
+    return f"pill_index_count_{search_type}_{keyword}_{shapes}_{value_filters}_{sort}"
+
+
+def reference_cache_key(name, *parts):
+    # 카테고리/성분/알레르기 목록. 전체 성분명 목록처럼 영양제 데이터에서 뽑는 것은 카탈로그 버전도 넣어서 호출
+    suffix = '_'.join(str(part) for part in parts)
+    return f"pill_ref_{name}_v{get_reference_version()}_{suffix}"
+
+
+def pill_filter_cache_key(expression, page):
+    return f"pill_filter_v{get_catalog_version()}_{expression}_{page}"
+
+
+def facets_cache_key(query):
+    # 조건 조합이 길어질 수 있으므로 정리된 조건(pills/facets.py)의 해시로
+    digest = hashlib.md5(json.dumps(query, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    return f"pill_facets_v{get_catalog_version()}_{digest}"
+
+
+# ==========================================
+# 5. 캐시 채우기 (single-flight + stale-while-revalidate)
+# ==========================================
+# 캐시에는 {'value': 값, 'fresh_until': 만료 시각} 형태로 저장합니다.
+#   - fresh_until 이전(soft TTL): 그대로 사용
+#   - fresh_until 이후 ~ 실제 만료(hard TTL = ttl + stale_ttl): 한 워커만 갱신, 나머지는 옛 값 사용
+#   - 값이 아예 없을 때: 한 워커만 DB 조회, 나머지는 잠깐 기다렸다가 그 결과를 사용
+def fill_cache(key, value, ttl=None, stale_ttl=None):
+    ttl = get_cache_ttl() if ttl is None else ttl
+    stale_ttl = get_stale_ttl() if stale_ttl is None else stale_ttl
+    entry = {'value': value, 'fresh_until': time.time() + ttl}
+    cache.set(key, entry, ttl + stale_ttl)
+
+
+def get_or_fill(key, builder, ttl=None, stale_ttl=None, lock_timeout=10, wait_timeout=3, poll_interval=0.05):
+    """
+    key에 캐시된 값을 반환하고, 없거나 soft TTL이 지났으면 builder()로 다시 채웁니다.
+    동시에 여러 요청이 들어와도 builder()는 락(cache.add = Redis SET NX)을 잡은 한 곳에서만 실행됩니다.
+    옛 값도 없이 wait_timeout초를 기다려도 채워지지 않으면 CacheFillTimeout (기다린 요청이 모두 DB로 몰리지 않게)
+    """
+    entry = cache.get(key)
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry['value']
+
+    lock_key = f'{key}:lock'
+    token = secrets.randbits(62)
+    if cache.add(lock_key, token, lock_timeout):
+        return _fill_locked(key, lock_key, token, builder, ttl, stale_ttl)
+
+    # 다른 워커가 갱신 중 -> 옛 값이 있으면 그걸로 응답
+    if entry is not None:
+        return entry['value']
+
+    # 옛 값도 없으면 갱신이 끝날 때까지 잠깐 대기
+    deadline = time.time() + wait_timeout
+    while time.time() < deadline:
+        time.sleep(poll_interval)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+        # 락을 잡은 워커가 채우지 못하고 끝났으면 (builder 에러, 워커가 죽어서 락 만료) 한 워커만 이어서 채움
+        if cache.add(lock_key, token, lock_timeout):
+            return _fill_locked(key, lock_key, token, builder, ttl, stale_ttl)
+
+    raise CacheFillTimeout()
+
+
+def _fill_locked(key, lock_key, token, builder, ttl, stale_ttl):
+    try:
+        # 캐시를 확인한 직후에 다른 워커가 채우고 락을 풀었을 수 있으므로 락을 잡은 뒤 한 번 더 확인
+        entry = cache.get(key)
+        if entry is not None and entry['fresh_until'] > time.time():
+            return entry['value']
+        value = builder()
+        fill_cache(key, value, ttl, stale_ttl)
+        return value
+    finally:
+        _release_lock(lock_key, token)
+
+
+# 값이 내 토큰일 때만 지우는 Lua 스크립트 (GET + DEL을 한 번에)
+_RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+def _release_lock(lock_key, token):
+    """
+    내가 잡은 락일 때만 지움.
+    builder()가 lock_timeout보다 오래 걸려서 락이 만료되고 다른 워커가 새로 잡았으면 그 락은 그대로 둠
+    """
+    try:
+        from django_redis import get_redis_connection
+        conn = get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        conn = None
+    if conn is not None:
+        # django-redis는 정수 값을 그대로(문자열로) 저장하므로 토큰과 바로 비교 가능
+        conn.eval(_RELEASE_SCRIPT, 1, cache.make_key(lock_key), token)
+    elif cache.get(lock_key) == token:
+        # Redis가 아닌 캐시(테스트의 LocMem 등)는 원자적으로 비교할 방법이 없으므로 확인 후 삭제
+        cache.delete(lock_key)
@@ -0,0 +1,160 @@
+# pills/catalog_index.py
+# 챗봇(get_pill_recommendation)용 제품 카탈로그 메모리 인덱스
+#
+# 요청마다 pills_lite_final.json을 다시 읽고 전체 제품에 점수를 매기던 것을,
+# 프로세스당 한 번만 읽어서 키워드 -> 제품 역색인(NgramIndex)으로 검색하도록 바꿉니다.
+#   - 첫 검색 때 파일을 읽고, 이후에는 파일 수정 시각(mtime)이 바뀐 경우에만 다시 읽음
+#   - 점수: TF-IDF 색인(<카탈로그>.tfidf, pills/tfidf_index.py)이 있으면 질문과의 코사인 유사도
+#           색인이 없거나 원본과 맞지 않으면 기존 규칙 (2글자 이상 단어가 기능성에 있으면 +2, 제품명에 있으면 +1)
+#   - 상위 k개는 heapq로 뽑고, 점수가 같으면 랜덤 (기존 shuffle + sort와 같은 효과)
+
+import heapq
+import os
+import random
+import threading
+import time
+
+from .fixture_io import iter_json_items
+from .ngram_index import NgramIndex
+from .tfidf_index import TfidfIndex, file_digest
+
+
+def iter_catalog(path):
+    """카탈로그 파일의 제품을 순서대로 (제품 번호 = 파일 안 순서, TF-IDF 색인과 같은 순서)"""
+    for doc_id, item in enumerate(iter_json_items(path)):
+        fields = item.get('fields', {})
+        yield {
+            "id": item.get('pk', doc_id),
+            "name": fields.get('PRDLST_NM', ''),
+            "function": fields.get('PRIMARY_FNCLTY', ''),
+            "shape_info": f"{fields.get('PRDT_SHAP_CD_NM', '')} ({fields.get('DISPOS', '')})",
+            "usage": fields.get('NTK_MTHD', ''),
+        }
+
+
+def default_index_path(path):
+    return os.path.splitext(path)[0] + '.tfidf'
+
+
+class CatalogIndex:
+
+    def __init__(self, path, check_interval=5, index_path=None):
+        self.path = path
+        self.index_path = index_path or default_index_path(path)
+        self.check_interval = check_interval  # mtime 확인 주기 (초)
+        # (제품 목록, 기능성 인덱스, 제품명 인덱스, TF-IDF 색인) -> 다시 읽을 때 한 번에 교체
+        self._state = ([], None, None, None)
+        self._mtime = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def _load_tfidf(self, n_docs):
+        """미리 만든 TF-IDF 색인을 열고, 원본 카탈로그와 맞지 않으면 None"""
+        if not os.path.exists(self.index_path):
+            print("⚠️ TF-IDF 색인이 없어 키워드 검색을 사용합니다. (python manage.py build_catalog_index)")
+            return None
+        try:
+            index = TfidfIndex(self.index_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ TF-IDF 색인을 열 수 없어 키워드 검색을 사용합니다: {e}")
+            return None
+        if index.n_docs != n_docs or index.source_digest != file_digest(self.path):
+            print("⚠️ 카탈로그가 바뀌어 TF-IDF 색인을 사용하지 않습니다. (python manage.py build_catalog_index)")
+            return None
+        return index
+
+    def _load(self):
+        products = list(iter_catalog(self.path))
+        tfidf = self._load_tfidf(len(products))
+        if tfidf is not None:
+            self._state = (products, None, None, tfidf)
+            return
+
+        # 기능성 문구는 길어서 바이그램만 색인 (메모리 절약, 긴 단어는 검색 시 실제 포함 여부로 확인)
+        self._state = (
+            products,
+            NgramIndex.build(((doc_id, p['function']) for doc_id, p in enumerate(products)), sizes=(2,)),
+            NgramIndex.build((doc_id, p['name']) for doc_id, p in enumerate(products)),
+            None,
+        )
+
+    def _mtimes(self):
+        try:
+            index_mtime = os.stat(self.index_path).st_mtime
+        except FileNotFoundError:
+            index_mtime = None
+        return (os.stat(self.path).st_mtime, index_mtime)
+
+    def ensure_loaded(self):
+        """카탈로그나 TF-IDF 색인 파일이 바뀌었으면 다시 읽음. 카탈로그 파일이 없으면 False"""
+        now = time.time()
+        if self._mtime is not None and now - self._checked_at < self.check_interval:
+            return True
+
+        with self._lock:
+            try:
+                mtime = self._mtimes()
+            except FileNotFoundError:
+                print(f"❌ 오류: '{self.path}' 파일이 없습니다.")
+                return self._mtime is not None
+            if mtime != self._mtime:
+                self._load()
+                self._mtime = mtime
+            self._checked_at = now
+        return True
+
+    def search(self, user_input, k=5, seed=None):
+        """
+        user_input과 관련된 제품 k개 (점수 높은 순, 동점은 랜덤).
+        seed를 주면 같은 seed에 대해 항상 같은 제품이 뽑힘 (추천 캐시 키를 안정적으로 만들기 위해)
+        """
+        rng = random.Random(seed) if seed is not None else random
+        if not self.ensure_loaded():
+            return []
+        products, function_index, name_index, tfidf = self._state
+        if not products:
+            return []
+
+        if tfidf is not None:
+            scores = tfidf.scores(user_input)
+        else:
+            scores = self._keyword_scores(user_input, function_index, name_index)
+
+        picked = self._top_k(scores, k, rng)
+
+        # 점수가 있는 제품이 k개보다 적으면 나머지는 기존처럼 아무 제품으로 채움
+        if len(picked) < k:
+            need = min(k - len(picked), len(products) - len(scores))
+            while need > 0:
+                doc_id = rng.randrange(len(products))
+                if doc_id not in scores:
+                    scores[doc_id] = 0
+                    picked.append(doc_id)
+                    need -= 1
+
+        return [dict(products[doc_id], score=scores[doc_id]) for doc_id in picked]
+
+    @staticmethod
+    def _top_k(scores, k, rng):
+        """(점수, 랜덤값) 기준 상위 k개. 랜덤값은 k번째 점수와 동점인 제품들에만 뽑음 (제품마다 뽑으면 느림)"""
+        if len(scores) <= k:
+            top = list(scores)
+        else:
+            threshold = heapq.nlargest(k, scores.values())[-1]
+            top = [doc_id for doc_id, score in scores.items() if score > threshold]
+            tied = [doc_id for doc_id, score in scores.items() if score == threshold]
+            top += rng.sample(tied, k - len(top))
+        tiebreak = {doc_id: rng.random() for doc_id in top}
+        return sorted(top, key=lambda doc_id: (scores[doc_id], tiebreak[doc_id]), reverse=True)
+
+    @staticmethod
+    def _keyword_scores(user_input, function_index, name_index):
+        scores = {}
+        for word in user_input.split():
+            if len(word) < 2:
+                continue
+            for doc_id in function_index.search(word) or []:
+                scores[doc_id] = scores.get(doc_id, 0) + 2
+            for doc_id in name_index.search(word) or []:
+                scores[doc_id] = scores.get(doc_id, 0) + 1
+        return scores
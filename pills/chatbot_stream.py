@@ -0,0 +1,154 @@
+# pills/chatbot_stream.py
+# 챗봇 추천 답변 스트리밍 (Server-Sent Events) -> views.chatbot_stream_view
+#
+# 기존 /pills/chatbot/ 은 Gemini 답변이 다 만들어질 때까지(수 초) 워커 하나를 붙잡고 기다렸습니다.
+# 스트리밍 버전은 Gemini streamGenerateContent(alt=sse)로 받은 토큰 조각을 바로 브라우저에 SSE로 넘깁니다.
+#   - ASGI 서버(uvicorn mypjt.asgi:application)에서 async 뷰로 실행 -> 응답을 기다리는 동안 이벤트 루프를 막지 않음
+#   - Gemini 스트림은 requests(stream=True)로 전용 스레드에서 읽고, asyncio.Queue로 이벤트 루프에 전달
+#     (타임아웃/동시 호출 수/서킷 브레이커는 pills/outbound.py의 'gms' 설정을 일반 챗봇과 같이 사용)
+#   - 추천 캐시(pills/reco_cache.py)와 키를 공유: 캐시에 있으면 저장된 답변을 바로 한 번에 보내고,
+#     스트림이 끝까지 성공한 경우에만 전체 답변을 캐시에 저장
+#
+# 이벤트 형식
+#   event: token  data: {"text": "..."}      (답변 조각, 여러 번)
+#   event: error  data: {"message": "..."}   (실패, 이후 스트림 종료)
+#   event: done   data: {"cached": false}    (정상 종료)
+
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from . import reco_cache
+from .outbound import OutboundUnavailable, get_provider
+from .utils import (
+    CATALOG_INDEX,
+    GMS_KEY,
+    NO_PRODUCTS_MESSAGE,
+    STREAM_URL,
+    UNAVAILABLE_MESSAGE,
+    RecommendationError,
+    build_recommendation_payload,
+    search_relevant_products,
+)
+
+# Gemini 스트림을 읽는 스레드 (동시에 스트리밍할 수 있는 답변 수)
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'CHATBOT_STREAM_WORKERS', 64),
+    thread_name_prefix='chatbot-stream',
+)
+_END = object()
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def iter_recommendation_chunks(user_input, products, stop=None):
+    """Gemini SSE 응답에서 텍스트 조각을 하나씩 yield (동기, 실패하면 RecommendationError)"""
+    url = f"{STREAM_URL}&key={GMS_KEY}"
+    payload = build_recommendation_payload(user_input, products)
+    timeout = getattr(settings, 'CHATBOT_STREAM_TIMEOUT', (3, 30))
+
+    try:
+        with get_provider('gms').stream('POST', url, json=payload, verify=False, timeout=timeout) as response:
+            if response.status_code != 200:
+                raise RecommendationError(f"API 호출 오류: {response.text}")
+            # SSE는 항상 UTF-8 -> 바이트 단위로 줄을 나눈 뒤 줄마다 디코딩
+            # (charset이 없으면 requests가 ISO-8859-1로 디코딩해서 한글이 깨지고 줄도 잘못 나뉨)
+            for line in response.iter_lines():
+                if stop is not None and stop.is_set():
+                    return  # 클라이언트가 연결을 끊음 -> 업스트림도 닫음
+                if not line.startswith(b'data:'):
+                    continue
+                chunk = json.loads(line[len(b'data:'):].decode('utf-8'))
+                for candidate in chunk.get('candidates', [])[:1]:
+                    for part in candidate.get('content', {}).get('parts', []):
+                        if part.get('text'):
+                            yield part['text']
+    except RecommendationError:
+        raise
+    except OutboundUnavailable:
+        raise RecommendationError(UNAVAILABLE_MESSAGE)
+    except Exception as e:
+        raise RecommendationError(f"오류 발생: {e}")
+
+
+async def astream_recommendation(user_input, products):
+    """iter_recommendation_chunks를 스레드에서 돌리고 조각을 async로 전달"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # 이벤트 루프가 이미 닫힘
+
+    def produce():
+        try:
+            for text in iter_recommendation_chunks(user_input, products, stop):
+                put(text)
+        except RecommendationError as e:
+            put(e)
+        finally:
+            put(_END)
+
+    loop.run_in_executor(_executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                return
+            if isinstance(item, RecommendationError):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+async def recommendation_events(user_input, use_cache=True):
+    """get_pill_recommendation의 스트리밍 버전. SSE 이벤트 문자열을 yield"""
+    if not await asyncio.to_thread(CATALOG_INDEX.ensure_loaded):
+        yield sse_event('error', {'message': "영양제 데이터를 불러올 수 없습니다."})
+        return
+
+    normalized = reco_cache.normalize_query(user_input)
+    candidates = search_relevant_products(user_input, seed=normalized)
+    if not candidates:
+        yield sse_event('token', {'text': NO_PRODUCTS_MESSAGE})
+        yield sse_event('done', {'cached': False})
+        return
+
+    cache_enabled = reco_cache.is_enabled()
+    cache_key = reco_cache.make_key(normalized, [p['id'] for p in candidates])
+    if cache_enabled and use_cache:
+        cached = await asyncio.to_thread(reco_cache.get_reply, cache_key)
+        if cached is not None:
+            yield sse_event('token', {'text': cached})
+            yield sse_event('done', {'cached': True})
+            return
+
+    parts = []
+    try:
+        async for text in astream_recommendation(user_input, candidates):
+            parts.append(text)
+            yield sse_event('token', {'text': text})
+    except RecommendationError as e:
+        # 아무 조각도 못 받았고 저장된 답변이 있으면 그걸로 대신함 (에러는 캐시하지 않음)
+        if cache_enabled and not use_cache and not parts:
+            cached = await asyncio.to_thread(reco_cache.get_reply, cache_key)
+            if cached is not None:
+                yield sse_event('token', {'text': cached})
+                yield sse_event('done', {'cached': True})
+                return
+        yield sse_event('error', {'message': str(e)})
+        return
+
+    reply = ''.join(parts)
+    if cache_enabled and reply:
+        await asyncio.to_thread(reco_cache.store_reply, cache_key, reply)
+    yield sse_event('done', {'cached': False})
@@ -0,0 +1,60 @@
+# pills/documents.py
+# 영양제 상세 응답 문서 (PillDocument) 만들기 / 읽기
+#
+# detail은 Pill + 카테고리 + 성분(nutrient_details) + 알레르기(allergens_info)를 조회하고 (쿼리 3번 이상)
+# PillDetailSerializer로 모든 필드를 직렬화했습니다. 응답이 바뀌는 건 이 데이터가 바뀔 때뿐이므로
+# 직렬화 결과를 PillDocument.body(JSON)에 저장해 두고, 상세는 pk 조회 한 번으로 읽습니다.
+#   - 영양제/성분/알레르기가 바뀌면 invalidate_pills()(pills/signals.py)가 해당 영양제 문서만 다시 만듦
+#   - 카테고리 이름이 바뀌면 그 카테고리 영양제 문서를 다시 만듦
+#   - 처음 한 번 / 직렬화 형식을 바꾼 뒤: python manage.py build_pill_documents
+#   - 문서가 없는 영양제는 detail이 그 자리에서 만들어 저장
+
+from .models import Pill, PillDocument
+from .serializers import PillDetailSerializer
+
+# 한 번에 다시 만드는 영양제 수 (SQLite 파라미터 개수 제한)
+BUILD_CHUNK_SIZE = 500
+
+
+def document_queryset():
+    return Pill.objects.select_related('category').prefetch_related('nutrient_details', 'allergens_info')
+
+
+def build_document_body(pill):
+    """Pill (category/nutrient_details/allergens_info 미리 조회) -> 상세 응답 데이터"""
+    return PillDetailSerializer(pill).data
+
+
+def save_documents(pills):
+    """Pill 목록 -> 문서 upsert. 저장한 개수"""
+    documents = [PillDocument(pill=pill, body=build_document_body(pill)) for pill in pills]
+    if documents:
+        PillDocument.objects.bulk_create(
+            documents, update_conflicts=True, unique_fields=['pill'], update_fields=['body', 'updated_at'],
+        )
+    return len(documents)
+
+
+def rebuild_documents(pill_ids):
+    """해당 영양제 문서를 다시 만듦 (삭제된 영양제 문서는 지움)"""
+    pill_ids = list(pill_ids)
+    for i in range(0, len(pill_ids), BUILD_CHUNK_SIZE):
+        chunk = pill_ids[i:i + BUILD_CHUNK_SIZE]
+        pills = list(document_queryset().filter(pk__in=chunk))
+        save_documents(pills)
+        missing = set(chunk) - {pill.pk for pill in pills}
+        if missing:
+            # 영양제 삭제 중 성분/알레르기 삭제 시그널이 먼저 와서 다시 만든 문서도 여기서 정리됨
+            PillDocument.objects.filter(pk__in=missing).delete()
+
+
+def get_document(pill_pk):
+    """상세 응답 데이터 (문서 pk 조회 한 번). 문서가 없으면 만들어서 저장, 영양제가 없으면 None"""
+    body = PillDocument.objects.filter(pk=pill_pk).values_list('body', flat=True).first()
+    if body is not None:
+        return body
+    pill = document_queryset().filter(pk=pill_pk).first()
+    if pill is None:
+        return None
+    save_documents([pill])
+    return build_document_body(pill)
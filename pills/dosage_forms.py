@@ -0,0 +1,76 @@
+# pills/dosage_forms.py
+# 제형(PRDT_SHAP_CD_NM) 정규화
+#
+# 원문 제형 값은 '정제', '츄어블정', '연질캡슐', '분말', '젤리' 처럼 제각각이라
+# 지금까지는 화면의 제형 버튼('정(알약)', '분말(가루)' ...)을 여러 개의 __icontains 조건으로 풀어서 찾았습니다.
+# (인덱스를 쓸 수 없고, index와 substance_pills가 서로 다르게 풀고 있었음)
+# 저장할 때 원문을 아래 제형 코드 하나로 정해서 Pill.dosage_form(db_index)에 넣어두고,
+# 제형 필터는 dosage_form__in 한 번으로 처리합니다.
+#   - Pill.save() / load_pills_data 에서 자동으로 채움
+#   - 기존 데이터나 매핑을 바꾼 뒤에는: python manage.py backfill_dosage_forms
+
+TABLET = 'tablet'
+CAPSULE = 'capsule'
+POWDER = 'powder'
+GRANULE = 'granule'
+LIQUID = 'liquid'
+PILL = 'pill'
+JELLY = 'jelly'
+OTHER = 'other'
+
+# (코드, 화면에 보이는 이름) -> Pill.dosage_form choices
+DOSAGE_FORM_CHOICES = (
+    (TABLET, '정(알약)'),
+    (CAPSULE, '캡슐'),
+    (POWDER, '분말(가루)'),
+    (GRANULE, '과립'),
+    (LIQUID, '액상'),
+    (PILL, '환'),
+    (JELLY, '젤리'),
+    (OTHER, '기타'),
+)
+
+# 원문에 이 단어가 들어 있으면 해당 제형 (위에서부터 먼저 맞는 것. '연질캡슐'이 '정'보다 먼저 잡히도록 캡슐이 앞)
+NORMALIZE_RULES = (
+    (CAPSULE, ('캡슐', '캅셀', 'capsule')),
+    (JELLY, ('젤리', '겔', '젤', 'jelly', 'gel')),
+    (TABLET, ('정', '알약', 'tablet')),
+    (POWDER, ('분말', '가루', 'powder')),
+    (GRANULE, ('과립', 'granule')),
+    (LIQUID, ('액상', '시럽', '음료', '액', 'liquid', 'syrup')),
+    (PILL, ('환',)),
+    (OTHER, ('기타',)),
+)
+
+_CODES = {code for code, _ in DOSAGE_FORM_CHOICES}
+_LABELS = {label: code for code, label in DOSAGE_FORM_CHOICES}
+
+
+def match_dosage_form(text):
+    """원문 -> 제형 코드. 어느 규칙에도 맞지 않으면 None"""
+    text = (text or '').strip().lower()
+    if not text:
+        return None
+    for code, words in NORMALIZE_RULES:
+        if any(word in text for word in words):
+            return code
+    return None
+
+
+def normalize_dosage_form(text):
+    """저장용: 원문 -> 제형 코드 (모르는 값은 기타)"""
+    return match_dosage_form(text) or OTHER
+
+
+def dosage_forms_for(values):
+    """
+    제형 필터 값들 -> 제형 코드 리스트
+    화면 이름('정(알약)'), 코드('tablet'), 원문 단어('정제', '캡슐') 모두 허용. 알 수 없는 값은 무시
+    """
+    codes = []
+    for value in values:
+        value = (value or '').strip()
+        code = _LABELS.get(value) or (value.lower() if value.lower() in _CODES else match_dosage_form(value))
+        if code and code not in codes:
+            codes.append(code)
+    return codes
@@ -0,0 +1,134 @@
+# pills/enrichment.py
+# 네이버 쇼핑 정보(가격/구매링크/이미지) 수집 작업 큐
+#
+# detail 뷰에서 네이버 API를 직접 부르면 사용자 요청이 외부 API 응답을 기다려야 하므로,
+# 뷰에서는 EnrichmentJob만 등록하고 실제 조회는 run_enrichment_worker 명령어가 처리합니다.
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EnrichmentJob, Pill
+from .value_metrics import VALUE_FIELDS, apply_value_metrics
+
+# 네이버 결과를 저장할 때 바뀌는 Pill 필드 (가격이 바뀌면 가성비도 다시 계산)
+ENRICHMENT_FIELDS = ['purchase_url', 'price', 'mall_name', 'cover', 'amount', 'unit_type', *VALUE_FIELDS]
+
+
+def needs_enrichment(pill):
+    """URL이 없거나, 가격이 없거나 실패(-1)했던 경우 -> 네이버 검색 대상"""
+    return not pill.purchase_url or pill.price in (None, 0, -1)
+
+
+def document_needs_enrichment(document):
+    """상세 문서(pills/documents.py)로 needs_enrichment 판단 (Pill을 다시 조회하지 않음)"""
+    return not document.get('purchase_url') or document.get('price') in (None, 0, -1)
+
+
+def apply_link_data(pill, link_data):
+    """get_purchase_link() 결과를 Pill 객체에 반영 (저장은 호출한 쪽에서)"""
+    if link_data:
+        pill.purchase_url = link_data['link']
+        pill.price = link_data['price']
+        pill.mall_name = link_data['mall']
+        pill.cover = link_data.get('image') or pill.cover
+        # 수량(amount)과 단위(unit_type)는 찾은 경우에만 저장
+        if link_data.get('amount'):
+            pill.amount = link_data['amount']
+            pill.unit_type = link_data.get('unit_type')
+        apply_value_metrics(pill)
+        return True
+
+    # 검색 결과 없음 또는 제조사 불일치 -> 목록에서 숨김(-1)
+    pill.price = -1
+    pill.purchase_url = ""
+    apply_value_metrics(pill)
+    return False
+
+
+def enqueue_enrichment(pill_ids):
+    """
+    작업 등록 (이미 대기/처리 중인 작업이 있으면 무시).
+    완료/실패한 작업은 ENRICHMENT_RETRY_AFTER(초)가 지난 경우에만 다시 대기 상태로 돌립니다.
+    """
+    pill_ids = list(pill_ids)
+    if not pill_ids:
+        return
+
+    EnrichmentJob.objects.bulk_create(
+        [EnrichmentJob(pill_id=pk) for pk in pill_ids],
+        ignore_conflicts=True,
+    )
+
+    retry_after = getattr(settings, 'ENRICHMENT_RETRY_AFTER', 60 * 60 * 24)
+    EnrichmentJob.objects.filter(
+        pill_id__in=pill_ids,
+        status__in=['done', 'failed'],
+        updated_at__lt=timezone.now() - timedelta(seconds=retry_after),
+    ).update(status='pending', attempts=0, last_error='', next_attempt_at=None)
+
+
+def retry_delay(attempts):
+    """attempts번 실패한 작업을 다시 시도하기까지 기다릴 시간(초): 기본 1분, 2분, 4분 ... 최대 ENRICHMENT_RETRY_BACKOFF_MAX"""
+    base = getattr(settings, 'ENRICHMENT_RETRY_BACKOFF', 60)
+    limit = getattr(settings, 'ENRICHMENT_RETRY_BACKOFF_MAX', 60 * 60)
+    return min(base * 2 ** max(attempts - 1, 0), limit)
+
+
+def schedule_retry(job, now=None):
+    """
+    에러 난 작업을 다시 대기 상태로 (저장은 save_results에서)
+    바로 다시 가져가면 네이버 장애 때 같은 작업을 계속 호출해서 하루 한도만 쓰므로 next_attempt_at까지 미룸
+    """
+    now = now or timezone.now()
+    job.status = 'pending'
+    job.worker_token = ''
+    job.next_attempt_at = now + timedelta(seconds=retry_delay(job.attempts))
+
+
+def claim_jobs(batch_size):
+    """
+    대기 중인 작업을 batch_size개 가져와서 이 워커 것으로 표시합니다.
+    워커가 여러 개여도 같은 작업을 두 번 처리하지 않도록 worker_token으로 구분합니다.
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    job_ids = list(
+        EnrichmentJob.objects.filter(status='pending')
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not job_ids:
+        return []
+
+    EnrichmentJob.objects.filter(pk__in=job_ids, status='pending').update(
+        status='running', worker_token=token, updated_at=now
+    )
+    return list(
+        EnrichmentJob.objects.filter(worker_token=token, status='running').select_related('pill')
+    )
+
+
+def requeue_stale_jobs(timeout_seconds=600):
+    """처리 중에 워커가 죽어서 남은 작업을 다시 대기 상태로 돌립니다."""
+    return EnrichmentJob.objects.filter(
+        status='running',
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout_seconds),
+    ).update(status='pending', worker_token='')
+
+
+def save_results(pills, jobs):
+    """처리 결과를 bulk_update로 한 번에 저장 (pill_rows_changed -> 캐시 무효화)"""
+    if pills:
+        Pill.objects.bulk_update(pills, ENRICHMENT_FIELDS)
+    if jobs:
+        now = timezone.now()
+        for job in jobs:
+            job.updated_at = now
+        EnrichmentJob.objects.bulk_update(
+            jobs, ['status', 'attempts', 'last_error', 'worker_token', 'next_attempt_at', 'updated_at']
+        )
@@ -0,0 +1,330 @@
+# pills/enrichment_pipeline.py
+# 네이버 쇼핑 정보 일괄 수집 파이프라인 (enrich_pills 명령어)
+#
+#   select  : 대상(DB 또는 JSON 픽스처)에서 검색이 필요한 항목을 키 순서대로 chunk 단위로 가져옴 (keyset)
+#   fetch   : 네이버 쇼핑 검색 (공용 클라이언트 -> 초당 10회 / 하루 한도 준수, asyncio로 동시 조회)
+#   match   : 제조사/제품명 검증 (utils.is_valid_match) 후 가격/링크/수량 추출
+#   persist : chunk 단위로 한 번에 저장 (DB: bulk_update / JSON: 작업 파일에 이어 쓰기)
+#
+# chunk를 저장할 때마다 EnrichmentCheckpoint에 마지막 키를 기록하므로,
+# 중간에 멈추거나 하루 한도를 다 쓰면 다음 실행(다음 날)에 그 다음 항목부터 이어서 처리합니다.
+
+import asyncio
+import os
+import time
+from collections import deque
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .enrichment import ENRICHMENT_FIELDS, apply_link_data
+from .fixture_io import JsonLinesWriter, iter_json_items, write_json_array
+from .models import EnrichmentCheckpoint, Pill
+from .value_metrics import VALUE_FIELDS, compute_value_metrics
+from .naver_client import NaverQuotaExceeded, get_naver_client
+from .outbound import OutboundUnavailable
+from .utils import aget_purchase_link
+
+
+# ==========================================
+# 1. 대상 (select / persist)
+# ==========================================
+class DbTarget:
+    """Pill 테이블을 pk 순서로 처리"""
+
+    # 선택 조건
+    #   unpriced : 아직 한 번도 검색하지 않은 영양제 (price가 비어 있음)
+    #   no-link  : 구매 링크가 없는 영양제 (검색 실패(-1)였던 것도 다시 검색)
+    SELECTIONS = {
+        'unpriced': Q(price__isnull=True),
+        'no-link': Q(purchase_url__isnull=True) | Q(purchase_url=''),
+    }
+
+    def __init__(self, selection='unpriced', batch_size=500):
+        self.selection = selection
+        self.batch_size = batch_size
+        self.queryset = (
+            Pill.objects.filter(self.SELECTIONS[selection])
+            .only('id', 'PRDLST_NM', 'BSSH_NM', 'NTK_MTHD', *ENRICHMENT_FIELDS)  # NTK_MTHD: 가성비 계산용
+            .order_by('pk')
+        )
+
+    @property
+    def name(self):
+        return f'db:{self.selection}'
+
+    def resume_key(self, checkpoint_key):
+        return checkpoint_key
+
+    def reset(self):
+        pass
+
+    def remaining(self, after_key):
+        return self.queryset.filter(pk__gt=after_key).count()
+
+    def select(self, after_key, size):
+        """[(키, 제품명, 제조사, 객체)] -> OFFSET 없이 pk > 마지막 키 조건으로 다음 chunk 조회"""
+        return [
+            (pill.pk, pill.PRDLST_NM, pill.BSSH_NM, pill)
+            for pill in self.queryset.filter(pk__gt=after_key)[:size]
+        ]
+
+    def apply(self, pill, link_data):
+        return apply_link_data(pill, link_data)
+
+    def persist(self, pills):
+        # pill_rows_changed 신호 -> 검색 색인/캐시 버전 갱신
+        Pill.objects.bulk_update(pills, ENRICHMENT_FIELDS, batch_size=self.batch_size)
+
+    def flush(self, last_key, finished=False):
+        pass  # bulk_update가 바로 반영됨
+
+    def finish(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class JsonTarget:
+    """
+    Django 픽스처 형식 JSON 파일([{'model', 'pk', 'fields'}, ...])을 항목 단위로 스트리밍 처리.
+
+    입력 파일은 한 번에 읽지 않고 fixture_io.iter_json_items()로 하나씩 읽고,
+    처리가 끝난 항목은 입력 순서대로 작업 파일(output + '.partial.jsonl')에 바로 이어 붙입니다.
+    모든 항목을 처리하면 작업 파일을 output JSON 배열로 변환합니다.
+    (키 = 입력 순번(1부터), 작업 파일의 줄 수가 곧 다음에 이어서 시작할 위치)
+    """
+
+    def __init__(self, input_path, output_path):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.journal_path = f'{output_path}.partial.jsonl'
+        self.writer = None
+        self._items = None           # 입력 스트림: (키, 항목)
+        self._pending = deque()      # 읽었지만 아직 작업 파일에 쓰지 않은 (키, 항목)
+
+    @property
+    def name(self):
+        return f'json:{os.path.basename(self.output_path)}'
+
+    @staticmethod
+    def _needs_lookup(fields):
+        return not fields.get('cover') or not fields.get('purchase_url')
+
+    def resume_key(self, checkpoint_key):
+        # 체크포인트보다 작업 파일에 실제로 쓴 줄 수가 정확함
+        self.writer = JsonLinesWriter(self.journal_path)
+        return self.writer.count
+
+    def reset(self):
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._items = None
+        self._pending.clear()
+
+    def remaining(self, after_key):
+        return sum(
+            1 for idx, item in enumerate(iter_json_items(self.input_path))
+            if idx >= after_key and self._needs_lookup(item['fields'])
+        )
+
+    def select(self, after_key, size):
+        if self._items is None:
+            self._items = enumerate(iter_json_items(self.input_path), start=1)
+            # 이미 작업 파일에 쓴 항목은 건너뜀
+            for _ in islice(self._items, after_key):
+                pass
+
+        chunk = []
+        for key, item in self._items:
+            self._pending.append((key, item))
+            fields = item['fields']
+            if self._needs_lookup(fields):
+                chunk.append((key, fields.get('PRDLST_NM'), fields.get('BSSH_NM'), fields))
+                if len(chunk) >= size:
+                    break
+        return chunk
+
+    def apply(self, fields, link_data):
+        if not link_data:
+            # 실패 시 기존 값은 유지하고, 가격이 없으면 -1로 표시
+            if not fields.get('price'):
+                fields['price'] = -1
+            self._apply_value_metrics(fields)
+            return False
+
+        fields['cover'] = link_data.get('image')
+        fields['purchase_url'] = link_data.get('link')
+        fields['price'] = link_data.get('price')
+        fields['mall_name'] = link_data.get('mall')
+        if link_data.get('amount'):
+            fields['amount'] = link_data.get('amount')
+        if link_data.get('unit_type'):
+            fields['unit_type'] = link_data.get('unit_type')
+        self._apply_value_metrics(fields)
+        return True
+
+    @staticmethod
+    def _apply_value_metrics(fields):
+        fields.update(zip(VALUE_FIELDS, compute_value_metrics(
+            fields.get('price'), fields.get('amount'), fields.get('unit_type'), fields.get('NTK_MTHD')
+        )))
+
+    def persist(self, items):
+        pass  # 항목은 select 때 읽은 객체를 그대로 수정하므로 flush에서 순서대로 씀
+
+    def flush(self, last_key, finished=False):
+        """last_key까지 끝난 항목(검색이 필요 없던 항목 포함)을 입력 순서대로 작업 파일에 추가"""
+        if self.writer is None:
+            return
+        while self._pending and (finished or self._pending[0][0] <= last_key):
+            self.writer.write(self._pending.popleft()[1])
+        self.writer.flush()
+
+    def finish(self):
+        """작업 파일 -> output JSON 배열로 변환 후 작업 파일 삭제"""
+        self.flush(0, finished=True)
+        self.close()
+        write_json_array(self.output_path, iter_json_items(self.journal_path))
+        os.remove(self.journal_path)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+# ==========================================
+# 2. fetch + match
+# ==========================================
+async def fetch_chunk(records, concurrency):
+    """chunk 안의 항목을 동시에 조회 (예외도 결과로 받아서 한도 초과를 구분)"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def lookup(name, company):
+        async with semaphore:
+            return await aget_purchase_link(name, company)
+
+    return await asyncio.gather(
+        *(lookup(name, company) for _, name, company, _ in records),
+        return_exceptions=True,
+    )
+
+
+# ==========================================
+# 3. 파이프라인
+# ==========================================
+class EnrichmentPipeline:
+
+    def __init__(self, target, chunk_size=200, concurrency=8, log=print, name=None):
+        self.target = target
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.log = log
+        self.quota = get_naver_client().quota
+        self.checkpoint, _ = EnrichmentCheckpoint.objects.get_or_create(name=name or target.name)
+
+    def reset(self):
+        self.target.reset()
+        cp = self.checkpoint
+        cp.last_key = cp.processed = cp.found = cp.missing = cp.errors = 0
+        cp.started_at = timezone.now()
+        cp.finished_at = None
+        cp.save()
+
+    def run(self, limit=None):
+        """처리한 항목 수를 반환. 하루 한도를 다 쓰면 체크포인트를 남기고 멈춤"""
+        cp = self.checkpoint
+        if cp.finished_at:
+            # 지난번 작업이 끝까지 완료됐으면 처음부터 새로 시작
+            self.reset()
+        cp.last_key = self.target.resume_key(cp.last_key)
+
+        total = self.target.remaining(cp.last_key)
+        self.log(f"🚀 [{cp.name}] {cp.last_key} 이후 {total:,}건 처리 시작 (오늘 남은 API 호출: {self.quota.remaining():,}건)")
+
+        start_time = time.time()
+        start_calls = self.quota.used()
+        done_count = 0
+        quota_exceeded = False
+        unavailable = None
+
+        try:
+            while not quota_exceeded and unavailable is None and (limit is None or done_count < limit):
+                size = self.chunk_size if limit is None else min(self.chunk_size, limit - done_count)
+                records = self.target.select(cp.last_key, size)
+                if not records:
+                    self.target.finish()
+                    cp.finished_at = timezone.now()
+                    break
+
+                results = asyncio.run(fetch_chunk(records, self.concurrency))
+
+                # 조회가 끝난 항목만 반영. 체크포인트는 앞에서부터 연속으로 끝난 항목까지만 전진
+                # (한도 초과로 못 끝낸 항목부터 다음 실행에서 다시 시작)
+                changed = []
+                last_key = cp.last_key
+                contiguous = True
+                for (key, name, company, obj), result in zip(records, results):
+                    if isinstance(result, NaverQuotaExceeded):
+                        quota_exceeded = True
+                        contiguous = False
+                        continue
+                    if isinstance(result, OutboundUnavailable):
+                        # 서킷 차단 등으로 호출하지 못함 -> 한도 초과처럼 처리하지 않은 항목으로 남기고 멈춤
+                        unavailable = result
+                        contiguous = False
+                        continue
+                    if isinstance(result, Exception):
+                        cp.errors += 1
+                        self.log(f"⚠️ [{key}] {name} 에러 발생: {result}")
+                    elif self.target.apply(obj, result):
+                        cp.found += 1
+                        changed.append(obj)
+                    else:
+                        cp.missing += 1
+                        changed.append(obj)
+                    cp.processed += 1
+                    done_count += 1
+                    if contiguous:
+                        last_key = key
+
+                self.target.persist(changed)
+                cp.last_key = last_key
+                self.target.flush(last_key)
+                cp.save()
+
+                self.report(done_count, total, start_time, start_calls)
+        finally:
+            # Ctrl+C 등으로 멈춰도 여기까지 처리한 결과와 위치는 남김
+            self.target.flush(cp.last_key)
+            self.target.close()
+            cp.save()
+
+        if quota_exceeded:
+            hours = self.quota.seconds_until_reset() / 3600
+            self.log(f"⛔ 오늘 네이버 API 한도를 모두 사용했습니다. 약 {hours:.1f}시간 뒤 다시 실행하면 이어서 처리합니다.")
+        elif unavailable is not None:
+            self.log(f"🔌 네이버 API 호출이 일시 차단되었습니다 ({unavailable}). {unavailable.retry_after:.0f}초 뒤 다시 실행하면 이어서 처리합니다.")
+        return done_count
+
+    def report(self, done_count, total, start_time, start_calls):
+        """처리 속도 / 남은 시간 / API 사용량 출력"""
+        cp = self.checkpoint
+        elapsed = time.time() - start_time
+        speed = done_count / elapsed if elapsed > 0 else 0
+        remaining = max(0, total - done_count)
+        eta_min = remaining / speed / 60 if speed > 0 else 0
+
+        calls = self.quota.used() - start_calls
+        calls_per_item = calls / done_count if done_count else 2
+        days = remaining * calls_per_item / self.quota.limit if self.quota.limit else 0
+
+        self.log(
+            f"[{done_count:,}/{total:,}] 누적 성공:{cp.found} 실패:{cp.missing} 에러:{cp.errors} "
+            f"| 속도: {speed:.1f}개/초 | 남은시간: 약 {eta_min:.1f}분 "
+            f"| API {calls:,}건 사용 (오늘 남은 {self.quota.remaining():,}건, 전체 완료까지 약 {days:.1f}일치 한도)"
+        )
@@ -0,0 +1,69 @@
+# pills/facets.py
+# 필터 사이드바 옵션별 개수 (카테고리 / 제형 / 가격대 / 알레르기 없음)
+#
+# 옵션마다 index 쿼리셋에 COUNT를 한 번씩 붙이면 사이드바 하나에 수십 개의 쿼리가 나갑니다.
+# 여기서는 필터 비트맵(pills/bitmap_filter.py)을 메모리 열 단위 스냅샷으로 보고
+# 모든 옵션의 개수를 비트 연산 한 번씩으로 계산합니다. (검색어가 있으면 검색 결과 pk만 한 번 조회)
+# 결과는 정리된 조건(normalize_facet_query) + 카탈로그 버전 기준으로 캐시합니다.
+#
+#   GET /pills/facets/?keyword=비타민&shapes=정(알약),캡슐&price=10k_20k&allergen_free=대두
+#   -> {"query": {...}, "count": 42, "facets": {"category": [...], "shape": [...], "price": [...], "allergen_free": [...]}}
+
+from .bitmap_filter import all_of, any_of, bitmap_from, get_filter_index, term
+from .dosage_forms import dosage_forms_for
+from .models import Pill
+from .search import get_search_backend
+
+TEXT_PARAMS = ('search_type', 'keyword', 'q')
+# 쿼리 파라미터 -> (facet 이름, 필터식 필드)
+LIST_PARAMS = {
+    'category': ('category', 'category'),
+    'shapes': ('shape', 'shape'),
+    'price': ('price', 'price'),
+    'allergen_free': ('allergen_free', 'allergen'),
+}
+
+
+def normalize_facet_query(params):
+    """같은 조건이면 같은 캐시 키가 되도록 정리 (쉼표 목록은 중복 제거 + 정렬, 제형은 제형 코드로)"""
+    query = {}
+    for name in TEXT_PARAMS:
+        value = (params.get(name) or '').strip()
+        if value:
+            query[name] = value
+    if 'keyword' not in query:
+        query.pop('search_type', None)
+
+    for name in LIST_PARAMS:
+        values = {v.strip() for v in (params.get(name) or '').split(',') if v.strip()}
+        if name == 'shapes':
+            values = dosage_forms_for(values)
+        if values:
+            query[name] = sorted(values)
+    return query
+
+
+def compute_facets(query):
+    index = get_filter_index()
+
+    # 1. 사이드바와 상관없는 범위 (검색어, 필터식)
+    base = None
+    if 'keyword' in query:
+        pills = get_search_backend().filter(Pill.objects.all(), query['keyword'], query.get('search_type', ''))
+        base = bitmap_from(pills.values_list('pk', flat=True))
+    if 'q' in query:
+        matched = index.evaluate(query['q'])
+        base = matched if base is None else base & matched
+
+    # 2. 사이드바에서 고른 조건 (같은 facet 안에서는 OR, 알레르기 없음은 모두 만족)
+    selections = {}
+    for name, (facet, field) in LIST_PARAMS.items():
+        values = query.get(name)
+        if not values:
+            continue
+        if facet == 'allergen_free':
+            selections[facet] = all_of(*(('not', term(field, v)) for v in values))
+        else:
+            selections[facet] = any_of(*(term(field, v) for v in values))
+
+    return {'query': query, **index.facet_counts(base, selections)}
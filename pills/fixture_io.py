@@ -0,0 +1,173 @@
+# pills/fixture_io.py
+# 큰 JSON 픽스처를 한 번에 메모리에 올리지 않고 항목 단위로 읽고/쓰기
+#
+#   iter_json_items(path)      : JSON 배열([{...}, {...}]) 또는 JSON Lines(.jsonl) 파일을 항목 하나씩 yield
+#   JsonLinesWriter(path)      : 처리가 끝난 항목을 한 줄씩 이어 붙임 (중간에 멈춰도 쓴 줄까지는 남음)
+#   write_json_array(path, it) : 항목들을 JSON 배열 파일로 저장 (임시 파일에 쓴 뒤 교체)
+#
+# json.load()처럼 파일 전체를 파싱하지 않으므로, 파일이 커져도 메모리 사용량은 항목 하나 크기 정도로 유지됩니다.
+
+import json
+import os
+import re
+
+READ_SIZE = 64 * 1024
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+_NUMBER_START = '-0123456789'
+# 배열 안의 숫자가 끝나는 자리 (공백, 쉼표, 닫는 괄호)
+_NUMBER_END = re.compile(r'[ \t\n\r,\]]')
+
+
+def is_jsonl(path):
+    return path.endswith('.jsonl')
+
+
+def _iter_json_array(f):
+    """JSON 배열을 앞에서부터 읽으며 원소를 하나씩 반환 (raw_decode로 버퍼 안에서 한 항목씩 파싱)"""
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(READ_SIZE)
+        if not chunk:
+            eof = True
+        # 이미 처리한 앞부분은 버려서 버퍼가 계속 커지지 않게 함
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip(_WHITESPACE)
+    if pos >= len(buffer):
+        return
+    if buffer[pos] != '[':
+        # 배열이 아닌 단일 객체 파일 -> 전체를 하나의 항목으로
+        while not eof:
+            fill()
+        yield json.loads(buffer[pos:])
+        return
+    pos += 1
+
+    while True:
+        skip(_WHITESPACE + ',')
+        if pos >= len(buffer):
+            raise json.JSONDecodeError('배열이 닫히지 않았습니다', buffer, pos)
+        if buffer[pos] == ']':
+            return
+        if buffer[pos] in _NUMBER_START:
+            # 숫자는 버퍼 끝에서 잘려도('1.' + '5', '2e' + '3') 앞부분만으로 파싱되므로 구분자나 파일 끝까지 읽고 파싱
+            while not eof and not _NUMBER_END.search(buffer, pos):
+                fill()
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+                # 버퍼 끝에서 끝난 값은 잘렸을 수도 있으므로 다음 내용을 읽고 다시 파싱
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+        if end < len(buffer) and buffer[end] not in _WHITESPACE + ',]':
+            raise json.JSONDecodeError('항목 뒤에 쉼표나 ]가 없습니다', buffer, end)
+        pos = end
+        yield item
+
+
+def iter_json_items(path):
+    """파일의 항목을 하나씩 yield (.jsonl이면 한 줄 = 한 항목)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if is_jsonl(path):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def iter_chunks(iterable, size):
+    """이터러블을 size개씩 리스트로 묶어서 반환"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class JsonLinesWriter:
+    """
+    JSON Lines 파일에 항목을 이어 붙이는 writer.
+    이어서 쓸 때 마지막 줄이 중간에 잘려 있으면(쓰는 도중 종료) 그 줄은 잘라내고 시작합니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = self._repair()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _repair(self):
+        """온전한 줄 수를 세고, 끝에 남은 미완성 줄을 잘라냄"""
+        if not os.path.exists(self.path):
+            return 0
+        count = 0
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                count += 1
+                valid_size += len(line)
+        if valid_size != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_size)
+        return count
+
+    def write(self, item):
+        self._file.write(json.dumps(item, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_json_array(path, items, indent=2):
+    """항목을 하나씩 JSON 배열로 저장 (저장 도중 멈춰도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체)"""
+    tmp_path = f'{path}.tmp'
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for item in items:
+            f.write(',\n' if count else '\n')
+            body = json.dumps(item, indent=indent, ensure_ascii=False)
+            # 배열 안쪽으로 한 단계 들여쓰기
+            f.write(' ' * indent + body.replace('\n', '\n' + ' ' * indent) if indent else body)
+            count += 1
+        f.write('\n]\n' if count else ']\n')
+    os.replace(tmp_path, path)
+    return count
@@ -0,0 +1,64 @@
+# 정규화된 제형(Pill.dosage_form) 채우기 (pills/dosage_forms.py)
+# 0005_pill_dosage_form 마이그레이션 적용 후, 또는 NORMALIZE_RULES를 바꾼 뒤 한 번 실행해주세요.
+#   python manage.py backfill_dosage_forms
+#   python manage.py backfill_dosage_forms --dry-run   # 바뀔 개수와 '기타'로 분류되는 원문만 확인
+
+import time
+from collections import Counter, defaultdict
+from django.core.management.base import BaseCommand
+from pills.dosage_forms import DOSAGE_FORM_CHOICES, match_dosage_form, normalize_dosage_form
+from pills.models import Pill
+
+
+class Command(BaseCommand):
+    help = '제형 원문(PRDT_SHAP_CD_NM)을 정규화해서 dosage_form 컬럼을 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 번에 읽고 저장할 개수')
+        parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 결과만 출력')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        start_time = time.time()
+        forms = Counter()
+        unmatched = Counter()
+        changed = 0
+
+        # pk 순서로 batch_size개씩 (OFFSET 없이 마지막 pk 다음부터)
+        last_pk = 0
+        while True:
+            rows = list(
+                Pill.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'PRDT_SHAP_CD_NM', 'dosage_form')[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            updates = defaultdict(list)
+            for pk, shape, current in rows:
+                form = normalize_dosage_form(shape)
+                forms[form] += 1
+                if match_dosage_form(shape) is None:
+                    unmatched[shape or '(빈 값)'] += 1
+                if form != current:
+                    updates[form].append(pk)
+
+            for form, pks in updates.items():
+                changed += len(pks)
+                if not options['dry_run']:
+                    # update() -> pill_rows_changed 시그널로 캐시 버전/필터 비트맵 갱신
+                    Pill.objects.filter(pk__in=pks).update(dosage_form=form)
+
+        elapsed = time.time() - start_time
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ {prefix}제형 정규화 완료! 전체 {sum(forms.values()):,}개 중 {changed:,}개 변경 ({elapsed:.1f}초)"
+        ))
+        labels = dict(DOSAGE_FORM_CHOICES)
+        self.stdout.write('💊 ' + ' | '.join(f"{labels[code]} {forms[code]:,}" for code, _ in DOSAGE_FORM_CHOICES))
+        if unmatched:
+            self.stdout.write(self.style.WARNING(
+                "⚠️ 규칙에 없어 '기타'로 분류된 원문: "
+                + ', '.join(f"{shape}({count:,})" for shape, count in unmatched.most_common(10))
+            ))
@@ -0,0 +1,49 @@
+# 가성비 컬럼(Pill.price_per_unit / price_per_day) 채우기 (pills/value_metrics.py)
+# 0006_pill_value_metrics 마이그레이션 적용 후, 또는 하루 섭취량 규칙을 바꾼 뒤 한 번 실행해주세요.
+#   python manage.py backfill_value_metrics
+#   python manage.py backfill_value_metrics --dry-run   # 바뀔 개수만 확인
+
+import time
+from django.core.management.base import BaseCommand
+from pills.models import Pill
+from pills.value_metrics import VALUE_FIELDS, apply_value_metrics
+
+
+class Command(BaseCommand):
+    help = '가격/수량/섭취방법으로 1회분 가격과 하루 가격(가성비) 컬럼을 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 번에 읽고 저장할 개수')
+        parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 결과만 출력')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        start_time = time.time()
+        total = changed = per_unit = per_day = 0
+
+        # pk 순서로 batch_size개씩 (OFFSET 없이 마지막 pk 다음부터)
+        last_pk = 0
+        while True:
+            pills = list(
+                Pill.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('id', 'price', 'amount', 'unit_type', 'NTK_MTHD', *VALUE_FIELDS)[:batch_size]
+            )
+            if not pills:
+                break
+            last_pk = pills[-1].pk
+
+            updates = [pill for pill in pills if apply_value_metrics(pill)]
+            total += len(pills)
+            changed += len(updates)
+            per_unit += sum(pill.price_per_unit is not None for pill in pills)
+            per_day += sum(pill.price_per_day is not None for pill in pills)
+            if updates and not options['dry_run']:
+                # bulk_update() -> pill_rows_changed 시그널로 캐시 버전 갱신
+                Pill.objects.bulk_update(updates, VALUE_FIELDS)
+
+        elapsed = time.time() - start_time
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ {prefix}가성비 계산 완료! 전체 {total:,}개 중 {changed:,}개 변경 ({elapsed:.1f}초)"
+        ))
+        self.stdout.write(f"💰 1회분 가격 {per_unit:,}개 | 하루 가격 {per_day:,}개 (나머지는 가격/수량/섭취량 정보 부족)")
@@ -0,0 +1,103 @@
+# 목록 API 직렬화 경로 벤치마크 (기존 prefetch + PillListSerializer vs values() + serialize_pill_list)
+# 예) python manage.py bench_list_serialization --pages 20 --repeat 5
+#
+# index와 같은 조건(가격 실패 제외, 최신순)으로 앞에서부터 --pages 페이지를 읽어서
+# 페이지당 쿼리 수 / DB에서 가져온 바이트 / 조회 시간 / 직렬화 시간을 비교합니다.
+# DB 바이트는 실행된 SQL을 다시 실행해서 받은 값의 크기를 더한 것입니다. (문자열은 UTF-8 기준)
+
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from pills.models import Pill
+from pills.serializers import PillListSerializer, pill_list_values, serialize_pill_list
+
+
+def _value_bytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return 8  # 숫자/날짜 등
+
+
+def _fetched_bytes(queries):
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            cursor.execute(query['sql'])
+            total += sum(_value_bytes(value) for row in cursor.fetchall() for value in row)
+    return total
+
+
+class Command(BaseCommand):
+    help = '목록 API의 기존 직렬화 경로와 빠른 경로(values + dict)의 DB 전송량/직렬화 시간을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=20, help='측정할 페이지 수')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5, help='페이지당 반복 횟수 (시간은 평균)')
+
+    def old_path(self, queryset):
+        rows = list(queryset.prefetch_related('nutrient_details', 'category'))
+        return rows, lambda: PillListSerializer(rows, many=True).data
+
+    def new_path(self, queryset):
+        rows = list(pill_list_values(queryset))
+        return rows, lambda: serialize_pill_list(rows)
+
+    def measure(self, path, pages, repeat):
+        stats = {'queries': 0, 'bytes': 0, 'fetch': 0.0, 'serialize': 0.0}
+        outputs = []
+        for queryset in pages:
+            with CaptureQueriesContext(connection) as captured:
+                rows, serialize = path(queryset)
+            stats['queries'] += len(captured.captured_queries)
+            stats['bytes'] += _fetched_bytes(captured.captured_queries)
+
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                path(queryset)
+                stats['fetch'] += time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                data = serialize()
+                stats['serialize'] += time.perf_counter() - t0
+            outputs.append([dict(item) for item in data])
+
+        n = len(pages)
+        return {
+            'queries': stats['queries'] / n,
+            'bytes': stats['bytes'] / n,
+            'fetch': stats['fetch'] / (n * repeat) * 1000,
+            'serialize': stats['serialize'] / (n * repeat) * 1000,
+        }, outputs
+
+    def handle(self, *args, **options):
+        size = options['page_size']
+        base = Pill.objects.exclude(price=-1).order_by('-pk')
+        total = base.count()
+        pages = [base[offset:offset + size] for offset in range(0, min(total, options['pages'] * size), size)]
+        if not pages:
+            self.stdout.write(self.style.WARNING("⚠️ 목록에 나오는 영양제가 없습니다."))
+            return
+
+        self.stdout.write(f"📦 {len(pages)}페이지 x {size}개 (전체 {total:,}개), 페이지당 {options['repeat']}회 반복")
+        old, old_outputs = self.measure(self.old_path, pages, options['repeat'])
+        new, new_outputs = self.measure(self.new_path, pages, options['repeat'])
+
+        if old_outputs != new_outputs:
+            self.stdout.write(self.style.ERROR("❌ 두 경로의 응답이 다릅니다!"))
+
+        self.stdout.write(f"\n{'경로':<24}{'쿼리/페이지':>12}{'DB KB/페이지':>14}{'조회(ms)':>10}{'직렬화(ms)':>12}")
+        for name, result in (('prefetch + Serializer', old), ('values + dict', new)):
+            self.stdout.write(
+                f"{name:<24}{result['queries']:>12.1f}{result['bytes'] / 1024:>14.1f}"
+                f"{result['fetch']:>10.2f}{result['serialize']:>12.3f}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✨ DB 전송량 {old['bytes'] / max(new['bytes'], 1):.1f}배 감소, "
+            f"직렬화 {old['serialize'] / max(new['serialize'], 1e-9):.1f}배 빠름"
+        ))
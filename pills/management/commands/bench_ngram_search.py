@@ -0,0 +1,81 @@
+# 제품명 부분 검색(n-gram 역색인) 벤치마크
+# 예) python manage.py bench_ngram_search --sizes 40000 400000
+#
+# DB에 Pill 데이터가 있으면 실제 제품명/제조사를 복제해서, 없으면 합성 데이터로 코퍼스를 만듭니다.
+# DB 조회 없이 NgramIndex.search() 자체의 속도만 측정합니다.
+
+import random
+import time
+from django.core.management.base import BaseCommand
+from pills.models import Pill
+from pills.ngram_index import NgramIndex
+
+# 합성 데이터용 단어
+SYNTHETIC_WORDS = [
+    '루테인', '지아잔틴', '종근당', '비타민', '칼슘', '마그네슘', '오메가3', '프로바이오틱스', '유산균',
+    '홍삼', '밀크씨슬', '콜라겐', '글루코사민', '철분', '아연', '코엔자임', '쏘팔메토', '멀티', '골드',
+    '플러스', '프리미엄', '키즈', '맥스', '데일리', '건강', '뉴트리', '고려은단', '한국야쿠르트',
+]
+
+DEFAULT_QUERIES = ['루테', '종근', '비타민', '오메가3', '프로바이오', '밀크씨슬 골드', '키즈', '없는검색어']
+
+
+class Command(BaseCommand):
+    help = '메모리 n-gram 역색인의 부분 검색 속도를 코퍼스 크기별로 측정합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[40000, 400000], help='코퍼스 크기 목록')
+        parser.add_argument('--queries', nargs='+', default=DEFAULT_QUERIES, help='검색어 목록')
+        parser.add_argument('--repeat', type=int, default=50, help='검색어당 반복 횟수')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def base_texts(self, rng):
+        texts = list(Pill.objects.values_list('PRDLST_NM', flat=True)[:50000])
+        if texts:
+            self.stdout.write(f"📦 DB 제품명 {len(texts)}개를 기반으로 코퍼스를 만듭니다.")
+            return texts
+
+        self.stdout.write("📦 DB가 비어 있어 합성 제품명으로 코퍼스를 만듭니다.")
+        return [' '.join(rng.sample(SYNTHETIC_WORDS, rng.randint(2, 4))) for _ in range(5000)]
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        base = self.base_texts(rng)
+
+        for size in options['sizes']:
+            # 같은 이름이 반복되지 않도록 번호를 붙여서 size개로 늘림
+            docs = [(i + 1, f"{base[i % len(base)]} {i}") for i in range(size)]
+
+            start_time = time.perf_counter()
+            index = NgramIndex.build(docs)
+            build_ms = (time.perf_counter() - start_time) * 1000
+            postings = sum(len(ids) for ids in index._postings.values())
+
+            self.stdout.write(self.style.SUCCESS(
+                f"\n=== {size:,}개 | 색인 생성 {build_ms:,.0f}ms | n-gram {len(index._postings):,}종 "
+                f"| 포스팅 {postings:,}개 (약 {postings * 4 / 1024 / 1024:.1f}MB)"
+            ))
+            self.stdout.write(f"{'검색어':<16}{'결과':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'풀스캔(ms)':>12}")
+
+            texts = [(doc_id, text.lower()) for doc_id, text in docs]
+            for query in options['queries']:
+                timings = []
+                for _ in range(options['repeat']):
+                    t0 = time.perf_counter()
+                    hits = index.search(query)
+                    timings.append((time.perf_counter() - t0) * 1000)
+                timings.sort()
+                p50 = timings[len(timings) // 2]
+                p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+                # 비교용: 기존 icontains와 같은 방식의 선형 탐색
+                t0 = time.perf_counter()
+                needle = query.lower()
+                scan_hits = [doc_id for doc_id, text in texts if needle in text]
+                scan_ms = (time.perf_counter() - t0) * 1000
+
+                if hits is not None and len(hits) != len(scan_hits):
+                    self.stdout.write(self.style.ERROR(f"❌ 결과 불일치: {query} ({len(hits)} != {len(scan_hits)})"))
+
+                count = '-' if hits is None else len(hits)
+                self.stdout.write(f"{query:<16}{count:>8}{p50:>10.3f}{p99:>10.3f}{scan_ms:>12.1f}")
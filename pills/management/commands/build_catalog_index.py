@@ -0,0 +1,55 @@
+# 챗봇 후보 검색용 TF-IDF 색인 생성 (pills/tfidf_index.py)
+# 카탈로그(pills_lite_final.json)를 바꾼 뒤 한 번 실행해주세요. 실행 중인 서버는 몇 초 안에 새 색인으로 바꿔 씁니다.
+#   python manage.py build_catalog_index
+#   python manage.py build_catalog_index --query "눈이 침침해" --query "부모님 선물"   # 만든 뒤 검색 결과 확인
+
+import os
+import time
+from django.core.management.base import BaseCommand
+from pills.catalog_index import CatalogIndex, default_index_path, iter_catalog
+from pills.tfidf_index import build_tfidf, file_digest
+from pills.utils import DATA_FILE
+
+
+class Command(BaseCommand):
+    help = '챗봇 후보 검색용 TF-IDF(글자 n-gram) 색인 파일을 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', default=DATA_FILE, help='카탈로그 JSON 파일')
+        parser.add_argument('--output', default=None, help='색인 파일 (기본: <카탈로그>.tfidf)')
+        parser.add_argument('--max-df', type=float, default=0.5, help='이 비율보다 많은 제품에 나오는 n-gram은 제외')
+        parser.add_argument('--name-weight', type=int, default=2, help='제품명 n-gram 가중치 (기능성 대비)')
+        parser.add_argument('--query', action='append', default=[], help='생성 후 검색해볼 질문 (여러 번 가능)')
+
+    def handle(self, *args, **options):
+        path = options['input']
+        if not os.path.exists(path):
+            self.stdout.write(self.style.ERROR(f"❌ 파일을 찾을 수 없습니다: {path}"))
+            return
+        output = options['output'] or default_index_path(path)
+
+        start_time = time.time()
+        docs = [(p['name'], p['function']) for p in iter_catalog(path)]
+        stats = build_tfidf(
+            docs, output, file_digest(path),
+            max_df=options['max_df'], name_weight=options['name_weight'],
+        )
+        elapsed = time.time() - start_time
+
+        size_mb = os.path.getsize(output) / 1024 / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ TF-IDF 색인 생성 완료! 제품 {stats['docs']:,}개 | n-gram {stats['vocab']:,}개 "
+            f"(흔한 n-gram {stats['dropped']:,}개 제외) | 값 {stats['nnz']:,}개 | {size_mb:.1f}MB | {elapsed:.1f}초"
+        ))
+        self.stdout.write(f"💾 {output}")
+
+        if options['query']:
+            catalog = CatalogIndex(path, index_path=output)
+            catalog.ensure_loaded()
+            for query in options['query']:
+                start = time.perf_counter()
+                products = catalog.search(query)
+                ms = (time.perf_counter() - start) * 1000
+                self.stdout.write(f"\n🔎 '{query}' ({ms:.1f}ms)")
+                for p in products:
+                    self.stdout.write(f"   {p['score']:.3f}  {p['name']} - {p['function'][:40]}")
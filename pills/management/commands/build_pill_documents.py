@@ -0,0 +1,44 @@
+# 영양제 상세 응답 문서(PillDocument) 전체 만들기 (pills/documents.py)
+# 0007_pilldocument 마이그레이션 적용 후, 또는 상세 응답 형식(PillDetailSerializer)을 바꾼 뒤 한 번 실행해주세요.
+# 이후에는 영양제/성분/알레르기가 바뀔 때 시그널이 해당 문서만 다시 만듭니다.
+#   python manage.py build_pill_documents
+#   python manage.py build_pill_documents --missing-only   # 문서가 없는 영양제만
+
+import time
+from django.core.management.base import BaseCommand
+from pills.documents import document_queryset, save_documents
+from pills.models import Pill, PillDocument
+
+
+class Command(BaseCommand):
+    help = '영양제 상세 응답(영양제 + 카테고리 + 성분 + 알레르기)을 미리 만들어 PillDocument에 저장합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='한 번에 읽고 저장할 개수')
+        parser.add_argument('--missing-only', action='store_true', help='문서가 없는 영양제만 만들기')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        start_time = time.time()
+        queryset = document_queryset()
+        if options['missing_only']:
+            queryset = queryset.filter(document__isnull=True)
+        total = queryset.count()
+        self.stdout.write(f"📄 상세 문서 만들기: {total:,}개")
+
+        # pk 순서로 batch_size개씩 (OFFSET 없이 마지막 pk 다음부터)
+        built = 0
+        last_pk = 0
+        while True:
+            pills = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not pills:
+                break
+            last_pk = pills[-1].pk
+            built += save_documents(pills)
+            self.stdout.write(f"  ... {built:,}/{total:,}")
+
+        # 영양제가 지워진 문서 정리 (CASCADE라 보통 없음)
+        orphans, _ = PillDocument.objects.exclude(pill__in=Pill.objects.all()).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ 상세 문서 {built:,}개 저장, 남은 문서 {orphans:,}개 삭제 ({time.time() - start_time:.1f}초)"
+        ))
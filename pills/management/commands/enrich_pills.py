@@ -0,0 +1,55 @@
+# 네이버 쇼핑 정보(가격/구매링크/이미지) 일괄 수집
+# 중간에 멈춰도 체크포인트부터 이어서 처리합니다. (하루 한도를 다 쓰면 다음 날 다시 실행)
+#   python manage.py enrich_pills                         # 가격 정보가 없는 영양제 (DB)
+#   python manage.py enrich_pills --select no-link        # 구매 링크가 없는 영양제 (실패했던 것 포함)
+#   python manage.py enrich_pills --target json           # pills_lite_final.json -> pills_final_with_images.json
+#   python manage.py enrich_pills --reset                 # 체크포인트를 지우고 처음부터
+
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pills.enrichment_pipeline import DbTarget, EnrichmentPipeline, JsonTarget
+
+FIXTURE_DIR = os.path.join(settings.BASE_DIR, 'pills', 'fixtures')
+
+
+class Command(BaseCommand):
+    help = '네이버 쇼핑 API로 영양제 가격/구매링크/이미지를 일괄 수집합니다. (체크포인트로 이어서 처리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=['db', 'json'], default='db', help='수집 결과를 저장할 대상')
+        parser.add_argument('--select', choices=list(DbTarget.SELECTIONS), default='unpriced', help='DB 대상 선택 조건')
+        parser.add_argument('--input', default=os.path.join(FIXTURE_DIR, 'pills_lite_final.json'), help='JSON 대상 입력 파일')
+        parser.add_argument('--output', default=os.path.join(FIXTURE_DIR, 'pills_final_with_images.json'), help='JSON 대상 출력 파일 (작업 중에는 <출력 파일>.partial.jsonl에 이어 씀)')
+        parser.add_argument('--chunk-size', type=int, default=200, help='한 번에 조회/저장할 항목 수')
+        parser.add_argument('--concurrency', type=int, default=8, help='동시에 진행할 검색 수')
+        parser.add_argument('--limit', type=int, default=None, help='이번 실행에서 처리할 최대 항목 수')
+        parser.add_argument('--name', default=None, help='체크포인트 이름 (기본: 대상별 자동)')
+        parser.add_argument('--reset', action='store_true', help='체크포인트를 지우고 처음부터 다시 시작')
+
+    def handle(self, *args, **options):
+        if options['target'] == 'json':
+            if not os.path.exists(options['input']):
+                self.stdout.write(self.style.ERROR(f"❌ 파일을 찾을 수 없습니다: {options['input']}"))
+                return
+            target = JsonTarget(options['input'], options['output'])
+        else:
+            target = DbTarget(options['select'])
+
+        pipeline = EnrichmentPipeline(
+            target,
+            chunk_size=options['chunk_size'],
+            concurrency=options['concurrency'],
+            log=self.stdout.write,
+            name=options['name'],
+        )
+        if options['reset']:
+            pipeline.reset()
+
+        processed = pipeline.run(limit=options['limit'])
+
+        cp = pipeline.checkpoint
+        status = '완료' if cp.finished_at else f'다음 실행 시 {cp.last_key} 이후부터 이어서 처리'
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✨ 이번 실행 {processed:,}건 처리 | 누적 성공:{cp.found} 실패:{cp.missing} 에러:{cp.errors} ({status})"
+        ))
@@ -1,5 +1,6 @@
 import json
 import os
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from accounts.models import Allergy  # Allergy 모델 위치 확인
@@ -29,6 +30,9 @@ class Command(BaseCommand):
 
             self.stdout.write(self.style.SUCCESS(f"\n✨ 총 {success_count}개의 데이터가 추가되었습니다."))
 
+            # 알레르기 목록 캐시(워커 메모리 + Redis) 다시 만들기
+            call_command('refresh_reference_data', stdout=self.stdout)
+
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f"❌ 파일을 찾을 수 없습니다: {json_file_path}"))
         except Exception as e:
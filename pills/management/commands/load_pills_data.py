@@ -1,12 +1,54 @@
+# 대량 적재: Substance/Category는 메모리 사전으로 한 번에 불러오고,
+# 기존 Pill과 PRDLST_REPORT_NO 기준으로 비교해서 bulk_create/bulk_update로 저장합니다.
+# 파일은 항목 단위로 스트리밍하며 batch_size개씩 처리하므로 파일 크기와 상관없이 메모리 사용량이 일정합니다.
+# (JSON 배열 또는 JSON Lines(.jsonl) 파일 모두 가능)
+#   python manage.py load_pills_data             # pills/fixtures/pills_final_with_images.json
+#   python manage.py load_pills_data --dry-run   # 변경 건수/소요 시간만 확인 (롤백, 캐시/검색 인덱스도 그대로)
+# 저장/삭제는 행마다 시그널을 보내지 않고, 커밋된 뒤 바뀐 영양제를 모아 pill_rows_changed를 한 번만 보냅니다.
+# (검색 인덱스, 캐시 버전, 필터 비트맵, 상세 문서 갱신은 pills/signals.py)
 
 import json
 import os
+import time
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
-from pills.models import Pill, Nutrient, Allergen, Category, Substance
-from django.db import transaction
+from pills.fixture_io import iter_chunks, iter_json_items
+from pills.dosage_forms import normalize_dosage_form
+from pills.value_metrics import VALUE_FIELDS, compute_value_metrics
+from pills.models import Pill, Nutrient, Allergen, Category, Substance, pill_rows_changed
+from django.db import connection, transaction
+from django.db.models import QuerySet
 
 FIXTURE_PATH = 'pills/fixtures/pills_final_with_images.json' 
 
+# 픽스처에서 그대로 옮기는 Pill 필드 -> 값이 없을 때 기본값
+PILL_FIELDS = {
+    'LCNS_NO': '',
+    'BSSH_NM': '',
+    'PRDLST_NM': '',
+    'PRMS_DT': '', # CharField이므로 그대로 사용
+    'POG_DAYCNT': '',
+    'DISPOS': '',
+    'NTK_MTHD': '',
+    'PRIMARY_FNCLTY': '',
+    'IFTKN_ATNT_MATR_CN': '',
+    'CSTDY_MTHD': '',
+    'SHAP': '',
+    'STDR_STND': '',
+    'RAWMTRL_NM': '',
+    'CRET_DTM': '',
+    'LAST_UPDT_DTM': '',
+    'PRDT_SHAP_CD_NM': '',
+    'cover': None,          # 이미지 URL (null 가능)
+    'purchase_url': None,   # 구매 링크
+    'price': None,          # 가격
+    'mall_name': None,
+    'amount': 0,            # 수량 (enrich_pills --target json 결과에 들어 있음)
+    'unit_type': None,      # 단위 ('C' 개수 / 'D' 일수)
+}
+
 class Command(BaseCommand):
     help = 'JSON 파일에서 건강기능식품 데이터를 로드하여 Substance 기반으로 Category를 유추하고 저장합니다.'
 
@@ -35,158 +77,287 @@ class Command(BaseCommand):
         "근육/운동": ["단백질", "아미노산", "BCAA(아미노산)", "아르기닌(아미노산)", "크레아틴(근육)", "옥타코사놀(지구력)", "글루타민(아미노산)"]
     }
     
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=FIXTURE_PATH, help='불러올 JSON 파일 경로')
+        parser.add_argument('--batch-size', type=int, default=1000, help='bulk_create/bulk_update 한 번에 보낼 행 수')
+        parser.add_argument('--dry-run', action='store_true', help='변경 내용만 계산하고 DB에는 반영하지 않음 (롤백)')
+
+    def ensure_substances(self, names):
+        """ 이름 -> Substance pk 사전. 없는 영양소는 한 번에 생성합니다. """
+        substance_ids = dict(Substance.objects.values_list('name', 'id'))
+        missing = [name for name in dict.fromkeys(names) if name not in substance_ids]
+        if missing:
+            Substance.objects.bulk_create([Substance(name=name) for name in missing], ignore_conflicts=True)
+            substance_ids.update(Substance.objects.filter(name__in=missing).values_list('name', 'id'))
+        return substance_ids
+
     @transaction.atomic
     def initialize_mapping(self):
         """ DATA_MAPPING을 기반으로 Category와 Substance, N:M 관계를 설정합니다. """
         self.stdout.write(self.style.NOTICE('데이터 매핑 기반 초기 Category/Substance N:M 관계 설정 시작...'))
         
         # 유추 실패 시 사용할 기본 카테고리 정의
-        default_category, created = Category.objects.get_or_create(name="기타 건강식품", defaults={'pk': 99})
-        if created:
-             self.stdout.write(self.style.SUCCESS('기본 카테고리 (PK 99) 생성 완료.'))
-
-        # 1. Category 및 Substance 생성 및 N:M 관계 설정
-        for cat_name, substance_names in self.DATA_MAPPING.items():
-            category, created = Category.objects.get_or_create(name=cat_name)
-            
-            for sub_name in substance_names:
-                substance, _ = Substance.objects.get_or_create(name=sub_name)
-                # Substance가 포함된 모든 Category에 N:M 연결 (다중 연결)
-                category.substances.add(substance)
+        default_category = Category.objects.filter(name="기타 건강식품").first()
+        if default_category is None:
+            # get_or_create는 post_save 시그널로 기준 데이터 캐시 버전을 올리므로 bulk_create (dry-run은 캐시를 건드리지 않음)
+            default_category, = Category.objects.bulk_create([Category(pk=99, name="기타 건강식품")])
+            self.stdout.write(self.style.SUCCESS('기본 카테고리 (PK 99) 생성 완료.'))
+
+        # 1. Category 및 Substance 생성 (없는 것만 한 번에)
+        Category.objects.bulk_create([Category(name=name) for name in self.DATA_MAPPING], ignore_conflicts=True)
+        category_ids = dict(Category.objects.filter(name__in=self.DATA_MAPPING).values_list('name', 'id'))
+        substance_ids = self.ensure_substances(
+            name for names in self.DATA_MAPPING.values() for name in names
+        )
+
+        # 2. Substance가 포함된 모든 Category에 N:M 연결 (다중 연결, 이미 있는 연결은 무시)
+        Through = Category.substances.through
+        Through.objects.bulk_create(
+            [
+                Through(category_id=category_ids[cat_name], substance_id=substance_ids[sub_name])
+                for cat_name, substance_names in self.DATA_MAPPING.items()
+                for sub_name in substance_names
+            ],
+            ignore_conflicts=True,
+        )
 
         self.stdout.write(self.style.SUCCESS('초기 매핑 완료: 모든 Substance는 관련된 모든 Category에 연결되었습니다.'))
         return default_category
 
+    def parse_items(self, fixture_items, offset):
+        """ 픽스처 항목 -> {PRDLST_REPORT_NO: fields} (같은 번호가 여러 번 나오면 마지막 것 사용) """
+        items = {}
+        for item_index, fixture_item in enumerate(fixture_items, start=offset):
+            # 픽스처 형식에서 실제 데이터를 포함하는 'fields' 딕셔너리 추출
+            if not isinstance(fixture_item, dict) or 'fields' not in fixture_item:
+                self.stdout.write(self.style.ERROR(
+                    f"\n❌ 오류: 데이터 {item_index+1}번 항목이 유효한 픽스처 형식이 아닙니다. (fields 키 누락)"))
+                continue
+            item = fixture_item['fields'] # 실제 Pill 데이터는 item 변수에 저장
+            items[item.get('PRDLST_REPORT_NO', 'Unknown')] = item
+        return items
 
     def handle(self, *args, **options):
-        # 1. 파일 로드 및 초기 검증
-        try:
-            with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-             raise CommandError(f'File not found at {FIXTURE_PATH}. 경로를 확인해주세요.')
-        except json.JSONDecodeError as e:
-            raise CommandError(f'Invalid JSON format in {FIXTURE_PATH}: {e}')
-
-        self.stdout.write(self.style.NOTICE(f'총 {len(data)}개의 제품 데이터를 로드합니다...'))
-        
-        if not isinstance(data, list):
-            data = [data] # 단일 객체일 경우 리스트로 변환
+        path = options['path']
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+        self.stats = Counter()
+        self.timings = defaultdict(float)
+        total_started = time.perf_counter()
 
-        # 0. 매핑 초기화 및 기본 카테고리 확보 (N:M 관계를 DB에 심습니다)
-        default_category = self.initialize_mapping()
+        if not os.path.exists(path):
+             raise CommandError(f'File not found at {path}. 경로를 확인해주세요.')
+
+        self.stdout.write(self.style.NOTICE(f'{path} 에서 제품 데이터를 {batch_size}개씩 나눠서 로드합니다...'))
 
-        created_count = 0
-        total_items = len(data)
-        
-        def convert_date(date_str, report_no):
-            """YYYYMMDD 형식 문자열을 datetime.date 객체로 변환"""
-            if not date_str or not date_str.isdigit() or len(date_str) != 8:
-                return date_str
-            try:
-                return date_str
-            except ValueError:
-                self.stdout.write(self.style.WARNING(f"경고: 날짜 변환 실패 - {date_str} for ID {report_no}. 원본 문자열 사용."))
-                return date_str
-                
-        # 3. 데이터 로드 루프 시작
         with transaction.atomic():
-            for item_index, fixture_item in enumerate(data):
-                
-                # 픽스처 형식에서 실제 데이터를 포함하는 'fields' 딕셔너리 추출
-                if not isinstance(fixture_item, dict) or 'fields' not in fixture_item:
-                    self.stdout.write(self.style.ERROR(
-                        f"\n❌ 오류: 데이터 {item_index+1}/{total_items}번 항목이 유효한 픽스처 형식이 아닙니다. (fields 키 누락)"))
-                    continue 
-                
-                item = fixture_item['fields'] # 실제 Pill 데이터는 item 변수에 저장
-                
-                # ID 추출 
-                report_no = item.get('PRDLST_REPORT_NO', 'Unknown')
-                
-                # --- ▼ Category 자동 유추 및 Pill의 대표 Category 결정 로직 ▼ ---
-                nutrients_data = item.get('nutrients', {})
-                category_candidates = {}  # {Category 객체: 득표 수}
-                substance_objects_to_process = []
-                
-                try:
-                    # 1. Substance 확보 및 득표 수 카운트
-                    for name in nutrients_data.keys():
-                        substance, _ = Substance.objects.get_or_create(name=name)
-                        substance_objects_to_process.append(substance)
-
-                        # Substance가 연결된 Category 목록을 확인하여 득표합니다.
-                        for cat in substance.categories.all(): 
-                            category_candidates[cat] = category_candidates.get(cat, 0) + 1
-
-                    # 2. Pill의 단일 대표 Category 결정 (최다 득표)
-                    if category_candidates:
-                        current_category = max(category_candidates.items(), key=lambda item: item[1])[0]
-                    else:
-                        current_category = default_category
-
-                    # **Pill 객체 생성/업데이트**
-                    pill, created = Pill.objects.update_or_create(
-                        PRDLST_REPORT_NO=report_no,
-                        defaults={
-                            # ForeignKey는 단일 객체만 저장 가능
-                            'category': current_category, 
-                            'LCNS_NO': item.get('LCNS_NO', ''),
-                            'BSSH_NM': item.get('BSSH_NM', ''),
-                            'PRDLST_NM': item.get('PRDLST_NM', ''),
-                            'PRMS_DT': item.get('PRMS_DT', ''), # CharField이므로 그대로 사용
-                            'POG_DAYCNT': item.get('POG_DAYCNT', ''),
-                            'DISPOS': item.get('DISPOS', ''),
-                            'NTK_MTHD': item.get('NTK_MTHD', ''),
-                            'PRIMARY_FNCLTY': item.get('PRIMARY_FNCLTY', ''),
-                            'IFTKN_ATNT_MATR_CN': item.get('IFTKN_ATNT_MATR_CN', ''),
-                            'CSTDY_MTHD': item.get('CSTDY_MTHD', ''),
-                            'SHAP': item.get('SHAP', ''),
-                            'STDR_STND': item.get('STDR_STND', ''),
-                            'RAWMTRL_NM': item.get('RAWMTRL_NM', ''),
-                            'CRET_DTM': item.get('CRET_DTM', ''), 
-                            'LAST_UPDT_DTM': item.get('LAST_UPDT_DTM', ''), 
-                            'PRDT_SHAP_CD_NM': item.get('PRDT_SHAP_CD_NM', ''),
-                            'cover': item.get('cover'),                 # 이미지 URL (null 가능)
-                            'purchase_url': item.get('purchase_url'),   # 구매 링크
-                            'price': item.get('price'),                 # 가격
-                            'mall_name': item.get('mall_name'),
-                        }
-                    )
-
-                    if created:
-                        created_count += 1
-                        
-                    # 3. Nutrient 객체 생성 (substance_name 필드에 성분명 저장)
-                    Nutrient.objects.filter(pill=pill).delete()
-                    for substance in substance_objects_to_process:
-                        name = substance.name
-                        details = nutrients_data.get(name, {})
-                        
-                        Nutrient.objects.create(
-                            pill=pill,
-                            substance=substance,
-                            substance_name=name, # <--- 성분명 저장
-                            value=details.get('value', 0.0),
-                            unit=details.get('unit', ''),
-                        )
-
-                    # 4. Allergen 객체 생성
-                    Allergen.objects.filter(pill=pill).delete()
-                    allergens_list = item.get('allergens', [])
-                    
-                    for allergen_name in allergens_list:
-                        Allergen.objects.create(
-                            pill=pill,
-                            name=allergen_name,
-                        )
-                    
-                    self.stdout.write(self.style.NOTICE(f"성공적으로 처리됨: {report_no} -> Category: {current_category.name}"))
-
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"\n❌ 오류 발생 - PRDLST_REPORT_NO {report_no}: {e}"))
-                    continue
-
-        self.stdout.write(self.style.SUCCESS('--- 데이터 로드 완료 ---'))
-        self.stdout.write(self.style.SUCCESS(f'성공적으로 처리된 제품 수: {total_items - (total_items - created_count)}개'))
-        self.stdout.write(self.style.SUCCESS(f'새로 생성된 제품 수: {created_count}개'))
\ No newline at end of file
+            # 0. 매핑 초기화 및 기본 카테고리 확보 (N:M 관계를 DB에 심습니다)
+            started = time.perf_counter()
+            self.default_category = self.initialize_mapping()
+
+            # 영양소 이름 -> pk, 영양소 pk -> 연결된 카테고리 pk 목록 (한 번에 메모리로)
+            # (동점일 때 기존처럼 먼저 연결된 카테고리가 뽑히도록 연결 순서대로)
+            self.substance_ids = dict(Substance.objects.values_list('name', 'id'))
+            self.substance_categories = defaultdict(list)
+            for category_id, substance_id in (
+                Category.substances.through.objects.order_by('pk').values_list('category_id', 'substance_id')
+            ):
+                self.substance_categories[substance_id].append(category_id)
+            self.timings['카테고리/영양소 매핑'] += time.perf_counter() - started
+
+            # 1. 파일을 항목 단위로 읽으면서 batch_size개씩 처리 (파일 전체를 메모리에 올리지 않음)
+            self.changed_pill_ids = set()
+            offset = 0
+            chunks = iter_chunks(iter_json_items(path), batch_size)
+            try:
+                while True:
+                    started = time.perf_counter()
+                    fixture_items = next(chunks, None)
+                    if fixture_items is None:
+                        break
+                    items = self.parse_items(fixture_items, offset)
+                    offset += len(fixture_items)
+                    self.timings['파일 읽기'] += time.perf_counter() - started
+                    self.load_chunk(items, batch_size)
+            except json.JSONDecodeError as e:
+                raise CommandError(f'Invalid JSON format in {path}: {e}')
+
+            # 바뀐 영양제(제품 정보/성분/알레르기)의 검색 인덱스 + 캐시 + 비트맵 + 상세 문서를 커밋 뒤 한 번에 갱신
+            # (dry-run은 롤백되므로 on_commit이 실행되지 않음 -> 캐시/메모리 색인을 건드리지 않음)
+            changed_pill_ids = sorted(self.changed_pill_ids)
+            if changed_pill_ids:
+                transaction.on_commit(
+                    lambda: pill_rows_changed.send(sender=Pill, pill_ids=changed_pill_ids, fields=None)
+                )
+
+            if dry_run:
+                transaction.set_rollback(True)
+
+        self.timings['전체'] = time.perf_counter() - total_started
+        stats = self.stats
+
+        prefix = '[dry-run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(f'--- {prefix}데이터 로드 완료 (총 {offset}개 항목) ---'))
+        self.stdout.write(self.style.SUCCESS(
+            f"제품: 새로 생성 {stats['created']}개 / 변경 {stats['updated']}개 / "
+            f"그대로 {stats['unchanged']}개 / 오류 {stats['failed']}개"
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f"성분: 추가/수정 {stats['nutrients_upserted']}개 / 삭제 {stats['nutrients_deleted']}개 | "
+            f"알레르기: 추가 {stats['allergens_created']}개 / 삭제 {stats['allergens_deleted']}개"
+        ))
+        self.stdout.write('⏱️ ' + ' | '.join(f'{name} {seconds:.2f}초' for name, seconds in self.timings.items()))
+        if dry_run:
+            self.stdout.write(self.style.WARNING('dry-run 모드라 DB에는 아무것도 반영하지 않았습니다.'))
+        else:
+            # 카테고리/성분명 목록 캐시(워커 메모리 + Redis) 다시 만들기 (bulk 저장은 시그널이 없음)
+            call_command('refresh_reference_data', stdout=self.stdout)
+            if getattr(settings, 'PILL_WARM_CACHE_AUTO', False):
+                call_command('warm_cache', stdout=self.stdout)
+
+    def load_chunk(self, items, batch_size):
+        """ {PRDLST_REPORT_NO: fields} 묶음 하나를 bulk 쿼리 몇 번으로 저장 """
+        stats = self.stats
+        started = time.perf_counter()
+
+        def lap(name):
+            nonlocal started
+            now = time.perf_counter()
+            self.timings[name] += now - started
+            started = now
+
+        # 2. 처음 보는 영양소는 한 번에 생성
+        missing = [
+            name for item in items.values() for name in (item.get('nutrients') or {})
+            if name not in self.substance_ids
+        ]
+        if missing:
+            self.substance_ids.update(self.ensure_substances(missing))
+
+        # 3. 기존 Pill과 비교 (PRDLST_REPORT_NO 기준) -> 새로 만들 것 / 바뀐 것만 골라냄
+        existing = {
+            pill.PRDLST_REPORT_NO: pill
+            for pill in Pill.objects.filter(PRDLST_REPORT_NO__in=list(items))
+            .only('id', 'PRDLST_REPORT_NO', 'category_id', 'dosage_form', *VALUE_FIELDS, *PILL_FIELDS)
+        }
+        to_create, to_update = [], []
+        failed = set()
+        for report_no, item in items.items():
+            try:
+                # --- ▼ Category 자동 유추: 성분이 속한 카테고리 중 최다 득표 ▼ ---
+                category_candidates = {}  # {Category pk: 득표 수}
+                for name in (item.get('nutrients') or {}):
+                    for category_id in self.substance_categories[self.substance_ids[name]]:
+                        category_candidates[category_id] = category_candidates.get(category_id, 0) + 1
+                if category_candidates:
+                    category_id = max(category_candidates.items(), key=lambda vote: vote[1])[0]
+                else:
+                    category_id = self.default_category.pk
+
+                values = {field: item.get(field, default) for field, default in PILL_FIELDS.items()}
+                values['category_id'] = category_id
+                # bulk 저장은 Pill.save()를 거치지 않으므로 정규화된 제형도 여기서 채움
+                values['dosage_form'] = normalize_dosage_form(values['PRDT_SHAP_CD_NM'])
+                values.update(zip(VALUE_FIELDS, compute_value_metrics(
+                    values['price'], values['amount'], values['unit_type'], values['NTK_MTHD']
+                )))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"\n❌ 오류 발생 - PRDLST_REPORT_NO {report_no}: {e}"))
+                failed.add(report_no)
+                continue
+
+            pill = existing.get(report_no)
+            if pill is None:
+                to_create.append(Pill(PRDLST_REPORT_NO=report_no, **values))
+            elif any(getattr(pill, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(pill, field, value)
+                to_update.append(pill)
+
+        # PillQuerySet 대신 기본 QuerySet으로 저장 -> 묶음마다 pill_rows_changed를 보내지 않음 (끝날 때 한 번)
+        pills = QuerySet(Pill)
+        pills.bulk_create(to_create, batch_size=batch_size)
+        pills.bulk_update(to_update, ['category_id', 'dosage_form', *VALUE_FIELDS, *PILL_FIELDS], batch_size=batch_size)
+        self.changed_pill_ids.update(pill.pk for pill in [*to_create, *to_update])
+        stats['created'] += len(to_create)
+        stats['updated'] += len(to_update)
+        stats['unchanged'] += len(items) - len(failed) - len(to_create) - len(to_update)
+        stats['failed'] += len(failed)
+        lap('제품 저장')
+
+        pill_ids = dict(
+            Pill.objects.filter(PRDLST_REPORT_NO__in=[no for no in items if no not in failed])
+            .values_list('PRDLST_REPORT_NO', 'id')
+        )
+
+        # 4. Nutrient: 바뀐 함량만 upsert, 파일에 없는 성분은 삭제
+        wanted_nutrients = {}
+        for report_no, pill_id in pill_ids.items():
+            for name, details in (items[report_no].get('nutrients') or {}).items():
+                wanted_nutrients[(pill_id, self.substance_ids[name])] = (
+                    name, details.get('value', 0.0), details.get('unit', ''),
+                )
+
+        stale_nutrients = []
+        for nutrient_id, pill_id, substance_id, *current in Nutrient.objects.filter(
+            pill_id__in=pill_ids.values()
+        ).values_list('id', 'pill_id', 'substance_id', 'substance_name', 'value', 'unit'):
+            wanted = wanted_nutrients.get((pill_id, substance_id))
+            if wanted is None:
+                stale_nutrients.append(nutrient_id)
+                self.changed_pill_ids.add(pill_id)
+            elif tuple(current) == wanted:
+                del wanted_nutrients[(pill_id, substance_id)]  # 그대로인 행은 건드리지 않음
+
+        self.delete_in_batches(Nutrient, stale_nutrients, batch_size)
+        Nutrient.objects.bulk_create(
+            [
+                Nutrient(pill_id=pill_id, substance_id=substance_id, substance_name=name, value=value, unit=unit)
+                for (pill_id, substance_id), (name, value, unit) in wanted_nutrients.items()
+            ],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['pill', 'substance'],
+            update_fields=['substance_name', 'value', 'unit'],
+        )
+        self.changed_pill_ids.update(pill_id for pill_id, _ in wanted_nutrients)
+        stats['nutrients_upserted'] += len(wanted_nutrients)
+        stats['nutrients_deleted'] += len(stale_nutrients)
+        lap('성분 저장')
+
+        # 5. Allergen: 새 알레르기만 추가, 파일에 없는 알레르기는 삭제
+        wanted_allergens = {
+            (pill_id, name)
+            for report_no, pill_id in pill_ids.items()
+            for name in (items[report_no].get('allergens') or [])
+        }
+        stale_allergens = []
+        for allergen_id, pill_id, name in Allergen.objects.filter(
+            pill_id__in=pill_ids.values()
+        ).values_list('id', 'pill_id', 'name'):
+            if (pill_id, name) in wanted_allergens:
+                wanted_allergens.discard((pill_id, name))
+            else:
+                stale_allergens.append(allergen_id)
+                self.changed_pill_ids.add(pill_id)
+
+        self.delete_in_batches(Allergen, stale_allergens, batch_size)
+        Allergen.objects.bulk_create(
+            [Allergen(pill_id=pill_id, name=name) for pill_id, name in wanted_allergens],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        self.changed_pill_ids.update(pill_id for pill_id, _ in wanted_allergens)
+        stats['allergens_created'] += len(wanted_allergens)
+        stats['allergens_deleted'] += len(stale_allergens)
+        lap('알레르기 저장')
+
+    def delete_in_batches(self, model, ids, batch_size):
+        # delete()는 행마다 post_delete 시그널을 보내서 행마다 캐시 무효화가 일어남
+        # -> 참조하는 모델이 없는 Nutrient/Allergen은 DELETE 쿼리만 실행 (바뀐 영양제는 changed_pill_ids로 한 번에 처리)
+        table = connection.ops.quote_name(model._meta.db_table)
+        column = connection.ops.quote_name(model._meta.pk.column)
+        with connection.cursor() as cursor:
+            for i in range(0, len(ids), batch_size):
+                chunk = ids[i:i + batch_size]
+                cursor.execute(f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(chunk))})", chunk)
@@ -0,0 +1,51 @@
+# 외부 API 호출 지표 확인 (pills/outbound.py)
+#   python manage.py outbound_stats           # 서비스별 호출/실패/타임아웃/거절 횟수, 평균/p95 응답 시간, 마지막 서킷 상태
+#   python manage.py outbound_stats --reset   # 카운터 초기화
+
+import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pills import outbound
+
+
+def percentile(histogram, ratio):
+    """구간별 개수에서 ratio 위치가 들어 있는 구간의 상한 (ms)"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    cumulative = 0
+    for bound, count in histogram:
+        cumulative += count
+        if cumulative >= total * ratio:
+            return bound
+    return 'inf'
+
+
+class Command(BaseCommand):
+    help = '외부 API(네이버/GMS/카카오/구글) 호출 지표와 서킷 브레이커 상태를 보여줍니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='카운터 초기화')
+
+    def handle(self, *args, **options):
+        for name in getattr(settings, 'OUTBOUND_PROVIDERS', {}):
+            m = outbound.get_metrics(name)
+            measured = m['success'] + m['failure'] + m['timeout']
+            avg = f"{m['latency_ms'] / measured:.0f}ms" if measured else '-'
+            p95 = percentile(m['histogram'], 0.95)
+            p95 = '-' if p95 is None else (f"{p95}ms 이하" if p95 != 'inf' else f"{outbound.LATENCY_BUCKETS[-1]}ms 초과")
+
+            state = '-'
+            if m['state']:
+                at = datetime.datetime.fromtimestamp(m['state']['at']).strftime('%m-%d %H:%M:%S')
+                state = f"{m['state']['state']} ({at})"
+
+            self.stdout.write(
+                f"🌐 {name:<12} 호출 {m['calls']:,} | 성공 {m['success']:,} 실패 {m['failure']:,} "
+                f"타임아웃 {m['timeout']:,} 거절 {m['rejected']:,} | 평균 {avg} p95 {p95} | 서킷 {state}"
+            )
+
+        if options['reset']:
+            for name in getattr(settings, 'OUTBOUND_PROVIDERS', {}):
+                outbound.reset_metrics(name)
+            self.stdout.write(self.style.WARNING("♻️ 카운터를 초기화했습니다."))
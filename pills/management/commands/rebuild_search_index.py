@@ -0,0 +1,24 @@
+# 검색 인덱스(FTS) 전체 재생성
+# load_pills_data 처럼 대량으로 데이터를 바꾼 뒤 한 번 실행해주세요.
+
+import time
+from django.core.management.base import BaseCommand
+from pills.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Pill 전체를 다시 읽어 검색 인덱스(한글 바이그램 FTS)를 재생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 번에 인덱싱할 개수')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        start_time = time.time()
+
+        total = backend.rebuild(batch_size=options['batch_size'])
+
+        elapsed = time.time() - start_time
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ 검색 인덱스 재생성 완료! ({backend.__class__.__name__}, {total}건, {elapsed:.1f}초)"
+        ))
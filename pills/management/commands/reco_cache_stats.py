@@ -0,0 +1,24 @@
+# 챗봇 추천 캐시 적중률 확인
+#   python manage.py reco_cache_stats           # 적중/실패 횟수, 적중률, 저장된 답변 수
+#   python manage.py reco_cache_stats --reset   # 카운터 초기화
+
+from django.core.management.base import BaseCommand
+from pills import reco_cache
+
+
+class Command(BaseCommand):
+    help = '챗봇 추천(Gemini) 응답 캐시의 적중률을 보여줍니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='적중/실패 카운터 초기화')
+
+    def handle(self, *args, **options):
+        metrics = reco_cache.get_metrics()
+        entries = '-' if metrics['entries'] is None else f"{metrics['entries']:,}개"
+        self.stdout.write(self.style.SUCCESS(
+            f"📊 적중 {metrics['hits']:,}회 / 실패 {metrics['misses']:,}회 "
+            f"(적중률 {metrics['hit_ratio'] * 100:.1f}%) | 저장된 답변 {entries}"
+        ))
+        if options['reset']:
+            reco_cache.reset_metrics()
+            self.stdout.write(self.style.WARNING("♻️ 카운터를 초기화했습니다."))
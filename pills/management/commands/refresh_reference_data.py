@@ -0,0 +1,22 @@
+# 기준 데이터(카테고리 목록 / 전체 성분명 / 알레르기 목록) 캐시 무효화 + 다시 만들기 (pills/reference_data.py)
+# 기준 데이터 버전을 올리므로 모든 워커가 PILL_REFERENCE_CHECK_INTERVAL초 안에 새 목록으로 바뀝니다.
+# load_pills_data / load_allergies 가 끝날 때 자동으로 실행되고, 직접 DB를 고친 뒤에도 실행해주세요.
+#   python manage.py refresh_reference_data
+
+import time
+from django.core.management.base import BaseCommand
+from pills.reference_data import registry
+
+
+class Command(BaseCommand):
+    help = '카테고리/성분명/알레르기 목록 캐시를 무효화하고 새로 만듭니다.'
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        versions = registry.refresh()
+        elapsed = time.time() - start_time
+
+        sizes = ', '.join(f"{name} {len(registry.get(name)[1]['data']):,}개" for name in versions)
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ 기준 데이터 갱신 완료! 버전 {max(versions.values())} ({sizes}, {elapsed:.2f}초)"
+        ))
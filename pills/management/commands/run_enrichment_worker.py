@@ -0,0 +1,102 @@
+# 네이버 쇼핑 정보 수집 워커
+# detail 뷰가 등록한 EnrichmentJob을 꺼내서 네이버 API로 가격/링크/이미지를 채웁니다.
+# 별도 브로커 없이 DB 테이블만으로 동작하므로 로컬에서도 바로 실행할 수 있습니다.
+#   python manage.py run_enrichment_worker          # 계속 실행 (작업이 없으면 대기)
+#   python manage.py run_enrichment_worker --once   # 쌓인 작업만 처리하고 종료
+# 에러 난 작업은 next_attempt_at까지 미뤘다가 다시 시도합니다. (재시도할수록 간격 2배, pills/enrichment.py)
+
+import time
+from django.core.management.base import BaseCommand
+from pills.enrichment import apply_link_data, claim_jobs, requeue_stale_jobs, save_results, schedule_retry
+from pills.naver_client import NaverQuotaExceeded, get_naver_client
+from pills.outbound import OutboundUnavailable
+from pills.utils import get_purchase_link
+
+
+class Command(BaseCommand):
+    help = 'EnrichmentJob 큐를 처리하여 영양제의 네이버 쇼핑 정보를 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='한 번에 가져올 작업 수')
+        parser.add_argument('--idle-sleep', type=float, default=5, help='작업이 없을 때 대기 시간(초)')
+        parser.add_argument('--max-attempts', type=int, default=3, help='에러 시 최대 재시도 횟수')
+        parser.add_argument('--once', action='store_true', help='대기 중인 작업이 없으면 종료')
+
+    def handle(self, *args, **options):
+        # 초당 호출 제한/하루 한도는 공용 네이버 클라이언트가 지키므로 워커에서는 따로 대기하지 않음
+        quota = get_naver_client().quota
+        processed = 0
+
+        self.stdout.write(self.style.SUCCESS("🚀 네이버 쇼핑 정보 수집 워커 시작"))
+
+        while True:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"♻️ 멈춰 있던 작업 {requeued}개를 다시 대기시켰습니다."))
+
+            jobs = claim_jobs(options['batch_size'])
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['idle_sleep'])
+                continue
+
+            pills = []
+            quota_exceeded = False
+            unavailable = None
+            for job in jobs:
+                pill = job.pill
+                if quota_exceeded or unavailable:
+                    # 한도 초과/호출 차단 후 남은 작업은 시도 횟수를 올리지 않고 그대로 대기열로 돌려보냄
+                    job.status = 'pending'
+                    job.worker_token = ''
+                    continue
+
+                job.attempts += 1
+                try:
+                    link_data = get_purchase_link(pill.PRDLST_NM, pill.BSSH_NM)
+                    found = apply_link_data(pill, link_data)
+                    pills.append(pill)
+                    job.status = 'done'
+                    job.last_error = ''
+                    self.stdout.write(f"{'✅' if found else '❌'} [{pill.pk}] {pill.PRDLST_NM}")
+                except NaverQuotaExceeded as e:
+                    quota_exceeded = True
+                    job.attempts -= 1
+                    job.status = 'pending'
+                    job.worker_token = ''
+                    self.stdout.write(self.style.WARNING(f"⛔ {e}"))
+                except OutboundUnavailable as e:
+                    # 네이버 API 서킷 차단 -> 실패로 세지 않고 차단이 풀릴 때까지 쉼
+                    unavailable = e
+                    job.attempts -= 1
+                    job.status = 'pending'
+                    job.worker_token = ''
+                    self.stdout.write(self.style.WARNING(f"🔌 {e}"))
+                except Exception as e:
+                    job.last_error = str(e)
+                    if job.attempts < options['max_attempts']:
+                        # 바로 다시 가져가지 않도록 1분, 2분, 4분 ... 뒤로 미룸 (ENRICHMENT_RETRY_BACKOFF)
+                        schedule_retry(job)
+                    else:
+                        job.status = 'failed'
+                    self.stdout.write(self.style.ERROR(f"⚠️ [{pill.pk}] 에러 발생: {e}"))
+
+            save_results(pills, jobs)
+            processed += len(jobs)
+            self.stdout.write(self.style.SUCCESS(f"💾 {len(jobs)}건 저장 완료 (누적 {processed}건)"))
+
+            if quota_exceeded:
+                if options['once']:
+                    break
+                wait = quota.seconds_until_reset()
+                self.stdout.write(self.style.WARNING(f"💤 하루 한도 초기화까지 {wait / 60:.0f}분 대기합니다."))
+                time.sleep(wait)
+            elif unavailable:
+                if options['once']:
+                    break
+                wait = max(1, unavailable.retry_after)
+                self.stdout.write(self.style.WARNING(f"💤 네이버 API 호출 차단이 풀릴 때까지 {wait:.0f}초 대기합니다."))
+                time.sleep(wait)
+
+        self.stdout.write(self.style.SUCCESS(f"\n✨ 작업 완료! (총 {processed}건 처리)"))
@@ -0,0 +1,140 @@
+# 목록/상세 캐시 미리 채우기 (배포 직후, Redis를 비운 뒤, 데이터를 다시 불러온 뒤)
+# 첫 방문자가 DB 조회 비용을 내지 않도록 자주 보는 화면을 실제 뷰로 한 번씩 요청해서 캐시를 채웁니다.
+#   - 목록: 필터 없는 앞 페이지들, 제형별 첫 페이지, 카테고리별 성분/필터 첫 페이지, 많이 조회된 목록 조건 (pills/access_stats.py)
+#   - 상세: 많이 조회된 영양제 (집계가 없으면 영양제함에 많이 담긴 영양제)
+#   - 기준 데이터: 카테고리/성분명/알레르기 목록
+# 같은 키는 get_or_fill이 한 번만 채우므로 여러 워커/서버에서 동시에 실행해도 DB 조회는 중복되지 않습니다.
+#   python manage.py warm_cache
+#   python manage.py warm_cache --pages 10 --top-details 500 --workers 8
+#   python manage.py warm_cache --dry-run          # 요청할 주소만 출력
+# 요청은 PILL_WARM_CACHE_BASE_URL 주소로 들어온 것처럼 만들어서, 캐시된 응답의 next/previous 링크가 실제 서비스 주소를 가리킵니다.
+# PILL_WARM_CACHE_AUTO = True 이면 migrate / load_pills_data 뒤에 자동으로 실행됩니다.
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from pills import access_stats
+from pills.dosage_forms import DOSAGE_FORM_CHOICES
+from pills.models import Category, Pill
+
+
+class Command(BaseCommand):
+    help = '자주 보는 목록/상세 API를 미리 요청해서 캐시를 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=5, help='필터 없는 목록을 몇 페이지까지 채울지')
+        parser.add_argument('--shape-pages', type=int, default=1, help='제형별 목록을 몇 페이지까지 채울지')
+        parser.add_argument('--top-queries', type=int, default=50, help='많이 조회된 목록 조건 수')
+        parser.add_argument('--top-details', type=int, default=200, help='많이 조회된 영양제 상세 수')
+        parser.add_argument('--workers', type=int, default=4, help='동시에 요청할 수 (DB 부하를 보고 조절)')
+        parser.add_argument('--dry-run', action='store_true', help='요청하지 않고 주소만 출력')
+
+    # ==========================================
+    # 1. 채울 주소 목록
+    # ==========================================
+    def index_targets(self, options):
+        index_url = reverse('pills:index')
+        targets = [f"{index_url}?{urlencode({'page': page})}" for page in range(1, options['pages'] + 1)]
+        for _, label in DOSAGE_FORM_CHOICES:
+            targets += [
+                f"{index_url}?{urlencode({'shapes': label, 'page': page})}"
+                for page in range(1, options['shape_pages'] + 1)
+            ]
+
+        # 카테고리 클릭 -> 성분 목록, 카테고리 조합 필터 첫 페이지
+        categories_url, filter_url = reverse('pills:category_list'), reverse('pills:pill_filter')
+        for category_id in Category.objects.values_list('id', flat=True):
+            targets.append(f"{categories_url}{category_id}/")
+            targets.append(f"{filter_url}?{urlencode({'q': f'category:{category_id}'})}")
+
+        top_queries = access_stats.top(access_stats.INDEX_QUERIES_KEY, options['top_queries']) or []
+        targets += [f"{index_url}?{query}" if query else index_url for query, _ in top_queries]
+        return targets
+
+    def detail_targets(self, options):
+        limit = options['top_details']
+        top_details = access_stats.top(access_stats.DETAIL_VIEWS_KEY, limit)
+        if top_details:
+            pill_ids = [int(pk) for pk, _ in top_details if pk.isdigit()]
+            source = '조회 수'
+        else:
+            # 조회 집계가 없으면 (Redis가 아니거나 처음 배포) 영양제함에 많이 담긴 순서로
+            pill_ids = list(
+                Pill.objects.exclude(price=-1).annotate(enrolled=Count('enrolled_users'))
+                .order_by('-enrolled', '-pk').values_list('pk', flat=True)[:limit]
+            )
+            source = '영양제함 등록 수'
+        self.stdout.write(f"📊 상세 {len(pill_ids)}개 ({source} 기준)")
+        return [reverse('pills:detail', args=[pk]) for pk in pill_ids]
+
+    # ==========================================
+    # 2. 요청 (실제 뷰를 그대로 실행 -> 같은 캐시 키/형식으로 채워짐)
+    # ==========================================
+    def warm(self, path):
+        factory = RequestFactory()
+        # testserver가 아닌 서비스 주소로 요청 (ALLOWED_HOSTS 통과, 목록 링크의 build_absolute_uri()가 이 주소를 씀)
+        base_url = urlsplit(getattr(settings, 'PILL_WARM_CACHE_BASE_URL', 'http://localhost'))
+        started = time.perf_counter()
+        try:
+            parts = urlsplit(path)
+            match = resolve(parts.path)
+            # 조회 집계에는 넣지 않음 (access_stats.WARM_HEADER)
+            request = factory.get(
+                path, secure=base_url.scheme == 'https', HTTP_HOST=base_url.netloc,
+                HTTP_ACCEPT_ENCODING='gzip', HTTP_X_CACHE_WARM='1',
+            )
+            response = match.func(request, *match.args, **match.kwargs)
+            status = response.status_code
+            error = None
+        except Exception as e:
+            status, error = None, str(e)
+        finally:
+            connection.close()  # 스레드마다 연 DB 연결 정리
+        return path, status, (time.perf_counter() - started) * 1000, error
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        targets = list(dict.fromkeys([
+            reverse('pills:category_list'), reverse('pills:all_ingredients_list'), reverse('accounts:allergy_list'),
+            *self.index_targets(options),
+            *self.detail_targets(options),
+        ]))
+
+        if options['dry_run']:
+            for path in targets:
+                self.stdout.write(path)
+            self.stdout.write(self.style.SUCCESS(f"✨ [dry-run] 요청할 주소 {len(targets)}개"))
+            return
+
+        self.stdout.write(f"🔥 캐시 채우기 시작: {len(targets)}개 주소, 동시 {options['workers']}개")
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for path, status, elapsed_ms, error in pool.map(self.warm, targets):
+                results.append((path, status, elapsed_ms))
+                if status is not None and status < 400:
+                    self.stdout.write(f"  ✅ {elapsed_ms:8.1f}ms  {path}")
+                else:
+                    self.stdout.write(self.style.ERROR(f"  ❌ {elapsed_ms:8.1f}ms  {path} ({error or status})"))
+
+        # 집계 ZSET은 많이 본 것만 남김
+        access_stats.trim(access_stats.DETAIL_VIEWS_KEY, options['top_details'] * 10)
+        access_stats.trim(access_stats.INDEX_QUERIES_KEY, options['top_queries'] * 10)
+
+        warmed = [ms for _, status, ms in results if status is not None and status < 400]
+        failed = len(results) - len(warmed)
+        warmed.sort()
+        p50 = warmed[len(warmed) // 2] if warmed else 0
+        slowest = max(results, key=lambda r: r[2]) if results else None
+        self.stdout.write(self.style.SUCCESS(
+            f"✨ 캐시 채우기 완료! {len(warmed):,}개 성공 / {failed:,}개 실패 "
+            f"(전체 {time.time() - start_time:.1f}초, 중간값 {p50:.1f}ms)"
+        ))
+        if slowest:
+            self.stdout.write(f"🐢 가장 오래 걸린 주소: {slowest[0]} ({slowest[2]:.1f}ms)")
@@ -0,0 +1,31 @@
+# 영양제 검색용 SQLite FTS5 가상 테이블
+# rowid = pills_pill.id, 각 컬럼에는 한글 바이그램 토큰이 공백으로 이어져 저장됩니다.
+# 생성 후 `python manage.py rebuild_search_index` 로 기존 데이터를 채워주세요.
+
+from django.db import migrations
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS pills_pill_fts "
+        "USING fts5(name, company, ingredient, shape, tokenize='unicode61')"
+    )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS pills_pill_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pills', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
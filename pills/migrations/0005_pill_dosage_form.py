@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:23
+# 기존 영양제는 모두 'other'로 시작합니다. 적용 후 `python manage.py backfill_dosage_forms` 로 채워주세요.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pills', '0004_enrichmentcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pill',
+            name='dosage_form',
+            field=models.CharField(choices=[('tablet', '정(알약)'), ('capsule', '캡슐'), ('powder', '분말(가루)'), ('granule', '과립'), ('liquid', '액상'), ('pill', '환'), ('jelly', '젤리'), ('other', '기타')], db_index=True, default='other', max_length=10, verbose_name='제형 (정규화)'),
+        ),
+    ]
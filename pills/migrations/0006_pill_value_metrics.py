@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:28
+# 기존 영양제는 값이 비어 있습니다. 적용 후 `python manage.py backfill_value_metrics` 로 채워주세요.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pills', '0005_pill_dosage_form'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pill',
+            name='price_per_day',
+            field=models.FloatField(blank=True, db_index=True, null=True, verbose_name='하루 가격'),
+        ),
+        migrations.AddField(
+            model_name='pill',
+            name='price_per_unit',
+            field=models.FloatField(blank=True, db_index=True, null=True, verbose_name='1회분(1정) 가격'),
+        ),
+    ]
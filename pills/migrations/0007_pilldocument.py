@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:40
+# 기존 영양제는 문서가 없습니다. 적용 후 `python manage.py build_pill_documents` 로 만들어주세요. (없으면 상세 첫 요청 때 만들어짐)
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pills', '0006_pill_value_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PillDocument',
+            fields=[
+                ('pill', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='pills.pill')),
+                ('body', models.JSONField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
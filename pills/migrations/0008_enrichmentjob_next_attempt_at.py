@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pills', '0007_pilldocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrichmentjob',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
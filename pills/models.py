@@ -3,6 +3,15 @@
 import datetime
 from django.db import models
 from django.conf import settings 
+from django.dispatch import Signal
+
+from .dosage_forms import DOSAGE_FORM_CHOICES, OTHER, normalize_dosage_form
+from .value_metrics import VALUE_FIELDS, apply_value_metrics
+
+# queryset.update() / bulk_update() / bulk_create() 는 post_save가 발생하지 않으므로
+# 캐시 버전, 검색 인덱스를 맞추기 위해 별도 시그널을 보냅니다. (pills/signals.py 에서 처리)
+# kwargs: pill_ids(변경된 Pill pk 리스트), fields(변경된 필드 리스트, 모르면 None)
+pill_rows_changed = Signal()
 
 # --------------------
 # 1. 카테고리 (기능성 분류) 모델
@@ -32,6 +41,32 @@ class Substance(models.Model):
 # --------------------
 # 3. 제품 (알약) 모델
 # --------------------
+class PillQuerySet(models.QuerySet):
+    """대량 수정 후에도 pill_rows_changed 시그널을 보내는 QuerySet"""
+
+    def update(self, **kwargs):
+        pill_ids = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        if pill_ids:
+            pill_rows_changed.send(sender=self.model, pill_ids=pill_ids, fields=list(kwargs))
+        return rows
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        # 내부적으로 filter().update()를 부르므로, 시그널이 중복되지 않게 기본 QuerySet으로 실행
+        rows = models.QuerySet(self.model, using=self.db).bulk_update(objs, fields, batch_size=batch_size)
+        if objs:
+            pill_rows_changed.send(sender=self.model, pill_ids=[obj.pk for obj in objs], fields=list(fields))
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        pill_ids = [obj.pk for obj in objs if obj.pk is not None]
+        if pill_ids:
+            pill_rows_changed.send(sender=self.model, pill_ids=pill_ids, fields=None)
+        return objs
+
+
 class Pill(models.Model):
     category = models.ForeignKey(
         Category, on_delete=models.PROTECT, related_name='pills', verbose_name="대표 카테고리"
@@ -47,6 +82,10 @@ class Pill(models.Model):
     PRMS_DT = models.CharField(max_length=10, verbose_name="허가(신고) 일자")
     POG_DAYCNT = models.CharField(max_length=50, verbose_name="소비기한 (기간)")
     PRDT_SHAP_CD_NM = models.CharField(max_length=50, verbose_name="제품 형태 (예: 캡슐, 분말)")
+    # PRDT_SHAP_CD_NM을 정규화한 제형 코드 (제형 필터용, pills/dosage_forms.py)
+    dosage_form = models.CharField(
+        max_length=10, choices=DOSAGE_FORM_CHOICES, default=OTHER, db_index=True, verbose_name="제형 (정규화)"
+    )
     
     # --- 상세 정보/섭취 정보 ---
     DISPOS = models.CharField(max_length=255, verbose_name="성상 (제품의 외관)")
@@ -70,9 +109,29 @@ class Pill(models.Model):
     purchase_url = models.URLField(null=True, blank=True) # 구매 링크
     price = models.IntegerField(null=True, blank=True)    # 가격
     mall_name = models.CharField(max_length=50, null=True, blank=True) # 판매처
+    # --- 가성비 (가격 / 수량 / 섭취방법으로 계산해서 저장, pills/value_metrics.py) ---
+    price_per_unit = models.FloatField(null=True, blank=True, db_index=True, verbose_name="1회분(1정) 가격")
+    price_per_day = models.FloatField(null=True, blank=True, db_index=True, verbose_name="하루 가격")
+
+    objects = PillQuerySet.as_manager()
+
     def __str__(self):
         return self.PRDLST_NM
 
+    def save(self, *args, **kwargs):
+        # 제형 원문에 맞춰 정규화된 제형, 가격/수량에 맞춰 가성비도 같이 저장 (bulk_create/bulk_update는 호출하는 쪽에서 채움)
+        self.dosage_form = normalize_dosage_form(self.PRDT_SHAP_CD_NM)
+        apply_value_metrics(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'PRDT_SHAP_CD_NM' in update_fields:
+                update_fields.add('dosage_form')
+            if update_fields & {'price', 'amount', 'unit_type', 'NTK_MTHD'}:
+                update_fields.update(VALUE_FIELDS)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
 # --------------------
 # 4. 영양소 함량 (중간 연결) 모델
 # --------------------
@@ -111,9 +170,72 @@ class Allergen(models.Model):
 
     def __str__(self):
         return f'{self.pill.PRDLST_NM} - {self.name}'
-    
+
+# --------------------
+# 5-1. 영양제 상세 응답 문서 (비정규화)
+# --------------------
+class PillDocument(models.Model):
+    """
+    detail 응답(PillDetailSerializer 결과: 영양제 + 카테고리 + 성분 + 알레르기)을 미리 만들어 둔 JSON.
+    영양제/성분/알레르기가 바뀌면 pills/signals.py 가 다시 만들고, 전체는 build_pill_documents 명령어로 만듭니다.
+    -> 캐시가 비어 있어도 상세는 pk 조회 한 번으로 응답 (pills/documents.py)
+    """
+    pill = models.OneToOneField(Pill, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    body = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.pill_id} 상세 문서'
+
+# --------------------
+# 6. 네이버 쇼핑 정보 수집 작업 큐
+# --------------------
+class EnrichmentJob(models.Model):
+    """
+    가격/구매링크/이미지가 없는 영양제를 네이버 쇼핑 API로 채우는 작업.
+    detail 뷰가 등록하고 run_enrichment_worker 명령어가 처리합니다. (영양제당 1개 -> 중복 등록 방지)
+    """
+    STATUS_CHOICES = (
+        ('pending', '대기'),
+        ('running', '처리 중'),
+        ('done', '완료'),
+        ('failed', '실패'),
+    )
+    pill = models.OneToOneField(Pill, on_delete=models.CASCADE, related_name='enrichment_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    worker_token = models.CharField(max_length=32, blank=True) # 작업을 가져간 워커 식별용
+    # 에러로 다시 대기하는 작업은 이 시각 이후에만 가져감 (재시도할수록 간격을 늘림, pills/enrichment.py schedule_retry)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.pill_id} ({self.status})'
+
+
+class EnrichmentCheckpoint(models.Model):
+    """
+    enrich_pills 명령어의 진행 위치.
+    중간에 멈추거나(에러, 하루 한도 초과) 서버가 재시작되어도 last_key 다음부터 이어서 처리합니다.
+    (DB 대상: 마지막으로 처리한 Pill pk / JSON 대상: 마지막으로 처리한 항목 순번)
+    """
+    name = models.CharField(max_length=100, unique=True)
+    last_key = models.BigIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    found = models.PositiveIntegerField(default=0)
+    missing = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.name} ({self.last_key})'
+
 # --------------------
-# 6. 기타 모델 (커뮤니티)
+# 7. 기타 모델 (커뮤니티)
 # --------------------
 class Thread(models.Model):
     title = models.CharField(max_length=100)
@@ -0,0 +1,195 @@
+# pills/naver_client.py
+# 네이버 쇼핑 검색 API 공용 클라이언트
+#
+# - 커넥션 풀 / 타임아웃 / 서킷 브레이커 / 동시 호출 제한은 공용 외부 호출 모듈 사용 (pills/outbound.py, 'naver_shop')
+# - 초당 호출 제한 (네이버: 초당 10회) : 캐시(Redis) 기반이라 스레드/프로세스/서버가 달라도 공유됨
+# - 하루 호출 한도 (네이버: 25,000회) : 한도를 넘으면 NaverQuotaExceeded 발생
+# - 일시적인 오류(타임아웃, 429, 5xx)는 지터를 섞은 지수 백오프로 재시도
+#   (서킷이 차단된 상태면 재시도하지 않고 OutboundUnavailable을 그대로 올림)
+#   재시도를 다 써도 실패하면 OutboundError -> '검색 결과 없음'(None)과 구분되어 워커가 나중에 다시 시도
+# - asyncio용 asearch()/asearch_many() 제공 (내부적으로 같은 커넥션 풀을 스레드에서 사용)
+#
+# utils.search_naver_shopping() 이 이 클라이언트를 사용하므로,
+# get_purchase_link()를 쓰는 모든 명령어/워커가 같은 제한을 공유합니다.
+
+import asyncio
+import datetime
+import random
+import threading
+import time
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .outbound import OutboundError, OutboundUnavailable, get_provider
+
+
+NAVER_SHOP_URL = "https://openapi.naver.com/v1/search/shop.json"
+KST = ZoneInfo('Asia/Seoul')
+
+
+class NaverQuotaExceeded(Exception):
+    """오늘 사용할 수 있는 네이버 API 호출 횟수를 모두 사용함"""
+
+
+# ==========================================
+# 1. 초당 호출 제한 (토큰 버킷)
+# ==========================================
+class TokenBucket:
+    """
+    interval초마다 rate * interval개의 토큰이 다시 채워지는 버킷.
+    토큰 수는 캐시의 구간별 카운터(incr)로 관리하므로 여러 프로세스가 같은 버킷을 나눠 씁니다.
+    (기본: 0.1초마다 1개 = 초당 10회)
+    """
+
+    def __init__(self, name, rate, interval=0.1):
+        self.name = name
+        self.interval = interval
+        self.tokens = max(1, int(rate * interval))
+
+    def acquire(self):
+        while True:
+            now = time.time()
+            window = int(now / self.interval)
+            key = f'{self.name}_bucket_{window}'
+            cache.add(key, 0, timeout=max(1, int(self.interval * 10)))
+            try:
+                used = cache.incr(key)
+            except ValueError:
+                # add와 incr 사이에 키가 만료된 경우 -> 다음 구간에서 다시 시도
+                continue
+            if used <= self.tokens:
+                return
+
+            # 이번 구간의 토큰을 다 썼으면 다음 구간까지 대기 (여러 워커가 동시에 깨지 않도록 약간의 지터)
+            next_window = (window + 1) * self.interval
+            time.sleep(max(0, next_window - now) + random.uniform(0, self.interval / 10))
+
+
+# ==========================================
+# 2. 하루 호출 한도
+# ==========================================
+class DailyQuota:
+    """네이버 한도는 한국 시간 자정에 초기화되므로 KST 날짜별로 카운트합니다."""
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+
+    def _key(self):
+        return f'{self.name}_quota_{datetime.datetime.now(KST):%Y%m%d}'
+
+    def used(self):
+        return cache.get(self._key(), 0)
+
+    def remaining(self):
+        return max(0, self.limit - self.used())
+
+    def seconds_until_reset(self):
+        now = datetime.datetime.now(KST)
+        tomorrow = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (tomorrow - now).total_seconds()
+
+    def consume(self):
+        key = self._key()
+        cache.add(key, 0, timeout=60 * 60 * 25)
+        if cache.incr(key) > self.limit:
+            raise NaverQuotaExceeded(f"네이버 API 하루 한도({self.limit}건)를 모두 사용했습니다.")
+
+
+# ==========================================
+# 3. 클라이언트
+# ==========================================
+class NaverShoppingClient:
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, client_id, client_secret, rate=10, daily_limit=25000,
+                 timeout=(3, 5), max_retries=3):
+        self.headers = {
+            "X-Naver-Client-Id": client_id or '',
+            "X-Naver-Client-Secret": client_secret or '',
+        }
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket('naver_shop', rate)
+        self.quota = DailyQuota('naver_shop', daily_limit)
+        self.provider = get_provider('naver_shop')
+
+    def _backoff(self, attempt):
+        # 지수 백오프 + full jitter (0.5초, 1초, 2초 ... 범위 안에서 랜덤)
+        time.sleep(random.uniform(0, 0.5 * (2 ** attempt)))
+
+    def search(self, query, display=1, sort='sim'):
+        """
+        검색 결과 첫 번째 상품(dict)을 반환. 결과가 없거나 재시도해도 소용없는 4xx면 None,
+        일시적인 오류가 재시도 후에도 계속되면 OutboundError
+        """
+        params = {"query": query, "display": display, "sort": sort}
+
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.provider.ensure_available()  # 차단 중이면 한도를 쓰지 않고 바로 실패
+            self.quota.consume()
+            self.bucket.acquire()
+            try:
+                res = self.provider.get(NAVER_SHOP_URL, headers=self.headers, params=params, timeout=self.timeout)
+            except OutboundUnavailable:
+                raise
+            except OutboundError as e:
+                print(f"⚠️ 네이버 API 연결 오류 ({attempt + 1}회차): {e}")
+                last_error = e
+                self._backoff(attempt)
+                continue
+
+            if res.status_code == 200:
+                try:
+                    items = res.json().get('items') or []
+                except ValueError:
+                    raise OutboundError(self.provider.name, '응답을 JSON으로 읽을 수 없습니다')
+                return items[0] if items else None
+
+            if res.status_code in self.RETRY_STATUS:
+                last_error = f'HTTP {res.status_code}'
+                self._backoff(attempt)
+                continue
+
+            # 인증 오류 등 재시도해도 소용없는 경우
+            print(f"❌ 네이버 API 오류 {res.status_code}: {res.text[:200]}")
+            return None
+        raise OutboundError(self.provider.name, f'{self.max_retries + 1}회 시도 모두 실패 ({last_error})')
+
+    async def asearch(self, query, **kwargs):
+        """asyncio 코드에서 사용 (같은 커넥션 풀/제한을 공유)"""
+        return await asyncio.to_thread(self.search, query, **kwargs)
+
+    async def asearch_many(self, queries, concurrency=8):
+        """여러 검색어를 동시에 조회 -> 입력 순서대로 결과 리스트 반환"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(query):
+            async with semaphore:
+                return await self.asearch(query)
+
+        return await asyncio.gather(*(run(query) for query in queries))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_naver_client():
+    """프로세스당 하나의 클라이언트(커넥션 풀)를 공유"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NaverShoppingClient(
+                    settings.NAVER_CLIENT_ID,
+                    settings.NAVER_SECRET_KEY,
+                    rate=getattr(settings, 'NAVER_RATE_LIMIT', 10),
+                    daily_limit=getattr(settings, 'NAVER_DAILY_QUOTA', 25000),
+                    timeout=getattr(settings, 'NAVER_TIMEOUT', (3, 5)),
+                )
+    return _client
@@ -0,0 +1,200 @@
+# pills/ngram_index.py
+# 제품명/제조사 부분 검색용 메모리 역색인 (바이그램/트라이그램 -> 제품 ID 포스팅 리스트)
+#
+# "루테", "종근" 처럼 단어 조각만 입력해도 찾을 수 있도록
+# 텍스트의 연속된 2글자, 3글자마다 제품 ID를 모아둡니다.
+# 검색할 때는 검색어의 n-gram 포스팅 리스트 중 가장 짧은 것을 골라 실제 포함 여부만 확인하므로
+# 결과는 기존 __icontains 검색과 동일합니다.
+
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.core.cache import cache
+
+
+class NgramIndex:
+    """
+    하나의 텍스트 필드에 대한 n-gram 역색인 (기본: 2글자 + 3글자).
+    포스팅 리스트는 오름차순 정렬된 array('I')(ID당 4바이트)로 보관합니다.
+    """
+
+    def __init__(self, sizes=(2, 3)):
+        self.sizes = tuple(sorted(sizes))
+        self._postings = {}
+        self._texts = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    @staticmethod
+    def normalize(text):
+        return (text or '').lower()
+
+    def _grams(self, text, sizes=None):
+        return {
+            text[i:i + n]
+            for n in (sizes or self.sizes)
+            for i in range(len(text) - n + 1)
+        }
+
+    @classmethod
+    def build(cls, docs, sizes=(2, 3)):
+        """docs: (doc_id, text) 이터러블로 인덱스를 한 번에 생성"""
+        index = cls(sizes=sizes)
+        postings = defaultdict(list)
+        for doc_id, text in docs:
+            text = cls.normalize(text)
+            index._texts[doc_id] = text
+            for gram in index._grams(text):
+                postings[gram].append(doc_id)
+        index._postings = {gram: array('I', sorted(ids)) for gram, ids in postings.items()}
+        return index
+
+    def add(self, doc_id, text):
+        self.remove(doc_id)
+        text = self.normalize(text)
+        self._texts[doc_id] = text
+        for gram in self._grams(text):
+            insort(self._postings.setdefault(gram, array('I')), doc_id)
+
+    def remove(self, doc_id):
+        text = self._texts.pop(doc_id, None)
+        if text is None:
+            return
+        for gram in self._grams(text):
+            ids = self._postings.get(gram)
+            if ids is None:
+                continue
+            pos = bisect_left(ids, doc_id)
+            if pos < len(ids) and ids[pos] == doc_id:
+                del ids[pos]
+            if not ids:
+                del self._postings[gram]
+
+    def search(self, fragment):
+        """
+        fragment가 포함된 문서 ID 리스트 (오름차순).
+        검색어가 가장 작은 n보다 짧으면 색인으로 찾을 수 없으므로 None 반환
+        """
+        fragment = self.normalize(fragment)
+        usable = [n for n in self.sizes if n <= len(fragment)]
+        if not usable:
+            return None
+
+        # 검색어 길이가 허용하는 가장 긴 n-gram을 사용 (포스팅이 짧을수록 빠름)
+        n = usable[-1]
+        lists = []
+        for gram in self._grams(fragment, sizes=(n,)):
+            ids = self._postings.get(gram)
+            if not ids:
+                return []
+            lists.append(ids)
+
+        # 검색어 자체가 n-gram 하나면 포스팅 리스트가 곧 정답
+        if len(fragment) == n:
+            return list(lists[0])
+
+        # 가장 짧은 포스팅 리스트만 후보로 삼고 실제 포함 여부를 확인
+        # (트라이그램은 변별력이 높아서 교집합을 더 돌리는 것보다 문자열 확인이 빠름,
+        #  n-gram이 모두 있어도 순서/연속성은 보장되지 않으므로 확인은 어차피 필요)
+        shortest = min(lists, key=len)
+        texts = self._texts
+        return [doc_id for doc_id in shortest if fragment in texts[doc_id]]
+
+
+# ==========================================
+# Pill 전용 인덱스 (프로세스당 1개)
+# ==========================================
+# search_type -> Pill 필드
+NGRAM_FIELDS = {
+    'name': 'PRDLST_NM',
+    'company': 'BSSH_NM',
+}
+
+
+class PillNgramIndex:
+    """
+    제품명/제조사 NgramIndex 묶음.
+    첫 검색 시 DB에서 읽어서 만들고, 카탈로그 버전이 만든 시점과 다르면 그 사이 바뀐 영양제만 다시 넣습니다.
+    (조합 필터 비트맵과 같은 변경 목록 pill_filter_changes_{버전}을 사용, pills/bitmap_filter.py)
+    버전 차이가 max_delta_versions보다 크거나 변경 목록이 없으면(만료, 너무 많이 바뀜) 전체를 다시 만듭니다.
+    """
+
+    def __init__(self, max_delta_versions=100):
+        self.max_delta_versions = max_delta_versions
+        self._indexes = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        from .models import Pill
+
+        rows = list(Pill.objects.values_list('id', *NGRAM_FIELDS.values()))
+        return {
+            search_type: NgramIndex.build((row[0], row[i + 1]) for row in rows)
+            for i, search_type in enumerate(NGRAM_FIELDS)
+        }
+
+    def get(self, search_type):
+        from .cache_utils import get_catalog_version
+
+        version = get_catalog_version()
+        with self._lock:
+            if self._indexes is not None and self._version != version and not self._catch_up(version):
+                self._indexes = None
+            if self._indexes is None:
+                self._indexes = self._load()
+                self._version = version
+            return self._indexes[search_type]
+
+    def _catch_up(self, version):
+        """그 사이 버전들의 변경 목록으로 바뀐 영양제만 다시 넣음 (lock 안에서 호출). 따라잡지 못하면 False"""
+        from .bitmap_filter import CHANGES_KEY
+        from .models import Pill
+
+        gap = version - self._version
+        if not 0 < gap <= self.max_delta_versions:
+            return False
+        keys = [CHANGES_KEY.format(version=v) for v in range(self._version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            return False
+
+        pill_ids = list(set().union(*changes.values()))
+        rows = {}
+        for i in range(0, len(pill_ids), 500):
+            rows.update(
+                (row[0], row[1:])
+                for row in Pill.objects.filter(pk__in=pill_ids[i:i + 500]).values_list('id', *NGRAM_FIELDS.values())
+            )
+        for pk in pill_ids:
+            values = rows.get(pk)
+            for i, index in enumerate(self._indexes.values()):
+                if values is None:
+                    index.remove(pk)  # 삭제된 영양제
+                else:
+                    index.add(pk, values[i])
+        self._version = version
+        return True
+
+    def update(self, pills):
+        with self._lock:
+            if self._indexes is None:
+                return
+            for pill in pills:
+                for search_type, field in NGRAM_FIELDS.items():
+                    self._indexes[search_type].add(pill.pk, getattr(pill, field))
+
+    def remove(self, pill_ids):
+        with self._lock:
+            if self._indexes is None:
+                return
+            for pk in pill_ids:
+                for index in self._indexes.values():
+                    index.remove(pk)
+
+    def invalidate(self):
+        with self._lock:
+            self._indexes = None
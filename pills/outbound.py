@@ -0,0 +1,295 @@
+# pills/outbound.py
+# 외부 API 호출 공용 모듈 (네이버 쇼핑, GMS/Gemini, 카카오/네이버/구글 로그인, 구글 캘린더)
+#
+# 외부 서비스 하나가 느려지면 그 호출을 기다리는 gunicorn 워커가 모두 묶여서
+# 외부 API와 상관없는 영양제 목록/상세까지 응답하지 못하게 됩니다. 그래서 서비스(provider)마다
+#   - 타임아웃 : 모든 호출에 (연결, 응답) 타임아웃. deadline을 주면 남은 시간만큼만 기다림
+#   - 벌크헤드 : 동시에 진행할 수 있는 호출 수 제한. 자리가 없으면 잠깐만 기다리고 바로 실패
+#                (느린 서비스 하나가 워커를 다 차지하지 못하게)
+#   - 서킷 브레이커 : 연속으로 failure_threshold번 실패하면 reset_timeout초 동안 호출하지 않고 바로 실패,
+#                     그 뒤 한 번 시험 호출해서 성공하면 다시 정상 (프로세스마다 따로 판단)
+#   - 지표 : 호출/실패/타임아웃/거절 횟수와 응답 시간 분포를 캐시 카운터로 집계 -> python manage.py outbound_stats
+# 를 적용합니다. 바로 실패(OutboundUnavailable)했을 때의 대체 응답(캐시된 답변, 503 안내 등)은 호출하는 쪽에서 정합니다.
+#
+#   provider = get_provider('kakao')
+#   res = provider.request('POST', url, data=..., deadline=deadline_in(8))
+
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+# 응답 시간 분포 구간 (ms)
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+METRIC_FIELDS = ('calls', 'success', 'failure', 'timeout', 'rejected', 'latency_ms')
+
+DEFAULT_CONFIG = {
+    'timeout': (3, 5),          # (연결, 응답) 타임아웃 (초)
+    'max_concurrency': 10,      # 프로세스당 동시 호출 수
+    'queue_timeout': 0.2,       # 벌크헤드 자리가 날 때까지 기다리는 최대 시간 (초)
+    'failure_threshold': 5,     # 연속 실패 몇 번이면 차단할지
+    'reset_timeout': 30,        # 차단 후 시험 호출까지 기다리는 시간 (초)
+}
+
+
+class OutboundError(Exception):
+    """외부 API 호출 실패 (연결 오류, 타임아웃 등)"""
+
+    def __init__(self, provider, message):
+        super().__init__(f"[{provider}] {message}")
+        self.provider = provider
+
+
+class OutboundUnavailable(OutboundError):
+    """호출하지 않고 바로 실패 (서킷 차단 / 동시 호출 초과 / 남은 시간 없음)"""
+
+    def __init__(self, provider, message, retry_after=0):
+        super().__init__(provider, message)
+        self.retry_after = retry_after
+
+
+def deadline_in(seconds):
+    """지금부터 seconds초 뒤 마감 시각 (여러 호출이 같은 제한 시간을 나눠 쓸 때)"""
+    return time.monotonic() + seconds
+
+
+# ==========================================
+# 1. 서킷 브레이커
+# ==========================================
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self):
+        """호출해도 되면 True. 차단 시간이 지나면 시험 호출 하나만 허용"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.retry_after() <= 0:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def cancel(self):
+        """allow()로 받은 시험 호출 자격을 쓰지 못했을 때 돌려놓음"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        """상태가 바뀌면 새 상태를 반환"""
+        with self._lock:
+            self._probing = False
+            self.failures = 0
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                return self.state
+        return None
+
+    def record_failure(self):
+        with self._lock:
+            self._probing = False
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                changed = self.state != self.OPEN
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return self.state if changed else None
+        return None
+
+
+# ==========================================
+# 2. 지표 (캐시 카운터 -> 모든 워커 합계)
+# ==========================================
+def _metric_key(provider, field):
+    return f'outbound:{provider}:{field}'
+
+
+def _incr(key, delta=1):
+    cache.add(key, 0, timeout=None)
+    cache.incr(key, delta)
+
+
+def record_metrics(provider, outcome, elapsed_ms):
+    """outcome: success / failure / timeout / rejected. 지표 저장 실패는 호출 결과에 영향을 주지 않음"""
+    try:
+        _incr(_metric_key(provider, 'calls'))
+        _incr(_metric_key(provider, outcome))
+        if outcome != 'rejected':
+            _incr(_metric_key(provider, 'latency_ms'), int(elapsed_ms))
+            bucket = next((b for b in LATENCY_BUCKETS if elapsed_ms <= b), 'inf')
+            _incr(_metric_key(provider, f'le_{bucket}'))
+    except Exception as e:
+        print(f"⚠️ 외부 호출 지표 저장 실패: {e}")
+
+
+def get_metrics(provider):
+    keys = [_metric_key(provider, f) for f in METRIC_FIELDS]
+    keys += [_metric_key(provider, f'le_{b}') for b in (*LATENCY_BUCKETS, 'inf')]
+    keys.append(_metric_key(provider, 'state'))
+    values = cache.get_many(keys)
+
+    metrics = {f: values.get(_metric_key(provider, f), 0) for f in METRIC_FIELDS}
+    metrics['histogram'] = [(b, values.get(_metric_key(provider, f'le_{b}'), 0)) for b in (*LATENCY_BUCKETS, 'inf')]
+    metrics['state'] = values.get(_metric_key(provider, 'state'))
+    return metrics
+
+
+def reset_metrics(provider):
+    keys = [_metric_key(provider, f) for f in METRIC_FIELDS]
+    keys += [_metric_key(provider, f'le_{b}') for b in (*LATENCY_BUCKETS, 'inf')]
+    keys.append(_metric_key(provider, 'state'))
+    cache.delete_many(keys)
+
+
+# ==========================================
+# 3. Provider (서비스별 세션 + 벌크헤드 + 브레이커)
+# ==========================================
+class Provider:
+
+    # 서비스 쪽 문제로 보는 응답 (4xx는 요청/인증 문제라 차단 사유에서 제외)
+    FAILURE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, name, timeout=(3, 5), max_concurrency=10, queue_timeout=0.2,
+                 failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _state_changed(self, state):
+        if state is None:
+            return
+        print(f"{'🔴' if state == CircuitBreaker.OPEN else '🟢'} [{self.name}] 서킷 {state}")
+        try:
+            cache.set(_metric_key(self.name, 'state'), {'state': state, 'at': time.time()}, timeout=None)
+        except Exception:
+            pass
+
+    def _timeout_for(self, timeout, deadline):
+        timeout = timeout or self.timeout
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._reject('제한 시간 초과 (호출 전)')
+        connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        return (min(connect, remaining), min(read, remaining))
+
+    def _reject(self, message, retry_after=0):
+        record_metrics(self.name, 'rejected', 0)
+        raise OutboundUnavailable(self.name, message, retry_after)
+
+    def ensure_available(self):
+        """차단 중이면 바로 OutboundUnavailable (하루 한도 차감처럼 호출 전에 하는 일이 있을 때 먼저 확인)"""
+        if self.breaker.state == CircuitBreaker.OPEN and self.breaker.retry_after() > 0:
+            self._reject('일시적으로 호출을 차단했습니다 (연속 실패)', self.breaker.retry_after())
+
+    @contextmanager
+    def _guard(self, deadline):
+        """브레이커 확인 + 벌크헤드 자리 확보"""
+        if not self.breaker.allow():
+            self._reject('일시적으로 호출을 차단했습니다 (연속 실패)', self.breaker.retry_after())
+
+        wait = self.queue_timeout
+        if deadline is not None:
+            wait = min(wait, max(0, deadline - time.monotonic()))
+        if not self._slots.acquire(timeout=wait):
+            self.breaker.cancel()
+            self._reject('동시 호출 수 초과')
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _finish(self, response, started):
+        elapsed_ms = (time.monotonic() - started) * 1000
+        if response.status_code in self.FAILURE_STATUS:
+            record_metrics(self.name, 'failure', elapsed_ms)
+            self._state_changed(self.breaker.record_failure())
+        else:
+            record_metrics(self.name, 'success', elapsed_ms)
+            self._state_changed(self.breaker.record_success())
+
+    def _fail(self, error, started):
+        elapsed_ms = (time.monotonic() - started) * 1000
+        record_metrics(self.name, 'timeout' if isinstance(error, requests.Timeout) else 'failure', elapsed_ms)
+        self._state_changed(self.breaker.record_failure())
+        raise OutboundError(self.name, f'{error.__class__.__name__}: {error}') from error
+
+    def request(self, method, url, deadline=None, timeout=None, **kwargs):
+        """requests.request와 같은 인자. 연결 오류/타임아웃은 OutboundError, 호출 차단은 OutboundUnavailable"""
+        timeout = self._timeout_for(timeout, deadline)
+        with self._guard(deadline):
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                self._fail(e, started)
+            self._finish(response, started)
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    @contextmanager
+    def stream(self, method, url, deadline=None, timeout=None, **kwargs):
+        """스트리밍 응답용. 본문을 다 읽을 때까지 벌크헤드 자리를 잡고 있음 (도중 연결 오류도 실패로 기록)"""
+        timeout = self._timeout_for(timeout, deadline)
+        with self._guard(deadline):
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, timeout=timeout, stream=True, **kwargs)
+            except requests.RequestException as e:
+                self._fail(e, started)
+            try:
+                with response:
+                    yield response
+            except requests.RequestException as e:
+                self._fail(e, started)
+            except BaseException:
+                # 호출한 쪽 사정으로 중간에 멈춤 (클라이언트 연결 끊김 등) -> 응답 상태 기준으로만 기록
+                self._finish(response, started)
+                raise
+            self._finish(response, started)
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name):
+    """프로세스당 서비스별 Provider 하나 (설정: settings.OUTBOUND_PROVIDERS[name])"""
+    provider = _providers.get(name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                config = dict(DEFAULT_CONFIG, **getattr(settings, 'OUTBOUND_PROVIDERS', {}).get(name, {}))
+                provider = _providers[name] = Provider(name, **config)
+    return provider
@@ -0,0 +1,224 @@
+# pills/pagination.py
+# 목록 API 커서(keyset) 페이지네이션
+#
+# PageNumberPagination은 페이지마다 COUNT(*) + OFFSET을 실행합니다.
+# OFFSET은 앞 페이지 행을 모두 읽고 버리기 때문에 4만 개 카탈로그를 깊이 넘길수록 느려집니다.
+# 커서 방식은 "마지막으로 본 항목의 정렬 값 다음부터 20개"(WHERE (price, id) > (...) LIMIT 21)만 읽으므로
+# 몇 번째 페이지든 첫 페이지와 비용이 같습니다.
+#
+#   ?pagination=cursor              -> 첫 페이지 (응답의 next/previous 링크에 커서가 들어 있음)
+#   ?cursor=<next 링크의 값>          -> 다음/이전 페이지 (커서는 base64 문자열, 내용은 신경 쓰지 않아도 됨)
+#   ?sort=latest | price | -price   -> 정렬 (기본 latest = 최신순)
+#   ?sort=value | unit_price        -> 가성비순 (하루 가격 / 1회분 가격이 싼 순, 값이 있는 제품만)
+#   ?with_count=1                   -> 전체 개수(count)도 포함. 필터별로 한 번 세어서 캐시 (근사값)
+#
+# 기존 ?page=N 요청은 그대로 PageNumberPagination으로 처리합니다.
+
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from .bitmap_filter import FilterResult
+
+# 정렬 이름 -> ((필드, 내림차순 여부), ...). 마지막은 항상 pk (같은 값끼리 순서 고정)
+PILL_SORTS = {
+    'latest': (('pk', True),),
+    'price': (('price', False), ('pk', False)),
+    '-price': (('price', True), ('pk', True)),
+    'value': (('price_per_day', False), ('pk', False)),
+    'unit_price': (('price_per_unit', False), ('pk', False)),
+}
+# 값이 없는(NULL) 행을 빼고 정렬하는 필드 (가성비는 계산된 제품끼리만 비교, 인덱스 순서 그대로 읽음)
+NOT_NULL_SORT_FIELDS = {'price_per_day', 'price_per_unit'}
+LATEST_SORTS = {'latest': (('pk', True),)}  # 후기 목록, 비트맵 결과 (pk 순서만)
+SUBSTANCE_SORTS = {**PILL_SORTS, 'latest': (('pk', False),)}  # 성분별 목록 (기본은 등록순)
+
+
+def get_sort(request, sorts=PILL_SORTS):
+    sort = request.GET.get('sort', 'latest')
+    return sort if sort in sorts else 'latest'
+
+
+def use_cursor(request):
+    return 'cursor' in request.GET or request.GET.get('pagination') == 'cursor'
+
+
+def page_token(request, sorts=PILL_SORTS):
+    """캐시 키에 넣을 페이지 구분값 (페이지 번호 또는 커서 + 정렬 + 개수 포함 여부)"""
+    sort = get_sort(request, sorts)
+    if use_cursor(request):
+        return f"c{request.GET.get('cursor', '')}_{sort}_{request.GET.get('with_count', '')}"
+    return f"{request.GET.get('page', 1)}_{sort}"
+
+
+def _nullable(field):
+    return field != 'pk' and field not in NOT_NULL_SORT_FIELDS
+
+
+def sort_fields(sort, sorts=PILL_SORTS):
+    """values() 목록에 같이 읽어야 하는 정렬 필드 (커서 위치 계산용, pk는 id로 항상 포함)"""
+    return [field for field, _ in sorts[sort] if field != 'pk']
+
+
+def apply_sort(queryset, sort, sorts=PILL_SORTS):
+    """정렬 적용 (NOT_NULL_SORT_FIELDS 정렬이면 값이 없는 행 제외)"""
+    keys = sorts[sort]
+    for field, _ in keys:
+        if field in NOT_NULL_SORT_FIELDS:
+            queryset = queryset.filter(**{f'{field}__isnull': False})
+    return queryset.order_by(*order_expressions(keys))
+
+
+def order_expressions(keys, reverse=False):
+    """정렬 키 -> order_by 인자. 값이 없는(NULL) 행은 항상 맨 뒤 (reverse면 맨 앞)"""
+    expressions = []
+    for field, descending in keys:
+        descending = descending != reverse
+        if not _nullable(field):
+            expressions.append(f'-{field}' if descending else field)
+            continue
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        expressions.append(F(field).desc(**nulls) if descending else F(field).asc(**nulls))
+    return expressions
+
+
+def _after(keys, values, reverse=False):
+    """정렬 순서상 values 바로 다음 행부터 (reverse면 이전 행부터) 고르는 조건"""
+    conditions = []
+    same = Q()
+    for (field, descending), value in zip(keys, values):
+        descending = descending != reverse
+        nulls_last = not reverse and _nullable(field)
+        nulls_first = reverse and _nullable(field)
+        if value is None:
+            beyond = None if not nulls_first else Q(**{f'{field}__isnull': False})
+            equal = Q(**{f'{field}__isnull': True})
+        else:
+            beyond = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+            if nulls_last:
+                beyond |= Q(**{f'{field}__isnull': True})
+            equal = Q(**{field: value})
+        if beyond is not None:
+            conditions.append(same & beyond)
+        same &= equal
+
+    condition = Q(pk__in=[])
+    for c in conditions:
+        condition |= c
+    return condition
+
+
+class KeysetPagination(CursorPagination):
+    """
+    (정렬 값, pk) 커서 페이지네이션.
+    DRF CursorPagination은 첫 번째 정렬 필드 하나만 커서에 넣고 같은 값은 offset으로 넘기는데,
+    가격처럼 같은 값/빈 값(NULL)이 많은 필드에서는 offset이 커지므로 pk까지 함께 비교합니다.
+    FilterResult(pills/bitmap_filter.py)를 넘기면 DB 대신 비트맵에서 다음 pk를 찾습니다.
+    """
+
+    page_size = 20
+    count_query_param = 'with_count'
+
+    def __init__(self, sort='latest', sorts=PILL_SORTS, page_size=None, count_cache_key=None):
+        self.sort = sort
+        self.keys = sorts[sort]
+        if page_size:
+            self.page_size = page_size
+        self.count_cache_key = count_cache_key
+        self.count = None
+
+    def _decode_position(self):
+        if self.cursor is None or self.cursor.position is None:
+            return None
+        try:
+            sort, *values = json.loads(self.cursor.position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if sort != self.sort or len(values) != len(self.keys) or not all(
+            v is None or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in values
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _position(self, row):
+        # row: 모델 객체 또는 values() 행(dict)
+        if isinstance(row, dict):
+            values = [row['id' if field == 'pk' else field] for field, _ in self.keys]
+        else:
+            values = [row.pk if field == 'pk' else getattr(row, field) for field, _ in self.keys]
+        return json.dumps([self.sort, *values])
+
+    def _count(self, queryset):
+        if isinstance(queryset, FilterResult):
+            return queryset.count()
+        if self.count_cache_key is None:
+            return queryset.count()
+        ttl = getattr(settings, 'PILL_APPROX_COUNT_TTL', 60 * 10)
+        return cache.get_or_set(self.count_cache_key, queryset.count, ttl)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        if isinstance(queryset, FilterResult):
+            # 비트맵 결과는 pk 순서로만 정렬됨
+            self.keys = (('pk', queryset.descending),)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        values = self._decode_position()
+        if str(request.GET.get(self.count_query_param, '')).lower() in ('1', 'true'):
+            self.count = self._count(queryset)
+
+        if isinstance(queryset, FilterResult):
+            ids = queryset.ids_after(values[0], self.page_size + 1, reverse) if values else queryset.ids(0, self.page_size + 1)
+            has_more = len(ids) > self.page_size
+            rows = queryset.hydrate(ids[:self.page_size])
+        else:
+            queryset = queryset.order_by(*order_expressions(self.keys, reverse))
+            if values:
+                queryset = queryset.filter(_after(self.keys, values, reverse))
+            rows = list(queryset[:self.page_size + 1])
+            has_more = len(rows) > self.page_size
+            rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # 다음/이전 링크 위치 (정방향: 더 있으면 다음, 커서로 왔으면 이전 / 역방향은 반대)
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else values is not None
+        self.next_position = self._position(rows[-1]) if has_next and rows else None
+        self.previous_position = self._position(rows[0]) if has_previous and rows else None
+        if not rows and values is not None:
+            # 끝을 지나친 커서: 이전 페이지는 커서 위치 앞쪽부터
+            self.previous_position = self.cursor.position if not reverse else None
+        return rows
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def get_paginated_response(self, data):
+        body = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            body['count'] = self.count
+        body['results'] = data
+        return Response(body)
+
+
+def get_paginator(request, page_size=20, sorts=PILL_SORTS, count_cache_key=None):
+    """?pagination=cursor / ?cursor=... 이면 KeysetPagination, 아니면 기존 PageNumberPagination"""
+    if use_cursor(request):
+        return KeysetPagination(get_sort(request, sorts), sorts, page_size, count_cache_key)
+    paginator = PageNumberPagination()
+    paginator.page_size = page_size
+    return paginator
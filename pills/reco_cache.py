@@ -0,0 +1,109 @@
+# pills/reco_cache.py
+# 챗봇 추천(Gemini) 응답 캐시
+#
+# 같은 고민("눈이 침침해", "부모님 선물")이 반복되면 LLM을 다시 부르지 않고 저장된 답변을 돌려줍니다.
+#   - 키: 정규화한 사용자 입력 + 검색된 후보 제품 ID 목록 (후보가 바뀌면 다른 키)
+#   - TTL: RECO_CACHE_TTL (기본 1일)
+#   - LRU: Redis ZSET에 마지막 사용 시각을 기록하고, RECO_CACHE_MAX_ENTRIES를 넘으면 오래 안 쓴 것부터 삭제
+#          (Redis가 아닌 캐시 백엔드에서는 TTL만 적용)
+#   - 적중/실패 횟수는 캐시 카운터로 집계 -> python manage.py reco_cache_stats
+
+import hashlib
+import re
+import time
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'reco_v1'
+LRU_KEY = 'reco_cache:lru'
+HITS_KEY = 'reco_cache:hits'
+MISSES_KEY = 'reco_cache:misses'
+
+
+def is_enabled():
+    return getattr(settings, 'RECO_CACHE_ENABLED', True)
+
+
+def get_ttl():
+    return getattr(settings, 'RECO_CACHE_TTL', 60 * 60 * 24)
+
+
+def get_max_entries():
+    return getattr(settings, 'RECO_CACHE_MAX_ENTRIES', 5000)
+
+
+def normalize_query(text):
+    """전각/반각 통일, 소문자, 문장부호 제거, 공백 정리 -> '눈이 침침해!!' == '눈이  침침해'"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def make_key(normalized_query, candidate_ids):
+    raw = f"{normalized_query}|{','.join(str(pk) for pk in candidate_ids)}"
+    return f"{KEY_PREFIX}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def _redis():
+    """django-redis 연결 (다른 캐시 백엔드면 None)"""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def _incr(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def _touch(key):
+    """LRU 순서 갱신 + 최대 개수를 넘으면 가장 오래 안 쓴 항목 삭제"""
+    conn = _redis()
+    if conn is None:
+        return
+    lru_key = cache.make_key(LRU_KEY)
+    conn.zadd(lru_key, {key: time.time()})
+    overflow = conn.zcard(lru_key) - get_max_entries()
+    if overflow > 0:
+        evicted = [member.decode() if isinstance(member, bytes) else member
+                   for member, _ in conn.zpopmin(lru_key, overflow)]
+        cache.delete_many(evicted)
+
+
+def get_reply(key):
+    value = cache.get(key)
+    if value is None:
+        _incr(MISSES_KEY)
+        return None
+    _incr(HITS_KEY)
+    _touch(key)
+    return value
+
+
+def store_reply(key, value):
+    cache.set(key, value, get_ttl())
+    _touch(key)
+
+
+def get_metrics():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    conn = _redis()
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+        'entries': conn.zcard(cache.make_key(LRU_KEY)) if conn is not None else None,
+    }
+
+
+def reset_metrics():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
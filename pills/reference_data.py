@@ -0,0 +1,124 @@
+# pills/reference_data.py
+# 기준 데이터(카테고리 목록 / 전체 성분명 / 알레르기 목록) 레지스트리
+#
+# 이 목록들은 픽스처를 다시 불러올 때만 바뀌는데, 요청마다 DB를 조회하고 있었습니다.
+# (전체 성분명은 Nutrient 테이블 전체에 DISTINCT ... ORDER BY)
+# 워커가 뜰 때(mypjt/wsgi.py, asgi.py) 한 번 만들어서 프로세스 메모리에 두고,
+# 기준 데이터 버전(pills/cache_utils.py)이 바뀌었을 때만 다시 만듭니다.
+#   - 프로세스 메모리 -> 없거나 버전이 다르면 Redis(다른 워커가 만든 것) -> 그래도 없으면 DB에서 만들어서 둘 다 저장
+#   - 버전 확인(Redis GET)은 PILL_REFERENCE_CHECK_INTERVAL초에 한 번만
+#   - 응답에는 ETag/304, Cache-Control(PILL_REFERENCE_CACHE_CONTROL), X-Reference-Version 헤더가 붙음
+#
+# 데이터를 다시 불러온 뒤에는: python manage.py refresh_reference_data
+# (load_pills_data / load_allergies 는 끝날 때 자동으로 실행)
+
+import threading
+import time
+
+from django.conf import settings
+
+from .cache_utils import bump_reference_version, get_or_fill, get_reference_version, reference_cache_key
+from .response_cache import data_response, render_entry, rendered_mode, replay
+
+VERSION_HEADER = 'X-Reference-Version'
+
+
+def build_categories():
+    from .models import Category
+    # 프론트에서 쓰기 편하게 id와 name만 추출
+    return [{"id": pk, "name": name} for pk, name in Category.objects.values_list('id', 'name')]
+
+
+def build_ingredients():
+    from .models import Nutrient
+    # 모든 성분명(substance_name)을 중복 제거 후 가나다순 정렬
+    return list(Nutrient.objects.values_list('substance_name', flat=True).distinct().order_by('substance_name'))
+
+
+def build_allergies():
+    from accounts.models import Allergy
+    from accounts.serializers import AllergySerializer
+    return AllergySerializer(Allergy.objects.all(), many=True).data
+
+
+# 이름 -> 응답 데이터를 만드는 함수
+REFERENCE_BUILDERS = {
+    'categories': build_categories,
+    'ingredients': build_ingredients,
+    'allergies': build_allergies,
+}
+
+
+class ReferenceRegistry:
+    """기준 데이터 응답을 버전별로 들고 있는 프로세스당 1개 객체"""
+
+    def __init__(self, builders=REFERENCE_BUILDERS):
+        self.builders = builders
+        self._entries = {}       # 이름 -> (버전, 캐시 값: 압축 JSON + ETag + data)
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def version(self):
+        interval = getattr(settings, 'PILL_REFERENCE_CHECK_INTERVAL', 5)
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= interval:
+            self._version = get_reference_version()
+            self._checked_at = now
+        return self._version
+
+    def _build(self, name):
+        data = self.builders[name]()
+        return {**render_entry(data), 'data': data}
+
+    def get(self, name):
+        version = self.version()
+        cached = self._entries.get(name)
+        if cached is not None and cached[0] == version:
+            return version, cached[1]
+
+        with self._lock:
+            cached = self._entries.get(name)
+            if cached is None or cached[0] != version:
+                # 다른 워커가 이미 만들었으면 Redis에서, 아니면 한 워커만 DB 조회 (get_or_fill)
+                entry = get_or_fill(reference_cache_key(name), lambda: self._build(name))
+                cached = self._entries[name] = (version, entry)
+        return cached
+
+    def warm(self):
+        """전부 미리 만들어 둠 (워커 시작 시)"""
+        return {name: self.get(name)[0] for name in self.builders}
+
+    def expire(self):
+        """다음 조회 때 버전을 바로 다시 확인 (이 프로세스에서 기준 데이터를 바꾼 경우)"""
+        self._version = None
+
+    def refresh(self):
+        """버전을 올려서 모든 워커/Redis의 옛 값을 무효화하고 새로 만듦"""
+        with self._lock:
+            self._version = bump_reference_version()
+            self._checked_at = time.monotonic()
+            self._entries.clear()
+        return self.warm()
+
+
+registry = ReferenceRegistry()
+
+
+def reference_response(request, name):
+    version, entry = registry.get(name)
+    cache_control = getattr(settings, 'PILL_REFERENCE_CACHE_CONTROL', None)
+    if rendered_mode(request):
+        response = replay(request, entry, cache_control)
+    else:
+        response = data_response(request, entry, cache_control)
+    response[VERSION_HEADER] = str(version)
+    return response
+
+
+def warm_reference_data():
+    """워커 시작 시 호출. DB/Redis가 아직 준비되지 않았으면 첫 요청 때 만들어지므로 실패해도 무시"""
+    try:
+        registry.warm()
+    except Exception as e:
+        print(f"⚠️ 기준 데이터 미리 만들기 실패 (첫 요청 때 다시 시도): {e}")
@@ -0,0 +1,43 @@
+# pills/renderers.py
+# 빠른 JSON 렌더러 (orjson)
+#
+# DRF 기본 JSONRenderer(json.dumps)는 한글이 많은 목록/상세 응답을 인코딩하는 데 CPU를 꽤 씁니다.
+# orjson이 설치되어 있으면 orjson으로 인코딩하고, 없으면 기본 JSONRenderer와 똑같이 동작합니다.
+# 결과(UTF-8, 공백 없는 JSON)는 기본 렌더러와 같고, 들여쓰기 요청(Accept: application/json; indent=4)만 기본 렌더러로 처리
+# settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] 에 등록되어 있음
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # requirements.txt에 있지만, 없어도 기본 렌더러로 동작
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # orjson이 모르는 타입(Decimal, 날짜, lazy 번역 문자열, QuerySet 등)은 DRF 인코더 규칙 그대로
+    return _drf_encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=_default,
+            # 날짜는 DRF와 같은 형식('Z', 밀리초)으로, 숫자 키는 문자열로 (json.dumps와 동일)
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+_renderer = FastJSONRenderer()
+
+
+def render_json(data):
+    """뷰 밖에서(응답 캐시 등) 같은 규칙으로 JSON bytes 만들기"""
+    return _renderer.render(data)
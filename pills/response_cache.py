@@ -0,0 +1,160 @@
+# pills/response_cache.py
+# 렌더링이 끝난 응답 bytes 캐시 + 조건부 요청(ETag / 304)
+#
+# get_or_fill로 응답 데이터(dict)를 캐시하면, 적중해도 매번 unpickle -> JSON 인코딩을 다시 합니다.
+# PILL_RESPONSE_CACHE_MODE = 'rendered' 이면 JSON으로 한 번 렌더링하고 gzip(+ brotli)으로 압축한 bytes + 헤더를 캐시해서
+# 적중하면 Redis GET 한 번 + 그대로 전송만 합니다. ('data' 이면 지금까지처럼 데이터를 캐시)
+#   - 캐시 키, 버전/TTL/락(single-flight)은 get_or_fill과 같음 (pills/cache_utils.py)
+#   - 모드별로 키가 달라서(':rendered' / ':data') 모드를 바꿔도 서로의 값을 읽지 않음
+#   - gzip을 받지 않는 클라이언트에는 압축을 풀어서, 브라우저로 보는 API 화면(HTML)은 데이터 모드로 응답
+#
+# 렌더링할 때 본문 해시로 강한 ETag를 만들어 같이 저장합니다. (인코딩별로 "해시-gzip" / "해시-br" / "해시")
+# 다시 방문한 클라이언트/CDN이 If-None-Match로 보내면 본문 없이 304만 보냄 -> 전송량 거의 0
+# 'data' 모드도 데이터와 함께 ETag를 저장해서 JSON 요청에는 같은 ETag/304/Cache-Control을 붙임
+# Cache-Control은 PILL_HTTP_CACHE_CONTROL (목록/상세), PILL_REFERENCE_CACHE_CONTROL (카테고리/성분/알레르기 목록)
+# Accept에 따라 JSON bytes / 브라우저 API 화면(HTML)으로 응답이 달라지므로 Vary에 Accept도 넣음 (CDN이 섞어서 주지 않게)
+# 브라우저 API 화면은 로그인 정보가 들어갈 수 있어서 ETag/Cache-Control(public)을 붙이지 않음
+# brotli 패키지가 설치되어 있으면 br 압축본도 같이 만들어 둠 (pip install brotli)
+
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from .cache_utils import get_or_fill
+from .renderers import render_json
+
+try:
+    import brotli
+except ImportError:  # 선택 사항: 없으면 gzip만
+    brotli = None
+
+JSON_CONTENT_TYPE = 'application/json'
+DEFAULT_CACHE_CONTROL = 'public, max-age=60, s-maxage=300, stale-while-revalidate=60'
+VARY_HEADERS = ('Accept', 'Accept-Encoding')
+
+
+def json_request(request):
+    """JSON으로 응답하는 요청인지 (브라우저 API 화면이 아니면)"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer is None or renderer.format == 'json'
+
+
+def rendered_mode(request):
+    """압축된 JSON bytes로 응답할지 (PILL_RESPONSE_CACHE_MODE='rendered' + JSON 요청)"""
+    if getattr(settings, 'PILL_RESPONSE_CACHE_MODE', 'data') != 'rendered':
+        return False
+    return json_request(request)
+
+
+def _accepted_encodings(request):
+    """Accept-Encoding -> {'gzip', 'br', ...} (q=0 은 제외)"""
+    encodings = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def _not_modified(request, etag):
+    """If-None-Match에 같은 본문의 ETag가 있으면 True (인코딩 접미사/약한 비교 W/ 는 무시)"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header or not etag:
+        return False
+    for tag in parse_etags(header):
+        if tag == '*' or tag.removeprefix('W/').strip('"').split('-')[0] == etag:
+            return True
+    return False
+
+
+def render_entry(data):
+    """응답 데이터 -> 캐시에 넣을 값 (압축한 JSON bytes + ETag + 헤더)"""
+    body = render_json(data)
+    return {
+        'body': gzip.compress(body, compresslevel=6),
+        'br': brotli.compress(body, quality=9) if brotli else None,
+        'etag': hashlib.md5(body).hexdigest(),
+        'headers': {'Content-Type': JSON_CONTENT_TYPE},
+    }
+
+
+def data_entry(data):
+    """'data' 모드 캐시 값 (응답 데이터 + 렌더링한 본문의 ETag, 인코딩은 요청마다)"""
+    return {'data': data, 'etag': hashlib.md5(render_json(data)).hexdigest()}
+
+
+def _cache_control(cache_control):
+    return cache_control or getattr(settings, 'PILL_HTTP_CACHE_CONTROL', DEFAULT_CACHE_CONTROL)
+
+
+def replay(request, entry, cache_control=None):
+    """캐시 값 -> HttpResponse (디코딩/인코딩 없이 그대로, 조건부 요청이면 304)"""
+    etag = entry.get('etag')
+    encodings = _accepted_encodings(request)
+    if entry.get('br') and 'br' in encodings:
+        encoding = 'br'
+    elif 'gzip' in encodings:
+        encoding = 'gzip'
+    else:
+        encoding = None
+
+    if _not_modified(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        if encoding == 'br':
+            response = HttpResponse(entry['br'])
+        elif encoding == 'gzip':
+            response = HttpResponse(entry['body'])
+        else:
+            response = HttpResponse(gzip.decompress(entry['body']))
+        for name, value in entry['headers'].items():
+            response[name] = value
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    if etag:
+        # 같은 내용이라도 압축 방식이 다르면 다른 bytes -> 강한 ETag도 인코딩별로 구분
+        response['ETag'] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+    response['Cache-Control'] = _cache_control(cache_control)
+    patch_vary_headers(response, VARY_HEADERS)
+    return response
+
+
+def data_response(request, entry, cache_control=None):
+    """'data' 모드 캐시 값 -> DRF Response (JSON 요청이면 ETag/304/Cache-Control까지)"""
+    if not json_request(request):
+        response = Response(entry['data'])
+        patch_vary_headers(response, VARY_HEADERS)
+        return response
+
+    etag = entry.get('etag')
+    response = HttpResponseNotModified() if _not_modified(request, etag) else Response(entry['data'])
+    if etag:
+        response['ETag'] = f'"{etag}"'
+    response['Cache-Control'] = _cache_control(cache_control)
+    patch_vary_headers(response, VARY_HEADERS)
+    return response
+
+
+def cached_response(request, cache_key, builder, cache_control=None, **fill_options):
+    """
+    get_or_fill(cache_key, builder) 결과로 응답.
+    cache_control: Cache-Control 헤더 (없으면 PILL_HTTP_CACHE_CONTROL)
+    fill_options는 get_or_fill에 그대로 전달 (ttl, stale_ttl 등)
+    """
+    if not rendered_mode(request):
+        entry = get_or_fill(f'{cache_key}:data', lambda: data_entry(builder()), **fill_options)
+        return data_response(request, entry, cache_control)
+    entry = get_or_fill(f'{cache_key}:rendered', lambda: render_entry(builder()), **fill_options)
+    return replay(request, entry, cache_control)
+
+
+def cached_reference_response(request, cache_key, builder):
+    """카테고리/성분/알레르기 목록처럼 거의 바뀌지 않는 기준 데이터 (CDN에 오래 캐시)"""
+    cache_control = getattr(settings, 'PILL_REFERENCE_CACHE_CONTROL', None)
+    return cached_response(request, cache_key, builder, cache_control=cache_control)
@@ -0,0 +1,255 @@
+# pills/search.py
+# 영양제 검색 백엔드 (index 뷰의 키워드 검색 담당)
+#
+# 기존에는 키워드 검색마다 PRDLST_NM / BSSH_NM / STDR_STND / PRDT_SHAP_CD_NM 에
+# __icontains(LIKE '%키워드%')를 걸어서 4만 행을 풀스캔했습니다.
+# 여기서는 SQLite FTS5 가상 테이블에 한글 바이그램(2글자 단위) 토큰을 미리 넣어두고,
+# 검색어도 같은 방식으로 쪼개서 MATCH + rank(bm25) 순으로 정렬합니다.
+#
+# settings.PILL_SEARCH_BACKEND 로 백엔드를 교체할 수 있습니다.
+
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .ngram_index import NGRAM_FIELDS, PillNgramIndex
+
+
+FTS_TABLE = 'pills_pill_fts'
+
+# search_type -> (FTS 컬럼명, Pill 필드명)
+SEARCH_COLUMNS = {
+    'name': ('name', 'PRDLST_NM'),
+    'company': ('company', 'BSSH_NM'),
+    'ingredient': ('ingredient', 'STDR_STND'),
+    'shape': ('shape', 'PRDT_SHAP_CD_NM'),
+}
+
+# 밑줄(_)은 FTS5 unicode61 토크나이저가 구분자로 취급하므로 제외
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+# ==========================================
+# 1. 한글 n-gram 토큰화
+# ==========================================
+def split_words(text):
+    """공백/특수문자 기준으로 단어만 뽑아서 소문자로 반환"""
+    if not text:
+        return []
+    return _WORD_RE.findall(text.lower())
+
+
+def ngram_tokens(text, n=2):
+    """
+    단어별로 n글자씩 겹쳐서 자른 토큰 리스트
+    예) '루테인 지아잔틴' -> ['루테', '테인', '지아', '아잔', '잔틴']
+    n글자보다 짧은 단어는 그대로 토큰이 됩니다.
+    """
+    tokens = []
+    for word in split_words(text):
+        if len(word) <= n:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + n] for i in range(len(word) - n + 1))
+    return tokens
+
+
+def build_match_query(keyword, search_type=''):
+    """
+    검색어 -> FTS5 MATCH 문법
+    단어마다 바이그램 구문("루테 테인")을 만들고 AND로 묶습니다.
+    한 글자 단어가 섞여 있으면 바이그램으로 찾을 수 없으므로 None 반환 (LIKE로 대체)
+    """
+    words = split_words(keyword)
+    if not words or any(len(word) < 2 for word in words):
+        return None
+
+    phrases = ' AND '.join(f'"{" ".join(ngram_tokens(word))}"' for word in words)
+
+    if search_type in SEARCH_COLUMNS:
+        columns = SEARCH_COLUMNS[search_type][0]
+    else:
+        columns = ' '.join(column for column, _ in SEARCH_COLUMNS.values())
+    return f'{{{columns}}} : ({phrases})'
+
+
+# ==========================================
+# 2. 기본 백엔드 (기존 icontains 방식)
+# ==========================================
+class BaseSearchBackend:
+    """
+    인덱스 없이 LIKE 검색만 하는 기본 백엔드.
+    FTS를 쓸 수 없는 DB이거나 검색어가 너무 짧을 때도 이 방식으로 처리합니다.
+    """
+
+    def filter(self, queryset, keyword, search_type='', rank=True):
+        """
+        검색어로 거른 queryset.
+        rank=True 이면 관련도순으로 정렬 (FTS), False 이면 queryset에 이미 걸린 정렬(가격순, 가성비순 등)을 유지
+        """
+        if search_type in SEARCH_COLUMNS:
+            field = SEARCH_COLUMNS[search_type][1]
+            return queryset.filter(**{f'{field}__icontains': keyword})
+
+        q = Q()
+        for _, field in SEARCH_COLUMNS.values():
+            q |= Q(**{f'{field}__icontains': keyword})
+        return queryset.filter(q)
+
+    def index_pills(self, pills):
+        """Pill 객체들을 인덱스에 반영 (기본 백엔드는 할 일 없음)"""
+
+    def remove_pills(self, pill_ids):
+        """인덱스에서 제거 (기본 백엔드는 할 일 없음)"""
+
+    def rebuild(self, batch_size=2000):
+        return 0
+
+    def reset_availability(self):
+        """인덱스 테이블이 생기거나 없어졌을 수 있을 때 (migrate 뒤) 다시 확인하도록"""
+
+
+# ==========================================
+# 3. SQLite FTS5 백엔드
+# ==========================================
+class SqliteFTSBackend(BaseSearchBackend):
+    """
+    pills_pill_fts 가상 테이블(마이그레이션 0002에서 생성)을 사용하는 백엔드.
+    rowid = Pill.pk 이고, 각 컬럼에는 바이그램 토큰을 공백으로 이어 붙인 문자열이 들어갑니다.
+    """
+
+    def __init__(self):
+        self._available = {}  # DB 이름 -> FTS 테이블이 있는지
+
+    def is_available(self):
+        if connection.vendor != 'sqlite':
+            return False
+        # 검색/저장마다 sqlite_master를 훑지 않도록 DB마다 한 번만 확인 (rebuild / migrate 뒤에는 다시 확인)
+        name = connection.settings_dict['NAME']
+        available = self._available.get(name)
+        if available is None:
+            available = self._available[name] = FTS_TABLE in connection.introspection.table_names()
+        return available
+
+    def reset_availability(self):
+        self._available.clear()
+
+    def filter(self, queryset, keyword, search_type='', rank=True):
+        match = build_match_query(keyword, search_type)
+        if match is None or not self.is_available():
+            return super().filter(queryset, keyword, search_type, rank)
+
+        pill_table = queryset.model._meta.db_table
+        # bm25 점수(rank)가 작을수록 관련도가 높음, 동점이면 최신순
+        # (extra의 order_by는 queryset의 정렬을 덮어쓰므로, 다른 정렬을 요청했으면 MATCH 조건만 추가)
+        order_by = [f'{FTS_TABLE}.rank', f'-{pill_table}.id'] if rank else None
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {pill_table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+            order_by=order_by,
+        )
+
+    @staticmethod
+    def _row(pill):
+        return (
+            pill.pk,
+            ' '.join(ngram_tokens(pill.PRDLST_NM)),
+            ' '.join(ngram_tokens(pill.BSSH_NM)),
+            ' '.join(ngram_tokens(pill.STDR_STND)),
+            ' '.join(ngram_tokens(pill.PRDT_SHAP_CD_NM)),
+        )
+
+    def _write_rows(self, cursor, rows):
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, company, ingredient, shape) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+    def index_pills(self, pills):
+        rows = [self._row(pill) for pill in pills]
+        if not rows or not self.is_available():
+            return
+        with connection.cursor() as cursor:
+            self._write_rows(cursor, rows)
+
+    def remove_pills(self, pill_ids):
+        pill_ids = list(pill_ids)
+        if not pill_ids or not self.is_available():
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in pill_ids])
+
+    def rebuild(self, batch_size=2000):
+        """인덱스를 비우고 Pill 전체를 다시 넣습니다. 처리한 개수를 반환"""
+        from .models import Pill
+
+        self.reset_availability()
+        if not self.is_available():
+            return 0
+
+        fields = ('id', 'PRDLST_NM', 'BSSH_NM', 'STDR_STND', 'PRDT_SHAP_CD_NM')
+        total = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            batch = []
+            for pill in Pill.objects.only(*fields).order_by('pk').iterator(chunk_size=batch_size):
+                batch.append(self._row(pill))
+                if len(batch) >= batch_size:
+                    self._write_rows(cursor, batch)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                self._write_rows(cursor, batch)
+                total += len(batch)
+        return total
+
+
+# ==========================================
+# 4. 메모리 n-gram 백엔드 (제품명/제조사 부분 검색)
+# ==========================================
+class NgramBackend(SqliteFTSBackend):
+    """
+    제품명(name)/제조사(company) 검색은 프로세스 메모리의 n-gram 역색인(pills/ngram_index.py)으로 처리하고,
+    나머지 search_type은 FTS 백엔드에 맡깁니다.
+    결과가 너무 많은(= 변별력이 없는) 검색어는 pk__in 목록이 커지므로 FTS/LIKE로 넘깁니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.max_ids = getattr(settings, 'PILL_NGRAM_MAX_IDS', 5000)
+        self.ngram_index = PillNgramIndex(max_delta_versions=getattr(settings, 'PILL_FILTER_MAX_DELTA_VERSIONS', 100))
+
+    def filter(self, queryset, keyword, search_type='', rank=True):
+        if search_type in NGRAM_FIELDS:
+            pill_ids = self.ngram_index.get(search_type).search(keyword)
+            if pill_ids is not None and len(pill_ids) <= self.max_ids:
+                return queryset.filter(pk__in=pill_ids)
+        return super().filter(queryset, keyword, search_type, rank)
+
+    def index_pills(self, pills):
+        pills = list(pills)
+        super().index_pills(pills)
+        # 메모리 색인은 롤백되지 않으므로 커밋된 뒤에 반영
+        transaction.on_commit(lambda: self.ngram_index.update(pills))
+
+    def remove_pills(self, pill_ids):
+        pill_ids = list(pill_ids)
+        super().remove_pills(pill_ids)
+        transaction.on_commit(lambda: self.ngram_index.remove(pill_ids))
+
+    def rebuild(self, batch_size=2000):
+        total = super().rebuild(batch_size=batch_size)
+        self.ngram_index.invalidate()
+        return total
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    backend_path = getattr(settings, 'PILL_SEARCH_BACKEND', 'pills.search.SqliteFTSBackend')
+    return import_string(backend_path)()
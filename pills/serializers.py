@@ -1,3 +1,5 @@
+from operator import itemgetter
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Pill, Category, Substance, Nutrient, Allergen, Thread, Comment, UserPill, CustomPill
@@ -51,6 +53,30 @@ class PillListSerializer(serializers.ModelSerializer):
             'PRIMARY_FNCLTY',  # 주요 기능 (목록 미리보기용)
         )
 
+# [2-1-1] 목록 조회 빠른 경로 (index, 성분별 목록, 조합 필터)
+# 목록에 나오는 컬럼만 values()로 읽고(카테고리는 JOIN으로 이름만), DRF 필드 처리 없이 dict로 바로 만듭니다.
+# 응답 모양은 PillListSerializer와 같음. values() 이름 -> 응답 키 (순서도 Meta.fields와 같게)
+PILL_LIST_COLUMNS = {
+    'id': 'id',
+    'PRDLST_NM': 'PRDLST_NM',
+    'BSSH_NM': 'BSSH_NM',
+    'category__name': 'category_name',
+    'cover': 'cover',
+    'PRIMARY_FNCLTY': 'PRIMARY_FNCLTY',
+}
+_LIST_KEYS = tuple(PILL_LIST_COLUMNS.values())
+_list_row = itemgetter(*PILL_LIST_COLUMNS)
+
+
+def pill_list_values(queryset, extra=()):
+    """목록 컬럼만 읽는 values() 쿼리셋 (extra: 커서 위치 계산에 필요한 정렬 필드 등)"""
+    return queryset.values(*PILL_LIST_COLUMNS, *extra)
+
+
+def serialize_pill_list(rows):
+    """pill_list_values() 행들 -> PillListSerializer(many=True).data 와 같은 리스트"""
+    return [dict(zip(_LIST_KEYS, _list_row(row))) for row in rows]
+
 # [2-2] 상세 조회용 (Detail): 모든 관계 데이터 포함 (Nested)
 class PillDetailSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True) # 카테고리 상세 정보
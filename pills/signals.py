@@ -0,0 +1,158 @@
+# pills/signals.py
+# Pill 변경 사항을 검색 인덱스와 캐시 버전(pills/cache_utils.py)에 바로 반영합니다.
+# queryset.update() / bulk_update() / bulk_create() 는 PillQuerySet이 보내는 pill_rows_changed로 처리합니다.
+# 조합 필터 비트맵(pills/bitmap_filter.py), 상세 문서(pills/documents.py)도 invalidate_pills()에서 바뀐 영양제만 고칩니다.
+# 트랜잭션 안에서 저장하면(관리자 화면 인라인, CASCADE 삭제, atomic) 커밋된 뒤에 무효화합니다.
+# (커밋 전에 버전을 올리면 다른 워커가 커밋 전 데이터로 새 버전 캐시를 채워서 TTL 동안 내보냄)
+# 한 트랜잭션에서 바뀐 영양제 pk는 모아 두었다가 커밋 때 한 번에 처리합니다.
+# (영양제 하나 + 인라인 성분 20개를 저장해도 문서 재생성/카탈로그 버전 올리기는 한 번)
+
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .bitmap_filter import get_filter_index
+from .cache_utils import bump_catalog_version, bump_pill_versions, bump_reference_version, bump_thread_version
+from .documents import rebuild_documents
+from .models import Pill, Nutrient, Allergen, Category, Substance, Thread, Comment, pill_rows_changed
+from .reference_data import registry as reference_registry
+from .search import SEARCH_COLUMNS, get_search_backend
+
+# 이 필드들이 바뀌었을 때만 검색 인덱스를 다시 씀
+SEARCH_FIELDS = {field for _, field in SEARCH_COLUMNS.values()}
+
+# 커밋을 기다리는 영양제 pk (DB 연결이 스레드마다 따로라서 트랜잭션도 스레드별)
+_pending = threading.local()
+
+
+def invalidate_reference_data_cache():
+    """카테고리/성분명/알레르기 목록 무효화 (다른 워커는 PILL_REFERENCE_CHECK_INTERVAL초 안에, 이 워커는 바로)"""
+    bump_reference_version()
+    reference_registry.expire()
+
+
+def invalidate_pills(pill_ids):
+    """
+    목록 캐시(카탈로그 버전) + 해당 영양제 상세 캐시(영양제별 버전) 무효화 + 필터 비트맵/상세 문서 갱신
+    트랜잭션 안이면 커밋된 뒤에 실행 (롤백되면 실행하지 않음), 아니면 바로 실행
+    """
+    pending = getattr(_pending, 'pill_ids', None)
+    if pending is None:
+        pending = _pending.pill_ids = set()
+    pending.update(pill_ids)
+    # 호출마다 콜백을 걸지만 처음 실행된 콜백이 모인 pk를 모두 처리하고, 나머지는 할 일이 없음
+    # (세이브포인트가 롤백되면 그 안에서 건 콜백만 빠지므로 커밋되는 변경은 항상 처리됨)
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending():
+    pill_ids = getattr(_pending, 'pill_ids', None)
+    _pending.pill_ids = None
+    if pill_ids:
+        _invalidate_pills_now(list(pill_ids))
+
+
+def _invalidate_pills_now(pill_ids):
+    rebuild_documents(pill_ids)
+    bump_pill_versions(pill_ids)
+    version = bump_catalog_version()
+    get_filter_index().refresh(pill_ids, version)
+
+
+@receiver(post_save, sender=Pill)
+def index_pill_on_save(sender, instance, raw=False, **kwargs):
+    # loaddata(raw=True) 중에는 검색 인덱스 건너뜀 -> 끝나고 rebuild_search_index 실행
+    if not raw:
+        get_search_backend().index_pills([instance])
+    invalidate_pills([instance.pk])
+
+
+@receiver(post_delete, sender=Pill)
+def remove_pill_on_delete(sender, instance, **kwargs):
+    get_search_backend().remove_pills([instance.pk])
+    invalidate_pills([instance.pk])
+
+
+@receiver(pill_rows_changed, sender=Pill)
+def sync_bulk_changed_pills(sender, pill_ids, fields=None, **kwargs):
+    if fields is None or SEARCH_FIELDS.intersection(fields):
+        backend = get_search_backend()
+        # SQLite 파라미터 개수 제한을 넘지 않도록 나눠서 처리
+        for i in range(0, len(pill_ids), 500):
+            backend.index_pills(Pill.objects.filter(pk__in=pill_ids[i:i + 500]))
+    invalidate_pills(pill_ids)
+
+
+# 성분/알레르기는 상세 응답(PillDetailSerializer)에 포함되므로 해당 영양제 캐시도 무효화
+@receiver(post_save, sender=Nutrient)
+@receiver(post_delete, sender=Nutrient)
+@receiver(post_save, sender=Allergen)
+@receiver(post_delete, sender=Allergen)
+def invalidate_pill_relations(sender, instance, **kwargs):
+    invalidate_pills([instance.pill_id])
+
+
+# 카테고리/성분/알레르기 목록(기준 데이터) 캐시
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Substance)
+@receiver(post_delete, sender=Substance)
+@receiver(post_save, sender='accounts.Allergy')
+@receiver(post_delete, sender='accounts.Allergy')
+def invalidate_reference_data(sender, **kwargs):
+    invalidate_reference_data_cache()
+
+
+# 상세 응답에 카테고리 이름이 들어가므로 이름이 바뀌면 그 카테고리 영양제 문서/캐시도 갱신
+@receiver(post_save, sender=Category)
+def invalidate_category_pills(sender, instance, created=False, raw=False, **kwargs):
+    if created or raw:
+        return
+    pill_ids = list(instance.pills.values_list('pk', flat=True))
+    if pill_ids:
+        invalidate_pills(pill_ids)
+
+
+# 전체 성분명 목록(all_ingredients_list)은 Nutrient에서 뽑음
+# (load_pills_data의 bulk 저장은 시그널이 없으므로 끝날 때 refresh_reference_data 실행)
+@receiver(post_save, sender=Nutrient)
+@receiver(post_delete, sender=Nutrient)
+def invalidate_reference_data_on_nutrient(sender, **kwargs):
+    invalidate_reference_data_cache()
+
+
+@receiver(m2m_changed, sender=Category.substances.through)
+def invalidate_reference_data_on_mapping(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_reference_data_cache()
+
+
+# 후기 목록(thread_list) 캐시: 후기 작성/수정/삭제, 댓글 수, 좋아요 수가 바뀌면 무효화
+@receiver(post_save, sender=Thread)
+@receiver(post_delete, sender=Thread)
+def invalidate_thread_list(sender, instance, **kwargs):
+    bump_thread_version(instance.pill_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_thread_list_on_comment(sender, instance, **kwargs):
+    # 후기가 함께 삭제되는 중일 수 있으므로 객체 대신 pill_id만 조회
+    pill_id = Thread.objects.filter(pk=instance.thread_id).values_list('pill_id', flat=True).first()
+    if pill_id is not None:
+        bump_thread_version(pill_id)
+
+
+@receiver(m2m_changed, sender=Thread.likes.through)
+def invalidate_thread_list_on_like(sender, instance, action, reverse=False, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # user.liked_threads 쪽에서 바뀐 경우 (instance = User)
+        pill_ids = Thread.objects.filter(pk__in=kwargs.get('pk_set') or []).values_list('pill_id', flat=True)
+    else:
+        pill_ids = [instance.pill_id]
+    for pill_id in set(pill_ids):
+        bump_thread_version(pill_id)
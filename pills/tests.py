@@ -1,3 +1,772 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from urllib.parse import urlencode
+
+from .bitmap_filter import CHANGES_KEY, PillBitmapIndex, bitmap_ids, get_filter_index, parse_filter, term
+from .cache_utils import CacheFillTimeout, fill_cache, get_catalog_version, get_or_fill, get_reference_version
+from .documents import document_queryset, get_document, rebuild_documents
+from .enrichment import claim_jobs, enqueue_enrichment, retry_delay
+from .fixture_io import iter_json_items
+from .models import Allergen, Category, EnrichmentJob, Nutrient, Pill, Substance
+from .naver_client import NaverShoppingClient
+from .ngram_index import PillNgramIndex
+from .outbound import OutboundError
+from .renderers import render_json
+from .search import SqliteFTSBackend
+from .serializers import PillDetailSerializer
+from .value_metrics import value_filter_kwargs, value_filter_token
+
+# 테스트는 Redis 없이 프로세스 메모리 캐시로 실행
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_pill(category, report_no, **fields):
+    fields.setdefault('PRDLST_NM', f'영양제 {report_no}')
+    return Pill.objects.create(category=category, PRDLST_REPORT_NO=str(report_no), **fields)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PillTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='눈 건강')
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return response.json()
+
+
+# ==========================================
+# 키워드 검색 + 정렬 (FTS 관련도순이 요청한 정렬을 덮어쓰지 않는지)
+# ==========================================
+class KeywordSortTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        # 1일 1회 1정, 30정 -> 1정 가격 = 가격/30, 하루 가격 = 1정 가격
+        intake = {'NTK_MTHD': '1일 1회, 1회 1정', 'amount': 30, 'unit_type': 'C'}
+        self.pills = [
+            make_pill(self.category, 1, PRDLST_NM='루테인 골드', price=6000, **intake),
+            make_pill(self.category, 2, PRDLST_NM='루테인 지아잔틴 루테인', price=9000, **intake),
+            make_pill(self.category, 3, PRDLST_NM='루테인 플러스', price=15000, **intake),
+            make_pill(self.category, 4, PRDLST_NM='루테인 베이직', price=21000, NTK_MTHD='', amount=None),
+            make_pill(self.category, 5, PRDLST_NM='비타민C', price=1000, **intake),
+        ]
+
+    def names(self, url):
+        return [pill['PRDLST_NM'] for pill in self.get_json(url)['results']]
+
+    def test_keyword_with_price_sort(self):
+        self.assertEqual(
+            self.names('/pills/?keyword=루테인&sort=price'),
+            ['루테인 골드', '루테인 지아잔틴 루테인', '루테인 플러스', '루테인 베이직'],
+        )
+        self.assertEqual(
+            self.names('/pills/?keyword=루테인&sort=-price'),
+            ['루테인 베이직', '루테인 플러스', '루테인 지아잔틴 루테인', '루테인 골드'],
+        )
+
+    def test_keyword_with_value_sorts(self):
+        # 가성비를 계산할 수 없는 '루테인 베이직'은 빠지고, 하루 가격/1정 가격이 싼 순서
+        # (관련도순이면 '루테인'이 두 번 나오는 '루테인 지아잔틴 루테인'이 먼저)
+        expected = ['루테인 골드', '루테인 지아잔틴 루테인', '루테인 플러스']
+        self.assertEqual(self.names('/pills/?keyword=루테인&sort=value'), expected)
+        self.assertEqual(self.names('/pills/?keyword=루테인&sort=unit_price'), expected)
+        self.assertEqual(self.names('/pills/?keyword=루테인&sort=value&pagination=cursor'), expected)
+
+    def test_keyword_without_sort_keeps_relevance(self):
+        names = self.names('/pills/?keyword=루테인')
+        self.assertEqual(names[0], '루테인 지아잔틴 루테인')
+        self.assertEqual(len(names), 4)
+        self.assertNotIn('비타민C', names)
+
+
+# ==========================================
+# FTS 테이블 확인은 DB마다 한 번만 (검색/저장마다 sqlite_master를 훑지 않게)
+# ==========================================
+class SearchAvailabilityTests(PillTestCase):
+    def test_checks_table_once(self):
+        backend = SqliteFTSBackend()
+        with mock.patch.object(
+            connection.introspection, 'table_names', wraps=connection.introspection.table_names,
+        ) as table_names:
+            for _ in range(3):
+                list(backend.filter(Pill.objects.all(), '루테인'))
+            self.assertEqual(table_names.call_count, 1)
+            backend.rebuild()
+            backend.filter(Pill.objects.all(), '루테인')
+            self.assertEqual(table_names.call_count, 2)
+
+
+# ==========================================
+# 가성비 범위 필터: 값이 조금만 달라도 다른 캐시 키, nan/inf는 무시
+# ==========================================
+class ValueFilterTests(PillTestCase):
+    def test_close_values_use_different_cache_entries(self):
+        first = make_pill(self.category, 1, price=1000)
+        second = make_pill(self.category, 2, price=1000)
+        Pill.objects.filter(pk=first.pk).update(price_per_day=12345.67)
+        Pill.objects.filter(pk=second.pk).update(price_per_day=12345.68)
+        low = self.get_json('/pills/?min_value=12345.67')
+        high = self.get_json('/pills/?min_value=12345.68')
+        self.assertEqual([p['id'] for p in low['results']], [second.pk, first.pk])
+        self.assertEqual([p['id'] for p in high['results']], [second.pk])
+
+    def test_token(self):
+        self.assertNotEqual(value_filter_token({'min_value': '12345.67'}), value_filter_token({'min_value': '12345.68'}))
+        self.assertNotEqual(value_filter_token({'max_value': '1000000'}), value_filter_token({'max_value': '1000001'}))
+        for value in ('nan', 'inf', '-inf', 'abc'):
+            self.assertEqual(value_filter_kwargs({'min_value': value}), {})
+            self.assertEqual(value_filter_token({'min_value': value}), '')
+
+
+# ==========================================
+# 조합 필터 비트맵: 다른 프로세스의 변경을 변경 목록으로 따라잡기
+# ==========================================
+class BitmapCatchUpTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = Category.objects.create(name='간 건강')
+        self.first = make_pill(self.category, 1)
+        self.second = make_pill(self.other, 2)
+        # 다른 프로세스의 색인 (signals.py가 고치는 get_filter_index()와 별개의 객체)
+        self.index = PillBitmapIndex(refresh_limit=10, max_delta_versions=5)
+
+    def category_ids(self, category):
+        return bitmap_ids(self.index.evaluate(f'category:{category.pk}'))
+
+    def test_applies_changes_without_reload(self):
+        self.assertEqual(self.category_ids(self.category), [self.first.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.category = self.category
+            self.second.save()
+            third = make_pill(self.category, 3)
+        with mock.patch.object(self.index, '_load', side_effect=AssertionError('전체 다시 만들기')):
+            self.assertEqual(self.category_ids(self.category), [third.pk, self.second.pk, self.first.pk])
+            self.assertEqual(self.category_ids(self.other), [])
+
+    def test_reloads_when_changes_are_missing(self):
+        self.category_ids(self.category)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.category = self.category
+            self.second.save()
+        cache.delete(CHANGES_KEY.format(version=get_catalog_version()))  # 만료된 경우
+        with mock.patch.object(self.index, '_load', wraps=self.index._load) as load:
+            self.assertEqual(self.category_ids(self.category), [self.second.pk, self.first.pk])
+        load.assert_called_once()
+
+    def test_reloads_when_gap_is_too_large(self):
+        self.category_ids(self.category)
+        for _ in range(6):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.second.save()
+        with mock.patch.object(self.index, '_load', wraps=self.index._load) as load:
+            self.category_ids(self.category)
+        load.assert_called_once()
+
+
+# ==========================================
+# 트랜잭션 안의 변경은 커밋된 뒤에 무효화 (커밋 전 데이터로 새 버전 캐시가 채워지지 않게)
+# ==========================================
+class InvalidateOnCommitTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pill = make_pill(self.category, 1, PRDLST_NM='루테인 골드')
+
+    def test_invalidates_after_commit(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pill.PRDLST_NM = '루테인 지아잔틴'
+            self.pill.save()
+            Allergen.objects.create(pill=self.pill, name='대두')
+            self.assertEqual(get_catalog_version(), version)
+        self.assertGreater(get_catalog_version(), version)
+
+    def test_rollback_does_not_invalidate(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.pill.PRDLST_NM = '루테인 지아잔틴'
+                    self.pill.save()
+                    raise RuntimeError('저장 실패')
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_catalog_version(), version)
+
+
+# ==========================================
+# 상세 문서: 직렬화 결과와 같고, 성분/알레르기가 바뀌면 트랜잭션마다 한 번만 다시 만듦
+# ==========================================
+class PillDocumentTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pill = make_pill(self.category, 1, PRDLST_NM='루테인 골드', price=15000)
+        self.substances = [Substance.objects.create(name=name) for name in ('루테인', '지아잔틴', '비타민E')]
+
+    def expected(self):
+        return json.loads(render_json(PillDetailSerializer(document_queryset().get(pk=self.pill.pk)).data))
+
+    def document(self):
+        return json.loads(render_json(get_document(self.pill.pk)))
+
+    def add_nutrients(self):
+        for i, substance in enumerate(self.substances):
+            Nutrient.objects.create(
+                pill=self.pill, substance=substance, substance_name=substance.name, value=i + 1, unit='mg',
+            )
+        Allergen.objects.create(pill=self.pill, name='대두')
+
+    def test_matches_serializer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_nutrients()
+        self.assertEqual(self.document(), self.expected())
+        self.assertEqual(self.get_json(f'/pills/{self.pill.pk}/'), self.expected())
+
+    def test_rebuilt_once_per_transaction(self):
+        version = get_catalog_version()
+        with mock.patch('pills.signals.rebuild_documents', wraps=rebuild_documents) as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.pill.PRDLST_NM = '루테인 지아잔틴'
+                self.pill.save()
+                self.add_nutrients()
+        rebuild.assert_called_once_with([self.pill.pk])
+        self.assertEqual(get_catalog_version(), version + 1)
+        self.assertEqual(len(self.document()['nutrient_details']), 3)
+        self.assertEqual(self.document(), self.expected())
+
+    def test_rebuilt_after_relation_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_nutrients()
+        self.get_json(f'/pills/{self.pill.pk}/')  # 상세 캐시 채움
+        with self.captureOnCommitCallbacks(execute=True):
+            Nutrient.objects.filter(pill=self.pill, substance=self.substances[0]).get().delete()
+            Allergen.objects.filter(pill=self.pill).get().delete()
+        document = self.document()
+        self.assertEqual(len(document['nutrient_details']), 2)
+        self.assertEqual(document['allergens_info'], [])
+        self.assertEqual(document, self.expected())
+        self.assertEqual(self.get_json(f'/pills/{self.pill.pk}/'), document)
+
+
+# ==========================================
+# 제품명/제조사 n-gram 색인: 다른 프로세스의 변경을 같은 변경 목록으로 따라잡기
+# ==========================================
+class NgramCatchUpTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        self.first = make_pill(self.category, 1, PRDLST_NM='루테인 골드')
+        self.second = make_pill(self.category, 2, PRDLST_NM='비타민C 1000')
+        # 다른 프로세스의 색인 (signals.py가 고치는 검색 백엔드 색인과 별개의 객체)
+        self.index = PillNgramIndex(max_delta_versions=5)
+
+    def search(self, keyword):
+        return self.index.get('name').search(keyword)
+
+    def test_applies_changes_without_reload(self):
+        self.assertEqual(self.search('루테인'), [self.first.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            Pill.objects.filter(pk=self.second.pk).update(PRDLST_NM='루테인 지아잔틴')
+            third = make_pill(self.category, 3, PRDLST_NM='루테인 플러스')
+            self.first.delete()
+        with mock.patch.object(self.index, '_load', side_effect=AssertionError('전체 다시 만들기')):
+            self.assertEqual(self.search('루테인'), [self.second.pk, third.pk])
+            self.assertEqual(self.search('비타민'), [])
+
+    def test_reloads_when_changes_are_missing(self):
+        self.search('루테인')
+        with self.captureOnCommitCallbacks(execute=True):
+            Pill.objects.filter(pk=self.second.pk).update(PRDLST_NM='루테인 지아잔틴')
+        cache.delete(CHANGES_KEY.format(version=get_catalog_version()))  # 만료된 경우
+        with mock.patch.object(self.index, '_load', wraps=self.index._load) as load:
+            self.assertEqual(self.search('루테인'), [self.first.pk, self.second.pk])
+        load.assert_called_once()
+
+
+# ==========================================
+# load_pills_data: 행마다 무효화하지 않고, dry-run은 캐시를 건드리지 않음
+# ==========================================
+class LoadPillsDataTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pill = make_pill(self.category, 'R1', PRDLST_NM='기존 제품')
+        old = Substance.objects.create(name='옛 성분')
+        Nutrient.objects.create(pill=self.pill, substance=old, substance_name=old.name, value=1, unit='mg')
+        Allergen.objects.create(pill=self.pill, name='대두')
+
+        items = [
+            {'fields': {'PRDLST_REPORT_NO': 'R1', 'PRDLST_NM': '기존 제품', 'nutrients': {'비타민C': {'value': 100, 'unit': 'mg'}}}},
+            {'fields': {'PRDLST_REPORT_NO': 'R2', 'PRDLST_NM': '새 제품', 'allergens': ['우유']}},
+        ]
+        handle, self.path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            json.dump(items, f, ensure_ascii=False)
+        self.addCleanup(os.remove, self.path)
+
+    def load(self, **options):
+        with mock.patch('pills.signals.invalidate_pills') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('load_pills_data', path=self.path, stdout=io.StringIO(), **options)
+        return invalidate
+
+    def test_invalidates_changed_pills_once(self):
+        invalidate = self.load()
+        new_pill = Pill.objects.get(PRDLST_REPORT_NO='R2')
+        invalidate.assert_called_once()
+        self.assertEqual(sorted(invalidate.call_args.args[0]), sorted([self.pill.pk, new_pill.pk]))
+        self.assertEqual(list(self.pill.nutrient_details.values_list('substance_name', flat=True)), ['비타민C'])
+        self.assertFalse(self.pill.allergens_info.exists())
+
+    def test_dry_run_does_not_touch_cache(self):
+        catalog_version = get_catalog_version()
+        reference_version = get_reference_version()
+        invalidate = self.load(dry_run=True)
+        invalidate.assert_not_called()
+        self.assertEqual(get_catalog_version(), catalog_version)
+        self.assertEqual(get_reference_version(), reference_version)
+        self.assertFalse(Pill.objects.filter(PRDLST_REPORT_NO='R2').exists())
+
+
+# ==========================================
+# 네이버 정보 수집 작업: 에러 난 작업은 바로 다시 가져가지 않음
+# ==========================================
+@override_settings(ENRICHMENT_RETRY_BACKOFF=60, ENRICHMENT_RETRY_BACKOFF_MAX=600)
+class EnrichmentRetryTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pill = make_pill(self.category, 1)
+        enqueue_enrichment([self.pill.pk])
+
+    def run_worker(self):
+        with mock.patch(
+            'pills.management.commands.run_enrichment_worker.get_purchase_link', side_effect=RuntimeError('네이버 장애'),
+        ) as lookup:
+            call_command('run_enrichment_worker', once=True, max_attempts=3, stdout=io.StringIO())
+        return lookup
+
+    def test_failed_job_waits_before_retry(self):
+        started = timezone.now()
+        self.assertEqual(self.run_worker().call_count, 1)
+        job = EnrichmentJob.objects.get(pill=self.pill)
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertGreaterEqual(job.next_attempt_at, started + timedelta(seconds=60))
+        self.assertEqual(claim_jobs(10), [])
+
+        # 기다린 뒤에는 다시 시도하고, 실패할수록 간격이 늘어남
+        EnrichmentJob.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.run_worker().call_count, 1)
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+        self.assertGreaterEqual(job.next_attempt_at, timezone.now() + timedelta(seconds=110))
+
+    def test_retry_delay_is_capped(self):
+        self.assertEqual([retry_delay(n) for n in (1, 2, 3, 4, 5)], [60, 120, 240, 480, 600])
+
+    def test_naver_outage_is_retried_not_marked_missing(self):
+        client = NaverShoppingClient('id', 'secret', max_retries=2)
+        client.provider = mock.Mock(**{'get.return_value': mock.Mock(status_code=503)})
+        with mock.patch.object(client, '_backoff'), \
+                mock.patch('pills.utils.get_naver_client', return_value=client):
+            call_command('run_enrichment_worker', once=True, max_attempts=3, stdout=io.StringIO())
+        self.assertEqual(client.provider.get.call_count, 3)
+        job = EnrichmentJob.objects.get(pill=self.pill)
+        self.assertEqual((job.status, job.attempts), ('pending', 1))
+        self.assertIsNotNone(job.next_attempt_at)
+        # 장애를 '검색 결과 없음'으로 저장하지 않음 (price=-1이면 목록에서 빠짐)
+        self.pill.refresh_from_db()
+        self.assertNotEqual(self.pill.price, -1)
+
+
+class NaverClientTests(PillTestCase):
+    def search(self, *responses):
+        client = NaverShoppingClient('id', 'secret', max_retries=2)
+        client.provider = mock.Mock(**{'get.side_effect': list(responses)})
+        with mock.patch.object(client, '_backoff'):
+            return client.search('루테인')
+
+    def response(self, status_code, items=None):
+        return mock.Mock(status_code=status_code, text='', **{'json.return_value': {'items': items or []}})
+
+    def test_retries_then_returns_result(self):
+        item = {'title': '루테인'}
+        self.assertEqual(self.search(self.response(429), self.response(200, [item])), item)
+
+    def test_empty_result_and_client_error_are_none(self):
+        self.assertIsNone(self.search(self.response(200)))
+        self.assertIsNone(self.search(self.response(401)))
+
+    def test_exhausted_retries_raise(self):
+        with self.assertRaises(OutboundError):
+            self.search(self.response(503), OutboundError('naver_shop', 'timeout'), self.response(500))
+
+
+# ==========================================
+# 커서(keyset) 페이지네이션: 빈 값(NULL)/같은 가격, 역방향, 잘못된 커서, 끝을 지나친 커서
+# ==========================================
+class KeysetPaginationTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        # 20개씩 3페이지: 가격이 같은 제품 여러 개 + 가격이 없는 제품 + 목록에서 숨긴 제품(-1)
+        prices = [None, 5000, 5000, 12000, None, 5000, 8000, 12000, 30000, None]
+        for i in range(45):
+            make_pill(self.category, i, price=prices[i % len(prices)])
+        make_pill(self.category, 'hidden', price=-1)
+
+    def expected(self, descending):
+        order = F('price').desc(nulls_last=True) if descending else F('price').asc(nulls_last=True)
+        pills = Pill.objects.exclude(price=-1).order_by(order, '-pk' if descending else 'pk')
+        return list(pills.values_list('pk', flat=True))
+
+    def walk(self, url, link):
+        """link('next' / 'previous')를 따라가며 페이지별 pk 목록"""
+        pages = []
+        while url:
+            data = self.get_json(url)
+            pages.append([pill['id'] for pill in data['results']])
+            url = data[link]
+        return pages
+
+    def cursor_url(self, sort, position):
+        """정렬 값 위치를 직접 넣은 커서 (KeysetPagination._position과 같은 형식)"""
+        tokens = {'o': 0, 'p': json.dumps([sort, *position])}
+        cursor = base64.b64encode(urlencode(tokens).encode()).decode()
+        return '/pills/?' + urlencode({'cursor': cursor, 'sort': sort})
+
+    def test_forward_and_back(self):
+        for sort, descending in (('price', False), ('-price', True)):
+            expected = self.expected(descending)
+            pages = self.walk(f'/pills/?pagination=cursor&sort={sort}', 'next')
+            self.assertEqual([len(page) for page in pages], [20, 20, 5])
+            self.assertEqual(sum(pages, []), expected)
+
+            # 마지막 페이지에서 이전 링크로 처음까지
+            last = self.get_json(f'/pills/?pagination=cursor&sort={sort}')
+            while last['next']:
+                last = self.get_json(last['next'])
+            back = self.walk(last['previous'], 'previous')
+            self.assertEqual(sum(reversed(back), []), expected[:40])
+
+    def test_past_the_end_cursor(self):
+        data = self.get_json(self.cursor_url('price', [None, 10 ** 9]))  # 가격 없는 제품이 맨 뒤
+        self.assertEqual((data['results'], data['next']), ([], None))
+        # 이전 링크는 끝에서부터 20개
+        previous = self.get_json(data['previous'])
+        self.assertEqual([pill['id'] for pill in previous['results']], self.expected(False)[-20:])
+
+    def test_null_position_cursor(self):
+        # 가격이 없는(NULL) 행 사이에서 끊긴 커서도 이어서 읽음
+        expected = self.expected(False)
+        nulls = [pk for pk in expected if Pill.objects.get(pk=pk).price is None]
+        data = self.get_json(self.cursor_url('price', [None, nulls[2]]))
+        self.assertEqual([pill['id'] for pill in data['results']], nulls[3:])
+
+    def test_tampered_cursor(self):
+        # 값이 숫자가 아님 / 다른 정렬의 커서 / 값 개수가 다름 / JSON이 아님
+        for position in (['price', 'x', 1], ['-price', 5000, 1], ['price', 5000], 'not json'):
+            raw = position if isinstance(position, str) else json.dumps(position)
+            cursor = base64.b64encode(urlencode({'o': 0, 'p': raw}).encode()).decode()
+            response = self.client.get('/pills/?' + urlencode({'cursor': cursor, 'sort': 'price'}))
+            self.assertEqual(response.status_code, 404, position)
+
+
+# ==========================================
+# 조합 필터식 / 필터 사이드바 개수 (비트맵 결과가 ORM 조회와 같은지)
+# ==========================================
+class FilterDataMixin:
+    def setUp(self):
+        super().setUp()
+        categories = [self.category, Category.objects.create(name='간 건강')]
+        substances = {name: Substance.objects.create(name=name) for name in ('루테인', '지아잔틴', '비타민C')}
+        shapes = ['연질캡슐', '정제', '분말']
+        prices = [5000, 12000, 15000, 25000, None, -1]
+        for i in range(30):
+            pill = make_pill(categories[i % 2], i, PRDT_SHAP_CD_NM=shapes[i % 3], price=prices[i % 6])
+            for name, step in (('루테인', 2), ('지아잔틴', 3), ('비타민C', 5)):
+                if i % step == 0:
+                    Nutrient.objects.create(pill=pill, substance=substances[name], substance_name=name, value=1, unit='mg')
+            for name, step in (('대두', 4), ('우유', 7)):
+                if i % step == 0:
+                    Allergen.objects.create(pill=pill, name=name)
+        self.visible = Pill.objects.exclude(price=-1)
+
+    @staticmethod
+    def has(name):
+        return Q(pk__in=Nutrient.objects.filter(substance_name=name).values('pill_id'))
+
+    @staticmethod
+    def allergic(name):
+        return Q(pk__in=Allergen.objects.filter(name__icontains=name).values('pill_id'))
+
+    def orm_ids(self, condition):
+        return sorted(self.visible.filter(condition).values_list('pk', flat=True))
+
+
+class FilterExpressionTests(FilterDataMixin, PillTestCase):
+    def bitmap_ids(self, expression):
+        return sorted(bitmap_ids(get_filter_index().evaluate(expression)))
+
+    def test_precedence(self):
+        # NOT > AND(공백, 쉼표) > OR
+        self.assertEqual(
+            parse_filter('루테인 OR 지아잔틴 shape:캡슐'),
+            ('or', [term('substance', '루테인'), ('and', [term('substance', '지아잔틴'), term('shape', '캡슐')])]),
+        )
+        self.assertEqual(
+            parse_filter('NOT allergen:대두 루테인'),
+            ('and', [('not', term('allergen', '대두')), term('substance', '루테인')]),
+        )
+
+    def test_matches_orm(self):
+        capsule = Q(dosage_form='capsule')
+        cases = {
+            '루테인 OR 지아잔틴 shape:캡슐': self.has('루테인') | (self.has('지아잔틴') & capsule),
+            '(루테인 OR 지아잔틴) shape:캡슐': (self.has('루테인') | self.has('지아잔틴')) & capsule,
+            'NOT allergen:대두 루테인': ~self.allergic('대두') & self.has('루테인'),
+            '루테인, NOT (shape:캡슐 OR shape:"정(알약)")': self.has('루테인') & ~Q(dosage_form__in=['capsule', 'tablet']),
+            'category:"간 건강" AND price:10k_20k': Q(category__name='간 건강', price__gte=10000, price__lt=20000),
+            'NOT(비타민C) OR allergen:우유': ~self.has('비타민C') | self.allergic('우유'),
+        }
+        for expression, condition in cases.items():
+            self.assertEqual(self.bitmap_ids(expression), self.orm_ids(condition), expression)
+
+    def test_endpoint(self):
+        data = self.get_json('/pills/filter/?' + urlencode({'q': '루테인 shape:캡슐'}))
+        expected = self.orm_ids(self.has('루테인') & Q(dosage_form='capsule'))
+        self.assertEqual(data['count'], len(expected))
+        self.assertEqual([pill['id'] for pill in data['results']], expected[::-1][:20])
+
+    def test_syntax_errors(self):
+        for expression in ('(루테인', '루테인)', '루테인 AND', 'OR 루테인', 'color:빨강', 'category:""', '루테인 ""'):
+            for url in ('/pills/filter/', '/pills/facets/'):
+                response = self.client.get(url + '?' + urlencode({'q': expression}))
+                self.assertEqual(response.status_code, 400, (url, expression))
+                self.assertIn('error', response.json())
+
+
+class FacetCountTests(FilterDataMixin, PillTestCase):
+    def test_counts_match_orm(self):
+        data = self.get_json('/pills/facets/?' + urlencode({'shapes': '캡슐', 'price': '10k_20k', 'allergen_free': '대두'}))
+        shape = Q(dosage_form='capsule')
+        price = Q(price__gte=10000, price__lt=20000)
+        allergen_free = ~self.allergic('대두')
+
+        def count(*conditions):
+            return self.visible.filter(*conditions).count()
+
+        self.assertEqual(data['count'], count(shape, price, allergen_free))
+        facets = data['facets']
+        # 각 facet은 다른 facet에서 고른 조건만 적용해서 셈
+        for item in facets['category']:
+            self.assertEqual(item['count'], count(shape, price, allergen_free, Q(category__name=item['value'])), item)
+        for item in facets['shape']:
+            self.assertEqual(item['count'], count(price, allergen_free, Q(dosage_form=item['value'])), item)
+        bands = {'under_10k': Q(price__lt=10000), '10k_20k': price, '20k_30k': Q(price__gte=20000, price__lt=30000),
+                 '30k_50k': Q(price__gte=30000, price__lt=50000), 'over_50k': Q(price__gte=50000),
+                 'unknown': Q(price__isnull=True)}
+        for item in facets['price']:
+            self.assertEqual(item['count'], count(shape, allergen_free, bands[item['value']]), item)
+        for item in facets['allergen_free']:
+            self.assertEqual(item['count'], count(shape, price, ~self.allergic(item['value'])), item)
+        self.assertEqual({item['value'] for item in facets['allergen_free']}, {'대두', '우유'})
+
+
+# ==========================================
+# get_or_fill: 동시에 비어 있어도 한 번만 채우고, 갱신 중에는 옛 값으로 응답
+# ==========================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class GetOrFillTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def run_threads(self, count, target):
+        results = [None] * count
+
+        def run(i):
+            results[i] = target()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_miss_fills_once(self):
+        calls = []
+        release = threading.Event()
+
+        def builder():
+            calls.append(1)
+            release.wait(2)
+            return 'fresh'
+
+        threads, results = self.run_threads(8, lambda: get_or_fill('key', builder, poll_interval=0.01))
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['fresh'] * 8)
+
+    def test_waiters_do_not_build_after_timeout(self):
+        cache.add('key:lock', 'other', 10)  # 다른 워커가 채우는 중
+        builder = mock.Mock(return_value='mine')
+        with self.assertRaises(CacheFillTimeout):
+            get_or_fill('key', builder, wait_timeout=0.1, poll_interval=0.01)
+        builder.assert_not_called()
+
+    def test_waiter_takes_over_expired_lock(self):
+        cache.add('key:lock', 'other', 0.05)  # 채우던 워커가 죽음 -> 락 만료
+        self.assertEqual(get_or_fill('key', lambda: 'mine', wait_timeout=1, poll_interval=0.01), 'mine')
+        self.assertIsNone(cache.get('key:lock'))
+
+    def test_keeps_lock_taken_over_by_another_worker(self):
+        def slow_builder():
+            # 락이 만료된 뒤 다른 워커가 새로 잡음
+            cache.set('key:lock', 'other', 10)
+            return 'mine'
+
+        self.assertEqual(get_or_fill('key', slow_builder), 'mine')
+        self.assertEqual(cache.get('key:lock'), 'other')
+
+    def test_stale_value_served_while_refreshing(self):
+        fill_cache('key', 'old', ttl=0, stale_ttl=60)  # soft TTL 지남
+        refreshing = threading.Event()
+        release = threading.Event()
+
+        def slow_builder():
+            refreshing.set()
+            release.wait(2)
+            return 'new'
+
+        threads, results = self.run_threads(1, lambda: get_or_fill('key', slow_builder))
+        self.assertTrue(refreshing.wait(2))
+        # 다른 요청은 갱신을 기다리지 않고 builder도 부르지 않음
+        builder = mock.Mock(return_value='other')
+        self.assertEqual(get_or_fill('key', builder), 'old')
+        builder.assert_not_called()
+
+        release.set()
+        threads[0].join()
+        self.assertEqual(results, ['new'])
+        self.assertEqual(get_or_fill('key', builder), 'new')
+        builder.assert_not_called()
+
+
+class IterJsonItemsTests(SimpleTestCase):
+    def write(self, text, suffix='.json'):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_numbers_split_across_chunks(self):
+        # 모든 위치에서 잘리도록 읽기 크기를 1부터 파일 길이까지 바꿔 가며 확인 ('1.' + '5', '3e' + '2' 등)
+        text = '[1.5, -20, 3e2 ,12345,{"a": [1, 2.25]}, "x,]", true, null, 0.125, 7]'
+        path = self.write(text)
+        for size in range(1, len(text) + 1):
+            with self.subTest(size=size), mock.patch('pills.fixture_io.READ_SIZE', size):
+                self.assertEqual(list(iter_json_items(path)), json.loads(text))
+
+    def test_top_level_scalar(self):
+        path = self.write('12345\n')
+        for size in (1, 2, 5):
+            with self.subTest(size=size), mock.patch('pills.fixture_io.READ_SIZE', size):
+                self.assertEqual(list(iter_json_items(path)), [12345])
+
+    def test_jsonl(self):
+        path = self.write('{"a": 1}\n\n[2, 3]\n4\n', suffix='.jsonl')
+        self.assertEqual(list(iter_json_items(path)), [{'a': 1}, [2, 3], 4])
+
+    def test_malformed(self):
+        for text in ('[1, 2', '[1.x]', '[{"a": 1}'):
+            path = self.write(text)
+            with self.subTest(text=text), mock.patch('pills.fixture_io.READ_SIZE', 2):
+                with self.assertRaises(json.JSONDecodeError):
+                    list(iter_json_items(path))
+
+
+# ==========================================
+# warm_cache: 캐시된 목록의 next/previous 링크가 서비스 주소를 가리키는지
+# ==========================================
+# 요청을 스레드에서 보내므로 테스트 데이터가 커밋되어 있어야 함
+@override_settings(
+    CACHES=LOCMEM_CACHES, ALLOWED_HOSTS=['pillgood.store'], PILL_WARM_CACHE_BASE_URL='https://pillgood.store',
+)
+class WarmCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='눈 건강')
+        for i in range(45):
+            make_pill(category, 5000 + i, price=1000 + i)
+
+    def test_warms_paginated_lists(self):
+        out = io.StringIO()
+        call_command('warm_cache', pages=3, top_details=0, workers=2, stdout=out)
+        self.assertNotIn('❌', out.getvalue())
+
+        # 두 번째 요청은 캐시에서 나감 (DB 조회 없음)
+        with self.assertNumQueries(0):
+            response = self.client.get('/pills/?page=2', HTTP_HOST='pillgood.store', secure=True)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['next'], 'https://pillgood.store/pills/?page=3')
+        self.assertEqual(data['previous'], 'https://pillgood.store/pills/')
+
+
+# ==========================================
+# 응답 캐시 헤더: Vary(Accept), 인코딩별 ETag, If-None-Match -> 304 ('rendered' / 'data' 모드 모두)
+# ==========================================
+class ResponseCacheHeaderTests(PillTestCase):
+    def setUp(self):
+        super().setUp()
+        make_pill(self.category, 1, price=1000)
+
+    def assert_cache_headers(self, response):
+        self.assertIn('Cache-Control', response)
+        vary = {name.strip() for name in response['Vary'].split(',')}
+        self.assertTrue({'Accept', 'Accept-Encoding'} <= vary, response['Vary'])
+
+    def assert_revalidates(self, **headers):
+        response = self.client.get('/pills/', **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assert_cache_headers(response)
+        etag = response['ETag']
+
+        not_modified = self.client.get('/pills/', HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assert_cache_headers(not_modified)
+        self.assertEqual(self.client.get('/pills/', HTTP_IF_NONE_MATCH='"other"', **headers).status_code, 200)
+        return etag
+
+    @override_settings(PILL_RESPONSE_CACHE_MODE='rendered')
+    def test_rendered_mode(self):
+        plain = self.assert_revalidates()
+        gzipped = self.assert_revalidates(HTTP_ACCEPT_ENCODING='gzip')
+        # 압축 방식이 다르면 bytes가 다르므로 강한 ETag도 다름
+        self.assertNotEqual(plain, gzipped)
+        self.assertTrue(gzipped.endswith('-gzip"'))
+
+    @override_settings(PILL_RESPONSE_CACHE_MODE='data')
+    def test_data_mode(self):
+        self.assert_revalidates()
+
+    @override_settings(PILL_RESPONSE_CACHE_MODE='rendered')
+    def test_browsable_api_is_not_shared(self):
+        response = self.client.get('/pills/', HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Accept', response['Vary'])
+        self.assertNotIn('ETag', response)
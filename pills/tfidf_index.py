@@ -0,0 +1,176 @@
+# pills/tfidf_index.py
+# 챗봇 후보 검색용 TF-IDF (글자 n-gram) 색인
+#
+# 기존 점수(단어가 기능성/제품명에 포함되면 +2/+1)는 "눈이 침침해"의 '눈이'처럼 조사가 붙은 단어는 못 찾고,
+# 점수가 같은 제품이 많아 사실상 랜덤으로 후보가 뽑혔습니다.
+# 여기서는 제품마다 글자 2~3-gram TF-IDF 벡터를 만들어 두고, 질문 벡터와의 코사인 유사도로 순위를 매깁니다.
+#
+#   - 색인은 미리 만들어 파일로 저장 (python manage.py build_catalog_index)
+#     -> <카탈로그 파일>.tfidf, 원본 파일의 sha1을 같이 기록해서 원본이 바뀌면 사용하지 않음
+#   - 파일은 mmap으로 열어서 배열을 그대로 사용 (파싱/복사 없음, 여러 워커 프로세스가 같은 페이지를 공유)
+#   - 행렬은 열(n-gram) 단위 희소 행렬(CSC): 질문에 나온 n-gram 열만 훑어서 점수를 더함 (희소 행렬 x 질문 벡터)
+#   - 절반 넘는 제품에 나오는 n-gram("도움", "있음" 등)은 순위에 도움이 안 되므로 색인에서 제외 (max_df)
+#
+# 파일 구조 (리틀/빅 엔디언은 만든 기계 기준, 헤더에 기록)
+#   [magic 'PGTF'][version u32][헤더 JSON 길이 u32][헤더 JSON][4바이트 정렬]
+#   idf float32[V] | indptr uint32[V+1] | indices(제품 번호) uint32[nnz] | data(정규화된 가중치) float32[nnz]
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+
+MAGIC = b'PGTF'
+VERSION = 1
+_PREFIX = struct.Struct('<4sII')
+
+
+def analyze(text, sizes=(2, 3)):
+    """
+    글자 n-gram 빈도. 단어 앞에 공백을 붙여서 단어 시작도 구분 (' 눈', '눈이', ' 눈이')
+    (뒤에는 붙이지 않음: '이 ', '해 ' 같은 조사/어미 n-gram은 순위를 흐리기만 함)
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    grams = Counter()
+    for word in re.sub(r'[^\w\s]', ' ', text).split():
+        padded = f' {word}'
+        for n in sizes:
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+def file_digest(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+
+def _weight(tf, idf):
+    return (1 + math.log(tf)) * idf
+
+
+def build_tfidf(docs, path, source_digest, sizes=(2, 3), max_df=0.5, name_weight=2):
+    """
+    docs: (제품명, 기능성) 리스트 (카탈로그 순서 그대로)
+    제품명 n-gram은 name_weight배로 셈. 색인 파일을 path에 저장하고 통계를 반환
+    """
+    doc_grams = []
+    df = Counter()
+    for name, function in docs:
+        grams = analyze(function, sizes)
+        for gram, count in analyze(name, sizes).items():
+            grams[gram] += count * name_weight
+        doc_grams.append(grams)
+        df.update(grams.keys())
+
+    n_docs = len(doc_grams)
+    max_count = max_df * n_docs
+    vocab = sorted(gram for gram, count in df.items() if count <= max_count)
+    columns = {gram: col for col, gram in enumerate(vocab)}
+    idf = array('f', (math.log((1 + n_docs) / (1 + df[gram])) + 1 for gram in vocab))
+
+    # 제품 순서대로 넣으므로 열마다 제품 번호가 오름차순
+    postings = defaultdict(list)
+    for doc_id, grams in enumerate(doc_grams):
+        weights = [(columns[gram], _weight(tf, idf[columns[gram]])) for gram, tf in grams.items() if gram in columns]
+        norm = math.sqrt(sum(w * w for _, w in weights)) or 1.0
+        for col, w in weights:
+            postings[col].append((doc_id, w / norm))
+
+    indptr = array('I', [0])
+    indices = array('I')
+    data = array('f')
+    for col in range(len(vocab)):
+        for doc_id, w in postings.get(col, ()):
+            indices.append(doc_id)
+            data.append(w)
+        indptr.append(len(indices))
+
+    header = json.dumps({
+        'source_digest': source_digest,
+        'n_docs': n_docs,
+        'sizes': list(sizes),
+        'byteorder': sys.byteorder,
+        'vocab': vocab,
+    }, ensure_ascii=False).encode('utf-8')
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        f.write(b'\0' * (-f.tell() % 4))
+        for arr in (idf, indptr, indices, data):
+            arr.tofile(f)
+    os.replace(tmp_path, path)
+
+    return {'docs': n_docs, 'vocab': len(vocab), 'dropped': len(df) - len(vocab), 'nnz': len(indices)}
+
+
+class TfidfIndex:
+    """build_tfidf로 만든 파일을 mmap으로 열어서 검색"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"TF-IDF 색인 파일 형식이 다릅니다: {path}")
+        header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_len].decode('utf-8'))
+        if header['byteorder'] != sys.byteorder:
+            raise ValueError(f"다른 바이트 순서로 만든 색인입니다. 다시 생성해주세요: {path}")
+
+        self.source_digest = header['source_digest']
+        self.n_docs = header['n_docs']
+        self.sizes = tuple(header['sizes'])
+        self.vocab = {gram: col for col, gram in enumerate(header['vocab'])}
+
+        # 배열은 복사하지 않고 mmap 위에서 바로 읽음
+        view = memoryview(self._mmap)
+        offset = _PREFIX.size + header_len
+        offset += -offset % 4
+
+        def take(typecode, count):
+            nonlocal offset
+            size = count * 4
+            arr = view[offset:offset + size].cast(typecode)
+            offset += size
+            return arr
+
+        vocab_size = len(self.vocab)
+        self.idf = take('f', vocab_size)
+        self.indptr = take('I', vocab_size + 1)
+        nnz = self.indptr[vocab_size]
+        self.indices = take('I', nnz)
+        self.data = take('f', nnz)
+
+    def scores(self, query):
+        """{제품 번호: 코사인 유사도} (질문과 겹치는 n-gram이 하나라도 있는 제품만)"""
+        query_weights = []
+        for gram, tf in analyze(query, self.sizes).items():
+            col = self.vocab.get(gram)
+            if col is not None:
+                query_weights.append((col, _weight(tf, self.idf[col])))
+        norm = math.sqrt(sum(w * w for _, w in query_weights))
+        if not norm:
+            return {}
+
+        scores = {}
+        get = scores.get
+        for col, qw in query_weights:
+            qw /= norm
+            start, end = self.indptr[col], self.indptr[col + 1]
+            for doc_id, w in zip(self.indices[start:end], self.data[start:end]):
+                scores[doc_id] = get(doc_id, 0.0) + qw * w
+        return scores
@@ -30,6 +30,7 @@ urlpatterns = [
 
     # 챗봇 서비스 url
     path('chatbot/', views.chatbot_view, name='chatbot_view'),
+    path('chatbot/stream/', views.chatbot_stream_view, name='chatbot_stream_view'),
 
     # 아래는 vue랑 django 연결해주는 쓰레드 목록 조회 api 새로 작성
     path("<int:pill_pk>/threads/", views.thread_list, name="thread_list"),
@@ -51,6 +52,11 @@ urlpatterns = [
     
     # [추가] 성분별 영양제 리스트 (필터링 포함)
     path('substances/<int:substance_id>/pills/', views.substance_pills),
+
+    # 성분/카테고리/제형/알레르기 조합 필터 (?q=substance:루테인 AND shape:캡슐 AND NOT allergen:대두)
+    path('filter/', views.pill_filter, name='pill_filter'),
+    # 필터 사이드바 옵션별 개수 (?keyword=&shapes=&category=&price=&allergen_free=)
+    path('facets/', views.pill_facets, name='pill_facets'),
     path(
         '<int:pill_pk>/thread/<int:thread_pk>/',
         views.thread_detail,
@@ -1,11 +1,12 @@
-import requests
 import re
 from django.conf import settings
-import json
-import random
 import urllib3
 import os
 from dotenv import load_dotenv
+from . import reco_cache
+from .catalog_index import CatalogIndex
+from .naver_client import get_naver_client
+from .outbound import OutboundUnavailable, get_provider
 load_dotenv()
 
 def clean_text(text):
@@ -122,20 +123,24 @@ def get_purchase_link(product_name, company_name):
     return None
 
 def search_naver_shopping(query):
-    url = "https://openapi.naver.com/v1/search/shop.json"
-    headers = {
-        "X-Naver-Client-Id": settings.NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": settings.NAVER_SECRET_KEY # settings 변수명 확인 필요
-    }
-    params = {"query": query, "display": 1, "sort": "sim"}
-    
-    try:
-        res = requests.get(url, headers=headers, params=params)
-        if res.status_code == 200:
-            data = res.json()
-            if data['items']: return data['items'][0]
-    except:
-        pass
+    # 커넥션 풀/타임아웃/초당 제한/하루 한도는 공용 클라이언트가 처리
+    # (하루 한도를 넘으면 NaverQuotaExceeded가 그대로 올라갑니다)
+    return get_naver_client().search(query)
+
+async def aget_purchase_link(product_name, company_name):
+    """get_purchase_link()의 asyncio 버전 (검증 로직은 동일)"""
+    client = get_naver_client()
+    clean_prod = clean_text(product_name)
+    clean_comp = clean_text(company_name)
+
+    item = await client.asearch(f"{clean_comp} {clean_prod}")
+    if item and is_valid_match(company_name, product_name, item):
+        return format_result(item)
+
+    item = await client.asearch(clean_prod)
+    if item and is_valid_match(company_name, product_name, item):
+        return format_result(item)
+
     return None
 
 def format_result(item):
@@ -161,62 +166,38 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 # 1. 설정 (SSAFY GMS API)
 # ==========================================
 GMS_KEY = os.getenv("GMS_KEY")
-BASE_URL = "https://gms.ssafy.io/gmsapi/generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-lite:generateContent"
+# 모델 주소 (부하 테스트 때는 GMS_MODEL_URL을 testfile/stub_llm_server.py 주소로 바꿔서 실행)
+GMS_MODEL_URL = os.getenv("GMS_MODEL_URL", "https://gms.ssafy.io/gmsapi/generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-lite")
+BASE_URL = f"{GMS_MODEL_URL}:generateContent"
+STREAM_URL = f"{GMS_MODEL_URL}:streamGenerateContent?alt=sse"  # 한 번에 받지 않고 토큰 조각을 SSE로 받음
 
 # 장고 프로젝트 상대 경로로 수정 
 DATA_FILE = os.path.join(settings.BASE_DIR, 'pills', 'fixtures', 'pills_lite_final.json')
 
 # ==========================================
-# 2. 데이터 로드
+# 2. 데이터 로드 (프로세스당 한 번, 파일이 바뀌면 다시 읽음)
 # ==========================================
-def load_data():
-    try:
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print(f"❌ 오류: '{DATA_FILE}' 파일이 없습니다.")
-        return []
+CATALOG_INDEX = CatalogIndex(DATA_FILE)
 
 # ==========================================
 # 3.  스마트 검색 (데이터 기반 검색)
 # ==========================================
-def search_relevant_products(data, user_input):
-    candidates = []
-    user_keywords = user_input.split()
-
-    for item in data:
-        fields = item.get('fields', {})
-        name = fields.get('PRDLST_NM', '')
-        function = fields.get('PRIMARY_FNCLTY', '')
-        shape = fields.get('PRDT_SHAP_CD_NM', '')
-        appearance = fields.get('DISPOS', '')
-        
-        score = 0
-        for word in user_keywords:
-            if len(word) >= 2: 
-                if word in function: score += 2
-                if word in name: score += 1
-        
-        candidates.append({
-            "name": name,
-            "function": function,
-            "shape_info": f"{shape} ({appearance})",
-            "usage": fields.get('NTK_MTHD', ''),
-            "score": score
-        })
-    
-    random.shuffle(candidates) 
-    candidates.sort(key=lambda x: x['score'], reverse=True)
-    
-    return candidates[:5]
+def search_relevant_products(user_input, k=5, seed=None):
+    # 기능성 +2 / 제품명 +1 점수로 상위 k개 (동점은 랜덤, seed가 같으면 같은 결과) -> pills/catalog_index.py
+    return CATALOG_INDEX.search(user_input, k=k, seed=seed)
 
 # ==========================================
 # 4. AI 답변 생성 
 # ==========================================
-def generate_detailed_recommendation(user_input, products):
-    if not products:
-        return "죄송합니다. 데이터에서 적합한 제품을 찾기 어렵습니다. 조금 더 구체적으로 말씀해 주시겠어요?"
+NO_PRODUCTS_MESSAGE = "죄송합니다. 데이터에서 적합한 제품을 찾기 어렵습니다. 조금 더 구체적으로 말씀해 주시겠어요?"
+UNAVAILABLE_MESSAGE = "AI 추천 서비스가 잠시 응답하지 않습니다. 잠시 후 다시 시도해 주세요."
+
+
+class RecommendationError(Exception):
+    """GMS/Gemini 호출 실패 (에러 메시지는 캐시하지 않기 위해 구분)"""
 
+
+def build_recommendation_prompt(user_input, products):
     product_context = ""
     for idx, p in enumerate(products):
         product_context += f"""
@@ -258,29 +239,75 @@ def generate_detailed_recommendation(user_input, products):
     본 추천은 건강기능식품에 대한 정보 제공을 목적으로 하며, 의학적 진단이나 치료를 대신할 수 없습니다. 증상이 심하거나 지속될 경우 반드시 병원을 방문하여 전문가의 진료를 받으시기 바랍니다.
     """
 
+    return system_prompt
+
+
+def build_recommendation_payload(user_input, products):
+    return {
+        "contents": [{"parts": [{"text": build_recommendation_prompt(user_input, products)}]}]
+    }
+
+
+def request_recommendation(user_input, products):
+    """Gemini 답변 텍스트 반환, 실패하면 RecommendationError"""
     headers = {"Content-Type": "application/json"}
     url = f"{BASE_URL}?key={GMS_KEY}"
-    payload = {
-        "contents": [{"parts": [{"text": system_prompt}]}]
-    }
+    payload = build_recommendation_payload(user_input, products)
 
     try:
-        response = requests.post(url, headers=headers, json=payload, verify=False, timeout=10)
+        # 타임아웃/동시 호출 수/서킷 브레이커는 pills/outbound.py ('gms')
+        response = get_provider('gms').post(url, headers=headers, json=payload, verify=False, timeout=10)
         if response.status_code == 200:
             return response.json()['candidates'][0]['content']['parts'][0]['text']
-        else:
-            return f"API 호출 오류: {response.text}"
+    except OutboundUnavailable:
+        raise RecommendationError(UNAVAILABLE_MESSAGE)
     except Exception as e:
-        return f"오류 발생: {e}"
+        raise RecommendationError(f"오류 발생: {e}")
+    raise RecommendationError(f"API 호출 오류: {response.text}")
+
+
+def generate_detailed_recommendation(user_input, products):
+    if not products:
+        return NO_PRODUCTS_MESSAGE
+    try:
+        return request_recommendation(user_input, products)
+    except RecommendationError as e:
+        return str(e)
 
 # ==========================================
 # 5. [추가] 뷰에서 호출할 통합 인터페이스
 # ==========================================
-def get_pill_recommendation(user_input):
-    data = load_data()
-    if not data:
+def get_pill_recommendation(user_input, use_cache=True):
+    """
+    use_cache=False면 캐시를 읽지 않고 새로 생성 (생성한 답변은 캐시에 다시 저장)
+    같은 질문(정규화 기준)은 같은 후보가 뽑히도록 seed를 고정 -> 캐시 키가 안정적
+    """
+    if not CATALOG_INDEX.ensure_loaded():
         return "영양제 데이터를 불러올 수 없습니다."
-    
-    candidates = search_relevant_products(data, user_input)
-    return generate_detailed_recommendation(user_input, candidates)
+
+    normalized = reco_cache.normalize_query(user_input)
+    candidates = search_relevant_products(user_input, seed=normalized)
+    if not candidates:
+        return NO_PRODUCTS_MESSAGE
+
+    cache_enabled = reco_cache.is_enabled()
+    cache_key = reco_cache.make_key(normalized, [p['id'] for p in candidates])
+    if cache_enabled and use_cache:
+        cached = reco_cache.get_reply(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        reply = request_recommendation(user_input, candidates)
+    except RecommendationError as e:
+        # 새로 생성하려다 실패했으면 저장된 답변이라도 돌려줌 (에러 메시지는 캐시하지 않음)
+        if cache_enabled and not use_cache:
+            cached = reco_cache.get_reply(cache_key)
+            if cached is not None:
+                return cached
+        return str(e)
+
+    if cache_enabled:
+        reco_cache.store_reply(cache_key, reply)
+    return reply
 # ----------------------------------------------------------------------------------------------------------
\ No newline at end of file
@@ -0,0 +1,95 @@
+# pills/value_metrics.py
+# 가성비 지표 (1회분 가격 / 하루 가격)
+#
+# 네이버 검색 결과에서 뽑은 수량(amount)과 단위(unit_type: 'C' 개수 / 'D' 일수, pills.utils.extract_amount)와
+# 섭취방법(NTK_MTHD)의 하루 섭취량으로 계산해서 Pill에 저장해 둡니다. (인덱스가 있어서 정렬/범위 조회가 바로 됨)
+#   price_per_unit : 1정(1캡슐, 1포 ...)당 가격. 수량이 일수('D')면 하루 가격 / 하루 섭취량
+#   price_per_day  : 하루 가격. 수량이 개수('C')면 1정당 가격 x 하루 섭취량
+# 계산할 수 없으면 None (가격/수량이 없거나 하루 섭취량을 알 수 없음)
+#
+# 가격이 바뀌는 곳(Pill.save, 네이버 정보 저장, load_pills_data)에서 같이 계산하고,
+# 기존 데이터는 python manage.py backfill_value_metrics 로 채웁니다.
+
+import math
+import re
+
+VALUE_FIELDS = ['price_per_unit', 'price_per_day']
+
+_DOSE_UNITS = r'(?:정|캡슐|알|포|개|스틱|병|매|환|ml|g)'
+_TIMES_PER_DAY = re.compile(r'(?:1\s*일|하루)\s*(\d+)\s*(?:~\s*\d+\s*)?(?:회|번)')
+_DOSES_PER_TIME = re.compile(r'(?:1\s*회|한\s*번에?)\s*(\d+)\s*(?:~\s*\d+\s*)?' + _DOSE_UNITS)
+_DOSES_PER_DAY = re.compile(r'(?:1\s*일|하루)\s*(\d+)\s*(?:~\s*\d+\s*)?' + _DOSE_UNITS)
+
+# 목록 필터 파라미터 -> 조회 조건
+VALUE_FILTERS = {
+    'min_value': 'price_per_day__gte',
+    'max_value': 'price_per_day__lte',
+    'min_unit_price': 'price_per_unit__gte',
+    'max_unit_price': 'price_per_unit__lte',
+}
+
+
+def daily_doses(text):
+    """
+    섭취방법 -> 하루 섭취량 (정/캡슐/포 개수). 범위("1일 1~2회")는 적은 쪽으로
+    예) '1일 2회, 1회 2정' -> 4 / '1일 1포' -> 1 / 알 수 없으면 None
+    """
+    text = (text or '').lower()
+    times = _TIMES_PER_DAY.search(text)
+    per_time = _DOSES_PER_TIME.search(text)
+    if times and per_time:
+        return int(times.group(1)) * int(per_time.group(1)) or None
+    per_day = _DOSES_PER_DAY.search(text)
+    if per_day:
+        return int(per_day.group(1)) or None
+    if times:
+        return int(times.group(1)) or None
+    return None
+
+
+def compute_value_metrics(price, amount, unit_type, intake_text):
+    """(1회분 가격, 하루 가격) - 원 단위, 소수점 둘째 자리까지"""
+    if not price or price < 0 or not amount or amount <= 0:
+        return None, None
+
+    doses = daily_doses(intake_text)
+    per_unit = per_day = None
+    if unit_type == 'C':
+        per_unit = price / amount
+        per_day = per_unit * doses if doses else None
+    elif unit_type == 'D':
+        per_day = price / amount
+        per_unit = per_day / doses if doses else None
+
+    def rounded(value):
+        return None if value is None else round(value, 2)
+
+    return rounded(per_unit), rounded(per_day)
+
+
+def apply_value_metrics(pill):
+    """Pill 객체의 가성비 필드 갱신 (저장은 호출한 쪽에서). 바뀌었으면 True"""
+    metrics = compute_value_metrics(pill.price, pill.amount, pill.unit_type, pill.NTK_MTHD)
+    changed = metrics != (pill.price_per_unit, pill.price_per_day)
+    pill.price_per_unit, pill.price_per_day = metrics
+    return changed
+
+
+def value_filter_kwargs(params):
+    """?min_value=&max_value=&min_unit_price=&max_unit_price= -> filter() 인자 (숫자가 아니거나 nan/inf면 무시)"""
+    kwargs = {}
+    for param, lookup in VALUE_FILTERS.items():
+        try:
+            value = float(params.get(param))
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(value):
+            kwargs[lookup] = value
+    return kwargs
+
+
+def value_filter_token(params):
+    """캐시 키에 넣을 가성비 필터 구분값 (필터가 없으면 빈 문자열)"""
+    kwargs = value_filter_kwargs(params)
+    # repr()은 float를 그대로 되살릴 수 있는 가장 짧은 표현 -> 값이 다르면 키도 다름 (:g는 6자리에서 반올림)
+    return '_'.join(f'{lookup}={value!r}' for lookup, value in sorted(kwargs.items()))
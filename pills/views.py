@@ -1,5 +1,5 @@
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from rest_framework.authentication import TokenAuthentication
 from django.views.decorators.http import (
@@ -8,23 +8,20 @@ from django.views.decorators.http import (
     require_POST,
 )
 import json
-import requests
 from datetime import datetime, timedelta
 from rest_framework import status
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticatedOrReadOnly
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 # category model 가져와야됨
 from accounts.models import Category
-from .models import Pill, Thread, Comment, Substance, UserPill, CustomPill,Nutrient
+from .models import Pill, Thread, Comment, Substance, UserPill, CustomPill
 from .forms import ThreadForm, CommentForm
 from .serializers import (
-    PillListSerializer, 
-    PillDetailSerializer, 
+    pill_list_values,
+    serialize_pill_list,
     ThreadSerializer, 
     CommentSerializer,
     CategoryWithSubstancesSerializer,
@@ -32,14 +29,36 @@ from .serializers import (
     UserPillSerializer,
     CustomPillSerializer
 )
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.contrib.auth import update_session_auth_hash
 
-from .utils import get_purchase_link
+from .search import get_search_backend
+from .pagination import LATEST_SORTS, SUBSTANCE_SORTS, apply_sort, get_paginator, get_sort, page_token, sort_fields
+from .value_metrics import value_filter_kwargs, value_filter_token
+from .dosage_forms import dosage_forms_for
+from .facets import compute_facets, normalize_facet_query
+from .bitmap_filter import FilterSyntaxError, all_of, any_of, get_filter_index, parse_filter, term
 from rest_framework.views import APIView
 from .utils import get_pill_recommendation
+from .outbound import OutboundError, get_provider
+from .chatbot_stream import recommendation_events
 from accounts.models import GoogleSocialAccount
-from django.core.cache import cache
+from django.conf import settings
+from .cache_utils import (
+    index_cache_key,
+    detail_cache_key,
+    thread_list_cache_key,
+    substance_pills_cache_key,
+    index_count_cache_key,
+    pill_filter_cache_key,
+    facets_cache_key,
+    reference_cache_key,
+)
+from .response_cache import cached_reference_response, cached_response
+from .reference_data import reference_response
+from .access_stats import record_detail_view, record_index_query
+from .documents import get_document
+from .enrichment import document_needs_enrichment, enqueue_enrichment
 
 
 # Index 페이지
@@ -50,92 +69,59 @@ from django.core.cache import cache
 def index(request):
     # search_type = request.GET.get('search_type') # 예: 'name', 'company', 'ingredient', 'shape'
     # keyword = request.GET.get('keyword') # 예: '비타민', '종근당'
-    page = request.GET.get('page', 1)
     search_type = request.GET.get('search_type', '')
     keyword = request.GET.get('keyword', '')
     shapes = request.GET.get('shapes', '')
     
-    cache_key = f"pill_index_{search_type}_{keyword}_{shapes}_{page}"
+    sort = get_sort(request)
+    # 많이 보는 목록 조건 집계 (warm_cache가 이 조건들을 미리 채움, pills/access_stats.py)
+    record_index_query(request)
+    # 가성비 범위 필터: ?min_value=&max_value= (하루 가격), ?min_unit_price=&max_unit_price= (1회분 가격)
+    value_filters = value_filter_kwargs(request.GET)
+    value_token = value_filter_token(request.GET)
+    
+    # 카탈로그 버전이 들어간 키 -> Pill이 바뀌면 자동으로 새 키를 쓰게 됨 (pills/cache_utils.py)
+    # 페이지 번호 대신 커서(?cursor=)로 요청해도 키가 구분됨 (pills/pagination.py)
+    cache_key = index_cache_key(search_type, keyword, shapes, page_token(request), value_token)
     print(f"🔑 생성된 캐시 키: [{cache_key}]")
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        # 데이터가 있으면? DB 조회 없이 바로 리턴! (0.001초 소요)
-        print("✅ 캐시 적중! (DB 조회 안 함)")
-        return Response(cached_data)
-    else:
+
+    def build_index_data():
+        # 캐시가 없을 때 한 워커만 실행 (나머지는 이 결과를 기다렸다가 사용)
         print("❌ 캐시 없음... DB 조회하러 감 🐢") # 확인용
-    
-    
-    pills = Pill.objects.exclude(price=-1).prefetch_related('nutrient_details', 'category').order_by('-pk')
-    # pills = Pill.objects.exclude(price=-1).order_by('-pk')
-    
-    if keyword:
-        # [제품명]으로 검색
-        if search_type == 'name':
-            pills = pills.filter(PRDLST_NM__icontains=keyword)
+
+        # sort=value / unit_price 는 가성비 값이 있는 영양제만, 가성비 컬럼 인덱스 순서대로 읽음
+        pills = apply_sort(Pill.objects.exclude(price=-1).filter(**value_filters), sort)
+        # pills = Pill.objects.exclude(price=-1).order_by('-pk')
         
-        # [제조사]로 검색
-        elif search_type == 'company':
-            pills = pills.filter(BSSH_NM__icontains=keyword)
+        if keyword:
+            # 검색 백엔드(FTS 바이그램 인덱스)로 위임
+            # search_type: 'name'(제품명), 'company'(제조사), 'ingredient'(성분), 'shape'(형태), 그 외는 전체 검색
+            # 최신순(기본)일 때만 관련도순, 가격순/가성비순은 위에서 건 정렬을 그대로 유지
+            pills = get_search_backend().filter(pills, keyword, search_type, rank=(sort == 'latest'))
         
-        # [성분]으로 검색
-        elif search_type == 'ingredient':
-            pills = pills.filter(STDR_STND__icontains=keyword)
-            
-        # [형태]로 검색 (정제, 캡슐 등)
-        elif search_type == 'shape':
-            pills = pills.filter(PRDT_SHAP_CD_NM__icontains=keyword)
-        else: # 전체 검색
-            pills = pills.filter(
-                Q(PRDLST_NM__icontains=keyword) |
-                Q(BSSH_NM__icontains=keyword) |
-                Q(STDR_STND__icontains=keyword) |
-                Q(PRDT_SHAP_CD_NM__icontains=keyword)
-            )
-    
-    shapes_str = request.GET.get('shapes') 
-    
-    if shapes_str:
-        shape_list = shapes_str.split(',') # 콤마로 쪼개서 리스트로 만듦
-        q_shape = Q()
-
-        for shape in shape_list:
-            if shape == '정(알약)':
-                # 사용자가 '정(알약)'을 선택하면 DB에서 '정' 또는 '알약'이 들어간 걸 찾음
-                q_shape |= Q(PRDT_SHAP_CD_NM__icontains='정') | Q(PRDT_SHAP_CD_NM__icontains='알약')
-            elif shape == '분말(가루)':
-                 q_shape |= Q(PRDT_SHAP_CD_NM__icontains='분말') | Q(PRDT_SHAP_CD_NM__icontains='가루')
-            else:
-                # 나머지는 선택한 단어 그대로 검색 (예: 캡슐, 액상, 젤리 등)
-                q_shape |= Q(PRDT_SHAP_CD_NM__icontains=shape)
+        shapes_str = request.GET.get('shapes') 
         
-        # 전체 pills 결과에 제형 필터를 덧씌움 (AND 조건)
-        # 즉, 검색어로 찾은 결과 중에서 + 제형도 맞는 것만 남김
-        pills = pills.filter(q_shape)
+        if shapes_str:
+            # 콤마로 쪼갠 제형 버튼('정(알약)', '캡슐' ...) -> 정규화된 제형 코드 (pills/dosage_forms.py)
+            # 검색어로 찾은 결과 중에서 + 제형도 맞는 것만 남김 (dosage_form 인덱스로 IN 조회)
+            pills = pills.filter(dosage_form__in=dosage_forms_for(shapes_str.split(',')))
 
+        # 목록에 나오는 컬럼만 읽음 (성분 prefetch, 원재료/기준규격 같은 긴 텍스트 없이 카테고리 이름만 JOIN)
+        pills = pill_list_values(pills, sort_fields(sort))
 
-    paginator = PageNumberPagination()
-    paginator.page_size = 20  # 한 페이지당 20개 데이터만 넘겨 받기
-    
-    # 필터링된 pills를 페이징 처리
-    result_page = paginator.paginate_queryset(pills, request)
-    
-    # 4. 시리얼라이징 (JSON 변환)
-    # pills_data = []
-    # for pill in pills:
-    #     pills_data.append({
-    #         'id': pill.pk,
-    #         'title': pill.PRDLST_NM,       # JS에서 쓸 이름(title) : 모델 필드명(PRDLST_NM)
-    #         'company': pill.BSSH_NM,       # 제조사
-    #         'description': pill.STDR_STND, # 성분/설명
-    #         'cover': pill.cover if pill.cover else None, # 이미지
-    #     })
-    serializer = PillListSerializer(result_page, many=True, context={'request': request})
-    final_response_data = paginator.get_paginated_response(serializer.data).data
-    # JSON 형태로 응답 (render가 아님!)
-    cache.set(cache_key, final_response_data, 1800)
-    
-    return Response(final_response_data)
+        # 한 페이지당 20개 데이터만 넘겨 받기
+        # ?page=N 은 기존 페이지 번호 방식, ?pagination=cursor / ?cursor= 는 커서 방식 (깊은 페이지도 첫 페이지와 같은 비용)
+        paginator = get_paginator(request, 20, count_cache_key=index_count_cache_key(search_type, keyword, shapes, value_token, sort))
+        
+        # 필터링된 pills를 페이징 처리
+        result_page = paginator.paginate_queryset(pills, request)
+        
+        # 4. 시리얼라이징 (JSON 변환) - PillListSerializer와 같은 모양의 dict를 바로 만듦
+        return paginator.get_paginated_response(serialize_pill_list(result_page)).data
+
+    # 캐시 적중이면 DB 조회 없이 바로 리턴! (동시에 캐시가 비어도 DB 조회는 한 번만)
+    # PILL_RESPONSE_CACHE_MODE='rendered' 이면 압축된 JSON bytes를 캐시해서 그대로 전송 (pills/response_cache.py)
+    return cached_response(request, cache_key, build_index_data)
     # return paginator.get_paginated_response(serializer.data)
     # return JsonResponse({'pills': pills_data})
 
@@ -143,63 +129,41 @@ def index(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def detail(request, pill_pk):
-    cache_key = f"pill_detail_{pill_pk}"
-    
-    cached_data = cache.get(cache_key)
-
-    if cached_data:
-        # 캐시에 데이터가 있으면? 
-        # DB 조회도 안 하고, 네이버 크롤링도 안 하고 바로 리턴! (속도 최강)
-        print(f"✅ [Cache] {pill_pk}번 영양제 캐시 적중!")
-        return Response(cached_data)
-    
-    pill = get_object_or_404(Pill.objects.prefetch_related('nutrient_details', 'category'), pk=pill_pk)
-    # pill = get_object_or_404(Pill, pk=pill_pk)
-
-    print(f"\n📢 [DEBUG] ID: {pill.id} / 제품명: {pill.PRDLST_NM}")
-    
-    # 🔥 [수정 포인트]
-    # 2. URL이 없거나
-    # 3. 가격이 없거나 실패(-1)했던 경우
-    # -> 무조건 검색 로직 실행!
-        
-    if not pill.purchase_url or pill.price == -1 or pill.price is None or pill.price == 0:
-        print("🚀 네이버 검색 API 호출 시작... (검증 로직 적용됨)")
+    cache_key = detail_cache_key(pill_pk)
+    record_detail_view(request, pill_pk)  # 많이 보는 영양제 집계 (warm_cache용)
+
+    def build_detail_data():
+        # 캐시가 없을 때 한 워커만 실행
+        # 미리 만들어 둔 상세 문서를 pk로 한 번만 조회 (영양제/성분/알레르기를 따로 조회하지 않음, pills/documents.py)
+        document = get_document(pill_pk)
+        if document is None:
+            raise Http404
+        # pill = get_object_or_404(Pill, pk=pill_pk)
+
+        print(f"\n📢 [DEBUG] ID: {document['id']} / 제품명: {document['PRDLST_NM']}")
         
-        # utils.py의 개선된 함수 호출 (기업명 검증 포함)
-        link_data = get_purchase_link(pill.PRDLST_NM, pill.BSSH_NM) 
-        
-        if link_data:
-            print(f"✅ 검색 성공! 최저가: {link_data['price']}원")
-            print(f"   🔗 링크: {link_data['link']}")
-            pill.purchase_url = link_data['link']
-            pill.price = link_data['price']
-            pill.mall_name = link_data['mall']
-            pill.cover = link_data.get('image')
+        # 🔥 [수정 포인트]
+        # URL이 없거나, 가격이 없거나 실패(-1)했던 경우
+        # -> 네이버 검색은 요청 안에서 하지 않고 작업 큐에 등록만 함 (run_enrichment_worker가 처리)
+        # -> 워커가 저장하면 영양제 버전이 올라가서 이 캐시도 자동으로 갱신됨
+        if document_needs_enrichment(document):
+            print("📮 네이버 검색 작업 등록 (백그라운드 처리)")
+            enqueue_enrichment([document['id']])
         else:
-            print("❌ 검색 결과 없음 또는 제조사 불일치 (제습기 차단됨 🛡️)")
-            pill.price = -1
-            pill.purchase_url = ""
-            
-        pill.save()
-        print("💾 DB 업데이트 완료")
-    
-    else:
-        print("⚡ 이미 데이터가 있어서 생략함")
+            print("⚡ 이미 데이터가 있어서 생략함")
+
+        return document
 
-    serializer = PillDetailSerializer(pill)
-    final_data = serializer.data
-    cache.set(cache_key, final_data, 1800)
-    return Response(final_data)
+    # 캐시에 데이터가 있으면? 
+    # DB 조회도 안 하고 바로 리턴! (속도 최강)
+    return cached_response(request, cache_key, build_detail_data)
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def category_list(request):
-    categories = Category.objects.all()
-    # 프론트에서 쓰기 편하게 id와 name만 추출
-    data = [{"id": c.id, "name": c.name} for c in categories]
-    return Response(data)
+    # 워커 메모리에 만들어 둔 목록으로 바로 응답 (기준 데이터 버전이 바뀔 때만 다시 만듦, pills/reference_data.py)
+    return reference_response(request, 'categories')
 
 
 
@@ -327,9 +291,8 @@ def custom_pill_detail(request, pk):
 # -------------영양제 함량 가져오기 (중복 섭취 기능) ----------------------------
 @api_view(['GET'])
 def all_ingredients_list(request):
-    # 모든 성분명(substance_name)을 가져와 중복 제거 후 가나다순 정렬
-    ingredients = Nutrient.objects.values_list('substance_name', flat=True).distinct().order_by('substance_name')
-    return Response(list(ingredients))
+    # 모든 성분명(중복 제거, 가나다순): 워커 메모리에 만들어 둔 목록 (pills/reference_data.py)
+    return reference_response(request, 'ingredients')
 # ----------------------------------------------------------------------------
 
 
@@ -471,33 +434,44 @@ def delete_comment(request, pill_pk, comment_pk):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def thread_list(request, pill_pk):
-    # 1. pill_pk에 해당하는 영양제 객체 가져오기 (없으면 404)
-    pill = get_object_or_404(Pill, pk=pill_pk)
-    
-    # 2. 해당 영양제에 연결된 모든 후기(Thread)를 최신순으로 가져오기
-    # Pill 모델에 related_name이 명시되어 있다면 해당 이름을 사용해도 됩니다.
-    # 여기서는 Thread 모델이 pill 필드를 가지고 있다고 가정합니다.
-    # threads = pill.thread_set.all().annotate(
-    #     comment_count=Count('comments') 
-    # ).order_by('-pk')
-    threads = pill.thread_set.all().select_related('user').annotate(
-        comment_count=Count('comments') 
-    ).order_by('-pk')
-    
-    # 3. 페이징 처리 (옵션)
-    # 후기가 많아질 경우를 대비하여 페이징 처리를 고려할 수 있습니다.
-    # 필요하다면 index 함수처럼 PageNumberPagination을 사용하세요.
-    paginator = PageNumberPagination()
-    paginator.page_size = 10 # 한 페이지당 10개
-    result_page = paginator.paginate_queryset(threads, request)
-
-    # 4. 시리얼라이징 (JSON 변환)
-    # ThreadSerializer는 후기 목록을 위해 필요한 필드만 포함하도록 정의되어야 합니다.
-    serializer = ThreadSerializer(result_page, many=True)
-    
-    # 5. JSON 응답
-    # 페이징 처리를 사용했다면 paginator의 응답 함수를 사용합니다.
-    return paginator.get_paginated_response(serializer.data)
+    # 후기/댓글/좋아요가 바뀌면 버전이 올라감 (pills/signals.py)
+    cache_key = thread_list_cache_key(pill_pk, page_token(request, LATEST_SORTS))
+
+    def build_thread_list_data():
+        # 1. pill_pk에 해당하는 영양제 객체 가져오기 (없으면 404)
+        pill = get_object_or_404(Pill, pk=pill_pk)
+        
+        # 2. 해당 영양제에 연결된 모든 후기(Thread)를 최신순으로 가져오기
+        # Pill 모델에 related_name이 명시되어 있다면 해당 이름을 사용해도 됩니다.
+        # 여기서는 Thread 모델이 pill 필드를 가지고 있다고 가정합니다.
+        # threads = pill.thread_set.all().annotate(
+        #     comment_count=Count('comments') 
+        # ).order_by('-pk')
+        threads = pill.thread_set.all().select_related('user').annotate(
+            comment_count=Count('comments') 
+        ).order_by('-pk')
+        
+        # 3. 페이징 처리 (옵션)
+        # 후기가 많아질 경우를 대비하여 페이징 처리를 고려할 수 있습니다.
+        # 필요하다면 index 함수처럼 PageNumberPagination을 사용하세요.
+        paginator = get_paginator(request, 10, LATEST_SORTS) # 한 페이지당 10개 (?cursor= 로 요청하면 커서 방식)
+        result_page = paginator.paginate_queryset(threads, request)
+
+        # 4. 시리얼라이징 (JSON 변환)
+        # ThreadSerializer는 후기 목록을 위해 필요한 필드만 포함하도록 정의되어야 합니다.
+        # (request context 없이 직렬화하므로 is_liked/is_author는 항상 False -> 유저와 무관하게 캐시 가능)
+        serializer = ThreadSerializer(result_page, many=True)
+        
+        # 5. JSON 응답
+        # 페이징 처리를 사용했다면 paginator의 응답 함수를 사용합니다.
+        return paginator.get_paginated_response(serializer.data).data
+
+    # 작성자 프로필 변경 등은 버전에 잡히지 않으므로 TTL은 짧게
+    # 로그인한 사용자별 값(is_liked, is_author)이 있으므로 CDN/공용 캐시에는 저장하지 않음 (ETag 재검증만)
+    return cached_response(
+        request, cache_key, build_thread_list_data,
+        cache_control='private, no-cache', ttl=getattr(settings, 'THREAD_CACHE_TTL', 60 * 5),
+    )
 
 
 # ==========================================
@@ -508,63 +482,144 @@ def thread_list(request, pill_pk):
 # 2. 특정 카테고리 클릭 시 -> 성분 리스트 조회
 @api_view(['GET'])
 def category_detail(request, category_id):
-    category = get_object_or_404(Category, pk=category_id)
-    serializer = CategoryWithSubstancesSerializer(category)
-    return Response(serializer.data)
+    def build_category_detail():
+        category = get_object_or_404(Category, pk=category_id)
+        serializer = CategoryWithSubstancesSerializer(category)
+        return serializer.data
+
+    return cached_reference_response(request, reference_cache_key('category', category_id), build_category_detail)
 
 # 3. 성분 상세 정보 조회 (효능, 부작용, 권장량 등)
 @api_view(['GET'])
 def substance_detail(request, substance_id):
-    substance = get_object_or_404(Substance, pk=substance_id)
-    serializer = SubstanceSerializer(substance)
-    return Response(serializer.data)
+    def build_substance_detail():
+        substance = get_object_or_404(Substance, pk=substance_id)
+        serializer = SubstanceSerializer(substance)
+        return serializer.data
+
+    return cached_reference_response(request, reference_cache_key('substance', substance_id), build_substance_detail)
 
 # 4. ★ 핵심: 특정 성분이 포함된 영양제 리스트 (필터 + 페이징)
 @api_view(['GET'])
 def substance_pills(request, substance_id):
-    substance = get_object_or_404(Substance, pk=substance_id)
-    
-    # [1] 기본 검색: 해당 성분이 포함된 영양제 찾기
-    # models.py 구조: Pill <-> Nutrient <-> Substance
-    # Nutrient 모델의 'substance' 필드를 통해 역참조하여 Pill을 찾습니다.
-    # pills = Pill.objects.filter(nutrient_details__substance=substance).exclude(price=-1).distinct()
-    pills = Pill.objects.filter(nutrient_details__substance=substance)\
-                .exclude(price=-1)\
-                .prefetch_related('nutrient_details', 'category')\
-                .distinct()
-    # [2] 카테고리 필터링 (교집합)
     categories_param = request.GET.get('category')
-    if categories_param:
-        # "간 건강,눈 건강" -> ["간 건강", "눈 건강"] 리스트로 변환
-        category_list = categories_param.split(',')
-        # __in 연산자를 써서 리스트에 포함된 것들을 모두 찾음
-        pills = pills.filter(category__name__in=category_list)
-
-    # [3] 제형(모양) 필터링 (포함 검색)
     shapes_param = request.GET.get('shapes')
-    if shapes_param:
-        shape_list = shapes_param.split(',')
-        q_objects = Q()
-        for shape in shape_list:
-            # 예: '정(알약)' 검색 시 '정'이나 '알약' 글자가 포함되면 매칭
-            q_objects |= Q(PRDT_SHAP_CD_NM__icontains=shape)
-        pills = pills.filter(q_objects)
-
-    # [4] 페이지네이션 (20개씩 끊어서 보내기)
-    paginator = PageNumberPagination()
-    paginator.page_size = 20
-    result_page = paginator.paginate_queryset(pills, request)
-    
-    serializer = PillListSerializer(result_page, many=True)
-    return paginator.get_paginated_response(serializer.data)
+    sort = get_sort(request, SUBSTANCE_SORTS)
+    value_filters = value_filter_kwargs(request.GET)
+    cache_key = substance_pills_cache_key(
+        substance_id, categories_param, shapes_param, page_token(request, SUBSTANCE_SORTS), value_filter_token(request.GET)
+    )
+
+    def build_substance_pills_data():
+        substance = get_object_or_404(Substance, pk=substance_id)
+
+        # [1] 기본 검색: 해당 성분이 포함된 영양제 (가격 실패(-1) 제외)
+        # [2] 카테고리 필터링: 선택한 카테고리 중 하나 ("간 건강,눈 건강" -> OR)
+        # [3] 제형(모양) 필터링: 선택한 제형 중 하나 (index와 같은 정규화된 제형 코드로 비교)
+        # JOIN + DISTINCT 대신 메모리 비트맵 연산으로 계산하고, 보여줄 페이지의 영양제만 DB에서 읽음 (pills/bitmap_filter.py)
+        category_list = [c for c in (categories_param or '').split(',') if c]
+        shape_list = [s for s in (shapes_param or '').split(',') if s]
+
+        if sort != 'latest' or value_filters:
+            # 가격/가성비순 정렬, 가성비 범위 필터: 비트맵은 pk 순서뿐이라 DB에서 가격 컬럼 인덱스로 조회
+            # (예: 루테인 하루 가격이 싼 순 -> price_per_day 인덱스를 순서대로 읽으며 성분 조건 확인)
+            # Nutrient는 (pill, substance)가 유일하므로 JOIN해도 중복 없음
+            pills = Pill.objects.exclude(price=-1).filter(nutrient_details__substance=substance, **value_filters)
+            if category_list:
+                pills = pills.filter(
+                    Q(category__name__in=category_list) | Q(category_id__in=[int(c) for c in category_list if c.isdigit()])
+                )
+            if shape_list:
+                pills = pills.filter(dosage_form__in=dosage_forms_for(shape_list))
+            pills = pill_list_values(apply_sort(pills, sort, SUBSTANCE_SORTS), sort_fields(sort, SUBSTANCE_SORTS))
+
+            paginator = get_paginator(request, 20, SUBSTANCE_SORTS)
+            result_page = paginator.paginate_queryset(pills, request)
+            return paginator.get_paginated_response(serialize_pill_list(result_page)).data
+
+        condition = all_of(
+            term('substance', substance.pk),
+            any_of(*(term('category', c) for c in category_list)) if category_list else None,
+            any_of(*(term('shape', s) for s in shape_list)) if shape_list else None,
+        )
+        pills = get_filter_index().filter(condition, descending=False)
+
+        # [4] 페이지네이션 (20개씩 끊어서 보내기, ?cursor= 로 요청하면 커서 방식)
+        paginator = get_paginator(request, 20, SUBSTANCE_SORTS)
+        result_page = paginator.paginate_queryset(pills, request)
+        return paginator.get_paginated_response(serialize_pill_list(result_page)).data
+
+    return cached_response(request, cache_key, build_substance_pills_data)
+
+
+# 5. 성분/카테고리/제형/알레르기 조합 필터
+# 예) ?q=substance:루테인 AND substance:지아잔틴, shape:캡슐 AND NOT allergen:대두
+#     ?q=(category:"눈 건강" OR category:"간 건강") shape:"정(알약)"
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def pill_filter(request):
+    expression = request.GET.get('q', '').strip()
+    try:
+        condition = parse_filter(expression)
+    except FilterSyntaxError as e:
+        return Response({'error': str(e)}, status=400)
+
+    cache_key = pill_filter_cache_key(expression, page_token(request, LATEST_SORTS))
+
+    def build_filter_data():
+        # 최신 영양제부터 (목록과 같은 순서), 보여줄 페이지의 영양제만 DB에서 읽음
+        pills = get_filter_index().filter(condition)
+        paginator = get_paginator(request, 20, LATEST_SORTS)
+        result_page = paginator.paginate_queryset(pills, request)
+        return paginator.get_paginated_response(serialize_pill_list(result_page)).data
+
+    return cached_response(request, cache_key, build_filter_data)
+
+
+# 6. 필터 사이드바 옵션별 개수 (카테고리 / 제형 / 가격대 / 알레르기 없음)
+# 예) ?keyword=비타민&shapes=정(알약),캡슐&price=10k_20k&allergen_free=대두
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def pill_facets(request):
+    query = normalize_facet_query(request.GET)
+    try:
+        parse_filter(query.get('q', ''))
+    except FilterSyntaxError as e:
+        return Response({'error': str(e)}, status=400)
+
+    # 정리된 조건이 같으면 같은 캐시 (파라미터 순서/중복과 무관), 카탈로그가 바뀌면 자동 무효화
+    return cached_response(request, facets_cache_key(query), lambda: compute_facets(query))
 
 
 # ------------- AI 추천 서비스 --------------------------------
 @api_view(['POST'])
 def chatbot_view(request):
     user_input = request.data.get('message')
-    reply = get_pill_recommendation(user_input)
+    # no_cache: true -> 저장된 답변을 쓰지 않고 새로 생성 (pills/reco_cache.py)
+    use_cache = str(request.data.get('no_cache', '')).lower() not in ('1', 'true')
+    reply = get_pill_recommendation(user_input, use_cache=use_cache)
     return Response({'reply': reply})
+
+
+# 스트리밍 버전: 답변 조각을 SSE(text/event-stream)로 바로 전달 (pills/chatbot_stream.py)
+# DRF @api_view는 async 뷰를 지원하지 않아서 장고 async 뷰로 작성 -> ASGI 서버(uvicorn)로 실행
+@csrf_exempt
+@require_POST
+async def chatbot_stream_view(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': '잘못된 요청 형식입니다.'}, status=400)
+
+    user_input = data.get('message') or ''
+    use_cache = str(data.get('no_cache', '')).lower() not in ('1', 'true')
+    response = StreamingHttpResponse(
+        recommendation_events(user_input, use_cache=use_cache),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx가 모아서 보내지 않도록
+    return response
 # ------------------------------------------------------------
 
 
@@ -620,8 +675,8 @@ def register_google_calendar(request):
             },
         }
 
-        # 5. 구글 캘린더 API 호출 (DB에서 가져온 토큰 사용)
-        res = requests.post(
+        # 5. 구글 캘린더 API 호출 (DB에서 가져온 토큰 사용, 타임아웃/서킷 브레이커는 pills/outbound.py)
+        res = get_provider('google').post(
             "https://www.googleapis.com/calendar/v3/calendars/primary/events",
             json=payload,
             headers={"Authorization": f"Bearer {google_token}"}
@@ -637,6 +692,10 @@ def register_google_calendar(request):
                 "detail": res.json()
             }, status=res.status_code)
 
+    except OutboundError as e:
+        # 구글 서버가 느리거나 장애 -> 오래 붙잡지 않고 바로 안내
+        print(f"⚠️ 구글 캘린더 호출 실패: {e}")
+        return Response({"error": "구글 캘린더 서버가 응답하지 않습니다. 잠시 후 다시 시도해주세요."}, status=503)
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 # -----------------------------------------------------------------
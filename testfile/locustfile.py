@@ -1,5 +1,6 @@
 from locust import HttpUser, task, between
 import random
+import time
 class WebsiteUser(HttpUser):
     wait_time = between(1, 3)
     
@@ -48,4 +49,82 @@ class WebsiteUser(HttpUser):
             self.client.get(f"/pills/{target_id}/")
         else:
             # ID를 못 가져왔을 경우를 대비해 안전장치 (예: 1번 시도)
-            self.client.get("/pills/3/")
\ No newline at end of file
+            self.client.get("/pills/3/")
+
+# ------------------------------------------------------------------------------
+# 캐시 스탬피드(동시 캐시 미스) 시나리오
+#   1) redis-cli -n 1 FLUSHDB   (캐시를 비운 상태에서 시작)
+#   2) locust -f testfile/locustfile.py CacheStampedeUser -u 200 -r 200 --run-time 1m
+#   3) 서버 로그에서 키별 "❌ 캐시 없음... DB 조회하러 감" 출력 횟수를 확인
+# 모든 유저가 같은 소수의 키에 동시에 몰리게 만들어서, 캐시가 비는 순간 DB 조회가 몇 번 일어나는지 봅니다.
+# get_or_fill(single-flight) 적용 후에는 키당 1번만 DB 조회가 일어나고 나머지는 대기/옛 값으로 응답합니다.
+# ------------------------------------------------------------------------------
+class CacheStampedeUser(HttpUser):
+    wait_time = between(0, 0.1)
+
+    # 모두가 동시에 요청하는 인기 키들
+    HOT_PAGES = [1, 2, 3]
+    HOT_SHAPES = ['캡슐', '정(알약)', '분말(가루)']
+    hot_ids = []
+
+    def on_start(self):
+        response = self.client.get("/pills/", name="/pills/ (warm-up)")
+        if response.status_code == 200:
+            self.hot_ids = [pill['id'] for pill in response.json().get('results', [])[:5]]
+
+    @task(4)
+    def hot_index_page(self):
+        self.client.get(f"/pills/?page={random.choice(self.HOT_PAGES)}", name="/pills/?page=[hot]")
+
+    @task(2)
+    def hot_shape_filter(self):
+        self.client.get(f"/pills/?shapes={random.choice(self.HOT_SHAPES)}", name="/pills/?shapes=[hot]")
+
+    @task(3)
+    def hot_detail(self):
+        if self.hot_ids:
+            self.client.get(f"/pills/{random.choice(self.hot_ids)}/", name="/pills/[id]/")
+
+    @task(1)
+    def hot_thread_list(self):
+        if self.hot_ids:
+            self.client.get(f"/pills/{random.choice(self.hot_ids)}/threads/", name="/pills/[id]/threads/")
+
+    @task(1)
+    def hot_substance_pills(self):
+        self.client.get("/pills/substances/1/pills/", name="/pills/substances/[id]/pills/")
+
+# ------------------------------------------------------------------------------
+# 챗봇 스트리밍(SSE) 시나리오 - 실제 GMS API 대신 가짜 LLM 서버 사용
+#   1) python testfile/stub_llm_server.py --ttft 0.5 --chunks 40 --delay 0.05
+#   2) GMS_MODEL_URL=http://127.0.0.1:8900/v1beta/models/stub uvicorn mypjt.asgi:application --workers 4
+#   3) locust -f testfile/locustfile.py ChatbotStreamUser -u 200 -r 20 --run-time 2m
+# "first token" 항목이 첫 조각까지 걸린 시간, "/pills/chatbot/stream/"이 전체 답변 시간입니다.
+# 같은 질문은 추천 캐시에 걸리므로 매번 새로 생성하도록 no_cache를 보냅니다.
+# ------------------------------------------------------------------------------
+class ChatbotStreamUser(HttpUser):
+    wait_time = between(1, 3)
+
+    MESSAGES = ['눈이 침침해', '요즘 너무 피곤해', '부모님 선물', '관절이 아파요', '잠을 잘 못 자요']
+
+    @task
+    def chatbot_stream(self):
+        payload = {'message': random.choice(self.MESSAGES), 'no_cache': True}
+        start = time.perf_counter()
+        first_token_ms = None
+        with self.client.post("/pills/chatbot/stream/", json=payload, stream=True,
+                              catch_response=True, name="/pills/chatbot/stream/") as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if first_token_ms is None and line == 'event: token':
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                if line == 'event: error':
+                    response.failure('스트림 에러 이벤트')
+                    return
+            if first_token_ms is None:
+                response.failure('토큰을 받지 못함')
+                return
+
+        self.environment.events.request.fire(
+            request_type="SSE", name="first token", response_time=first_token_ms,
+            response_length=0, exception=None, context={},
+        )
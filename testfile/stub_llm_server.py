@@ -0,0 +1,97 @@
+# 챗봇 부하 테스트용 가짜 LLM 서버 (Gemini generateContent / streamGenerateContent 흉내)
+# 실제 GMS API를 부르지 않고(비용/한도 없이) 챗봇 엔드포인트를 오프라인으로 부하 테스트할 때 사용합니다.
+#
+#   1) python testfile/stub_llm_server.py --port 8900 --ttft 0.5 --chunks 40 --delay 0.05
+#   2) GMS_MODEL_URL=http://127.0.0.1:8900/v1beta/models/stub uvicorn mypjt.asgi:application --workers 4
+#   3) locust -f testfile/locustfile.py ChatbotStreamUser -u 200 -r 20 --run-time 2m
+#
+#   --ttft   : 첫 조각까지 걸리는 시간 (초)
+#   --chunks : 답변을 몇 조각으로 나눠 보낼지
+#   --delay  : 조각 사이 간격 (초)  -> 전체 답변 시간 ≈ ttft + chunks * delay
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = (
+    "🎁 추천 제품: 테스트 비타민\n\n"
+    "🧪 주요 성분 및 효능\n비타민 B군은 에너지 대사에 도움을 줄 수 있습니다.\n\n"
+    "💊 형태 및 생김새\n하루 한 번 섭취하는 작은 정제입니다.\n\n"
+    "💡 PillGood의 선택 이유\n1. 피로 개선에 도움을 줄 수 있습니다.\n2. 섭취가 간편합니다.\n\n"
+    "⚠️ 건강 안내\n본 답변은 부하 테스트용 가짜 응답입니다."
+)
+
+
+def split_answer(chunks):
+    size = max(1, -(-len(ANSWER) // chunks))
+    return [ANSWER[i:i + size] for i in range(0, len(ANSWER), size)]
+
+
+def gemini_chunk(text):
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = None
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 로그를 찍으면 부하 테스트 때 너무 많음
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        path = self.path.split('?')[0]
+        time.sleep(self.config.ttft)
+
+        if path.endswith(':streamGenerateContent'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')  # 실제 API처럼 charset 없이
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            try:
+                for idx, text in enumerate(split_answer(self.config.chunks)):
+                    if idx:
+                        time.sleep(self.config.delay)
+                    self.wfile.write(f"data: {json.dumps(gemini_chunk(text), ensure_ascii=False)}\r\n\r\n".encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # 클라이언트가 중간에 끊음
+            self.close_connection = True
+        elif path.endswith(':generateContent'):
+            time.sleep(self.config.delay * self.config.chunks)
+            body = json.dumps(gemini_chunk(ANSWER), ensure_ascii=False).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # 클라이언트가 타임아웃으로 먼저 끊음
+        else:
+            self.send_error(404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gemini API를 흉내내는 가짜 LLM 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--ttft', type=float, default=0.5, help='첫 조각까지 걸리는 시간 (초)')
+    parser.add_argument('--chunks', type=int, default=40, help='답변 조각 수')
+    parser.add_argument('--delay', type=float, default=0.05, help='조각 사이 간격 (초)')
+    config = parser.parse_args()
+
+    StubHandler.config = config
+    server = ThreadingHTTPServer((config.host, config.port), StubHandler)
+    server.daemon_threads = True
+    print(f"🤖 가짜 LLM 서버 실행 중: http://{config.host}:{config.port}/v1beta/models/stub")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 종료합니다.")
+
+
+if __name__ == '__main__':
+    main()